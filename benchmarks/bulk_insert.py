@@ -0,0 +1,82 @@
+"""
+Rows per second for the single-row, multi-row INSERT and COPY create paths.
+
+    uv run python -m benchmarks.bulk_insert --rows 20000
+"""
+
+import asyncio
+
+import click
+
+from apat.customers.crud import COPY_THRESHOLD, AddressCRUD
+from apat.customers.models import AddressValues
+from benchmarks.utils import Timer, bench_database, print_table
+
+
+def make_addresses(n: int) -> list[AddressValues]:
+    return [
+        AddressValues(
+            street=f"{i} Main St", city="Springfield", state="IL", zip_code=f"{i:05}"
+        )
+        for i in range(n)
+    ]
+
+
+async def run(rows: int, single_rows: int) -> None:
+    async with bench_database() as engine:
+        results: list[tuple[str, int, float]] = []
+
+        with Timer() as timer:
+            for values in make_addresses(single_rows):
+                async with engine.connect() as conn:
+                    await AddressCRUD.create(conn, **values)
+                    await conn.commit()
+        results.append(("single-row", single_rows, timer.elapsed))
+
+        addresses = make_addresses(rows)
+        with Timer() as timer:
+            async with engine.connect() as conn:
+                for start in range(0, rows, COPY_THRESHOLD):
+                    await AddressCRUD.create_many(
+                        conn, addresses[start : start + COPY_THRESHOLD]
+                    )
+                await conn.commit()
+        results.append((f"multi-row INSERT x{COPY_THRESHOLD}", rows, timer.elapsed))
+
+        with Timer() as timer:
+            async with engine.connect() as conn:
+                await AddressCRUD.create_many(conn, addresses)
+                await conn.commit()
+        results.append(("COPY", rows, timer.elapsed))
+
+    baseline = single_rows / results[0][2]
+    print_table(
+        "Address create throughput",
+        ["path", "rows", "seconds", "rows/s", "vs single-row"],
+        [
+            (
+                name,
+                str(n),
+                f"{elapsed:.3f}",
+                f"{n / elapsed:,.0f}",
+                f"{n / elapsed / baseline:.1f}x",
+            )
+            for name, n, elapsed in results
+        ],
+    )
+
+
+@click.command()
+@click.option("--rows", default=20_000, show_default=True)
+@click.option(
+    "--single-rows",
+    default=1_000,
+    show_default=True,
+    help="Rows for the one-transaction-per-row path, which is much slower.",
+)
+def main(rows: int, single_rows: int) -> None:
+    asyncio.run(run(rows, single_rows))
+
+
+if __name__ == "__main__":
+    main()
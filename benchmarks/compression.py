@@ -0,0 +1,133 @@
+"""
+CPU cost and size of gzip/deflate response compression at each level, for a page
+of customers and a large NDJSON export, plus how long compressing the export
+stalls the event loop when done inline versus in a worker thread.
+
+    uv run python -m benchmarks.compression --rows 100000
+"""
+
+import asyncio
+import time
+import timeit
+from uuid import uuid4
+
+import click
+from starlette.responses import Response
+from starlette.types import Message
+
+from apat.api.compression import CompressionMiddleware, Encoder
+from apat.api.pagination import PageBody
+from apat.customers.models import Customer
+from apat.customers.schema import customer_adapter, customer_page_adapter
+from apat.settings import settings
+from benchmarks.utils import print_table
+
+PAGE_SIZE = 500
+
+
+def customers(rows: int) -> list[Customer]:
+    return [
+        Customer(
+            bid=uuid4(),
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            address_bid=uuid4() if i % 2 else None,
+        )
+        for i in range(rows)
+    ]
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    return Encoder(encoding, level).encode(data, last=True)
+
+
+async def max_loop_stall(middleware: CompressionMiddleware) -> float:
+    """
+    The longest the event loop goes without running a 1ms ticker while
+    `middleware` serves one gzip-compressed response.
+    """
+    longest = 0.0
+    done = False
+
+    async def tick() -> None:
+        nonlocal longest
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0.01)
+    longest = 0.0
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    await middleware(scope, receive, send)
+    done = True
+    await ticker
+    return longest
+
+
+@click.command()
+@click.option("--rows", default=100_000, show_default=True)
+@click.option("--encoding", type=click.Choice(["gzip", "deflate"]), default="gzip")
+@click.option("--repeat", default=5, show_default=True)
+def main(rows: int, encoding: str, repeat: int) -> None:
+    data = customers(rows)
+    payloads = {
+        f"page ({PAGE_SIZE} rows)": customer_page_adapter.dump_json(
+            PageBody(items=data[:PAGE_SIZE], next=None)
+        ),
+        f"export ({rows} rows)": b"".join(
+            customer_adapter.dump_json(customer) + b"\n" for customer in data
+        ),
+    }
+
+    for name, payload in payloads.items():
+        table = []
+        for level in range(1, 10):
+            compressed = compress(payload, encoding, level)
+            best = min(
+                timeit.repeat(
+                    lambda: compress(payload, encoding, level),  # noqa: B023
+                    number=1,
+                    repeat=repeat,
+                )
+            )
+            table.append(
+                (
+                    str(level),
+                    f"{len(compressed):,}",
+                    f"{len(payload) / len(compressed):.1f}x",
+                    f"{best * 1e3:.2f}",
+                    f"{len(payload) / best / 1e6:.0f}",
+                )
+            )
+        print_table(
+            f"{encoding} {name}, {len(payload):,} bytes",
+            ["level", "bytes", "ratio", "ms", "MB/s in"],
+            table,
+        )
+
+    export = payloads[f"export ({rows} rows)"]
+    app = Response(export, media_type="application/x-ndjson")
+    stalls = []
+    for label, offload_size in (("inline", len(export) + 1), ("thread", 1)):
+        middleware = CompressionMiddleware(app, offload_size=offload_size)
+        stall = asyncio.run(max_loop_stall(middleware))
+        stalls.append((label, f"{stall * 1e3:.1f}"))
+    print_table(
+        f"Event loop stall, gzip export, level {settings.compression_level}",
+        ["compressed", "longest stall ms"],
+        stalls,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+"""
+Throughput and latency of every router endpoint, driven in-process through
+`ASGITransport` against a seeded throwaway database.
+
+Each dataset size gets its own database with `size` customers spread over
+`size // 10` addresses. Every endpoint is then hit `--requests` times at each
+`--concurrency` level and the results are written as JSON. Pass a previous
+results file to `--compare` to fail the run on regressions.
+
+    uv run python -m benchmarks.endpoints --size 1000 --size 100000 --size 1000000
+    uv run python -m benchmarks.endpoints --compare benchmarks/results/baseline.json
+
+Exports stream the whole table, so they are capped at a handful of requests.
+Write endpoints grow the dataset slightly as the run goes on. The read-through
+cache is disabled unless `--cache` is passed, so detail lookups hit the database.
+"""
+
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import click
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from apat.api.main import app
+from apat.customers.cache import cache as customer_cache
+from apat.customers.crud import AddressCRUD, CustomerCRUD, CustomerStatsCRUD
+from apat.customers.models import AddressValues, CustomerValues
+from apat.database.database import conn_factory as real_conn_factory
+from apat.database.database import create_engine
+from apat.database.database import read_conn_factory as real_read_conn_factory
+from apat.settings import settings
+from benchmarks.utils import bench_database, console, percentile, print_table
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SEED_CHUNK_SIZE = 50_000
+SAMPLE_SIZE = 1_000
+EXPORT_MAX_REQUESTS = 5
+
+
+@dataclass(kw_only=True)
+class Dataset:
+    address_bids: list[UUID]
+    customer_bids: list[UUID]
+
+
+@dataclass(frozen=True, kw_only=True)
+class Request:
+    method: str
+    url: str
+    params: dict[str, Any] | None = None
+    json: Any = None
+
+
+type RequestFactory = Callable[[random.Random, Dataset], Request]
+
+
+@dataclass(frozen=True, kw_only=True)
+class Result:
+    size: int
+    endpoint: str
+    concurrency: int
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def url(name: str, **path_params: Any) -> str:
+    return app.url_path_for(name, **path_params)
+
+
+def customer_body(rng: random.Random, dataset: Dataset) -> dict[str, Any]:
+    return {
+        "first_name": f"First{rng.randrange(10_000)}",
+        "last_name": f"Last{rng.randrange(10_000)}",
+        "address_bid": str(rng.choice(dataset.address_bids)),
+    }
+
+
+def address_body(rng: random.Random, dataset: Dataset) -> dict[str, Any]:
+    n = rng.randrange(100_000)
+    return {
+        "street": f"{n} Main St",
+        "city": "Springfield",
+        "state": "IL",
+        "zip_code": f"{n:05}",
+    }
+
+
+def sample_ids(rng: random.Random, bids: list[UUID]) -> dict[str, Any]:
+    return {"ids": [str(bid) for bid in rng.sample(bids, min(20, len(bids)))]}
+
+
+ENDPOINTS: dict[str, RequestFactory] = {
+    "get_customers": lambda rng, ds: Request(method="GET", url=url("get_customers")),
+    "export_customers": lambda rng, ds: Request(
+        method="GET", url=url("export_customers")
+    ),
+    "get_customers_by_ids": lambda rng, ds: Request(
+        method="GET",
+        url=url("get_customers_by_ids"),
+        params=sample_ids(rng, ds.customer_bids),
+    ),
+    "get_customer": lambda rng, ds: Request(
+        method="GET", url=url("get_customer", bid=rng.choice(ds.customer_bids))
+    ),
+    # Seeded customers are named "First<i> Last<i>", for i from 0.
+    "search_customers": lambda rng, ds: Request(
+        method="GET",
+        url=url("search_customers"),
+        params={"q": f"Last{rng.randrange(1_000)}"},
+    ),
+    "autocomplete_customers": lambda rng, ds: Request(
+        method="GET",
+        url=url("autocomplete_customers"),
+        params={"q": f"last{rng.randrange(100)}"},
+    ),
+    "get_customer_stats": lambda rng, ds: Request(
+        method="GET",
+        url=url("get_customer_stats"),
+        params={"by": rng.choice(["state", "city", "zip_code"])},
+    ),
+    "create_customer": lambda rng, ds: Request(
+        method="POST", url=url("create_customer"), json=customer_body(rng, ds)
+    ),
+    "create_customers": lambda rng, ds: Request(
+        method="POST",
+        url=url("create_customers"),
+        json=[customer_body(rng, ds) for _ in range(100)],
+    ),
+    "get_addresses": lambda rng, ds: Request(method="GET", url=url("get_addresses")),
+    "export_addresses": lambda rng, ds: Request(
+        method="GET", url=url("export_addresses")
+    ),
+    "get_addresses_by_ids": lambda rng, ds: Request(
+        method="GET",
+        url=url("get_addresses_by_ids"),
+        params=sample_ids(rng, ds.address_bids),
+    ),
+    "get_address": lambda rng, ds: Request(
+        method="GET", url=url("get_address", bid=rng.choice(ds.address_bids))
+    ),
+    "create_address": lambda rng, ds: Request(
+        method="POST", url=url("create_address"), json=address_body(rng, ds)
+    ),
+    "create_addresses": lambda rng, ds: Request(
+        method="POST",
+        url=url("create_addresses"),
+        json=[address_body(rng, ds) for _ in range(100)],
+    ),
+}
+
+
+async def seed(conn: AsyncConnection, rng: random.Random, size: int) -> Dataset:
+    """
+    Insert `size` customers over `size // 10` addresses through the COPY path and
+    keep a random sample of their ids to request.
+    """
+    address_bids: list[UUID] = []
+    for start in range(0, max(size // 10, 1), SEED_CHUNK_SIZE):
+        count = min(SEED_CHUNK_SIZE, max(size // 10, 1) - start)
+        addresses = await AddressCRUD.create_many(
+            conn,
+            [
+                AddressValues(
+                    street=f"{start + i} Main St",
+                    city="Springfield",
+                    state="IL",
+                    zip_code=f"{(start + i) % 100_000:05}",
+                )
+                for i in range(count)
+            ],
+        )
+        address_bids.extend(address.bid for address in addresses)
+
+    customer_bids: list[UUID] = []
+    for start in range(0, size, SEED_CHUNK_SIZE):
+        count = min(SEED_CHUNK_SIZE, size - start)
+        customers = await CustomerCRUD.create_many(
+            conn,
+            [
+                CustomerValues(
+                    first_name=f"First{start + i}",
+                    last_name=f"Last{start + i}",
+                    address_bid=rng.choice(address_bids),
+                )
+                for i in range(count)
+            ],
+        )
+        customer_bids.extend(customer.bid for customer in customers)
+    await conn.commit()
+    await CustomerStatsCRUD.refresh(conn, max_age=timedelta(0))
+    await conn.commit()
+    await conn.execute(text("ANALYZE"))
+    await conn.commit()
+
+    return Dataset(
+        address_bids=rng.sample(address_bids, min(SAMPLE_SIZE, len(address_bids))),
+        customer_bids=rng.sample(customer_bids, min(SAMPLE_SIZE, len(customer_bids))),
+    )
+
+
+async def drive(
+    client: AsyncClient,
+    make_request: RequestFactory,
+    rng: random.Random,
+    dataset: Dataset,
+    requests: int,
+    concurrency: int,
+) -> tuple[list[float], int, float]:
+    """
+    Send `requests` requests from `concurrency` workers. Returns the per-request
+    latencies, the number of non-2xx responses and the wall-clock time.
+    """
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            request = make_request(rng, dataset)
+            start = time.perf_counter()
+            response = await client.request(
+                request.method, request.url, params=request.params, json=request.json
+            )
+            latencies.append(time.perf_counter() - start)
+            if not response.is_success:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+@asynccontextmanager
+async def bench_client(
+    bench_engine: AsyncEngine, pool_size: int
+) -> AsyncGenerator[AsyncClient]:
+    """
+    Serve the app from a pool big enough for the highest concurrency level, built
+    the same way as the application's own engine.
+    """
+    engine = create_engine(
+        bench_engine.url.render_as_string(hide_password=False),
+        settings.model_copy(update={"database_pool_size": pool_size}),
+    )
+
+    @asynccontextmanager
+    async def connect() -> AsyncGenerator[AsyncConnection]:
+        async with engine.connect() as conn:
+            yield conn
+
+    app.dependency_overrides[real_conn_factory] = lambda: connect
+    app.dependency_overrides[real_read_conn_factory] = lambda: connect
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+async def run_size(
+    size: int,
+    endpoints: list[str],
+    concurrency_levels: list[int],
+    requests: int,
+    rng: random.Random,
+) -> list[Result]:
+    results = []
+    async with bench_database(f"endpoints_{size}") as engine:
+        with console.status(f"Seeding {size} customers"):
+            async with engine.connect() as conn:
+                dataset = await seed(conn, rng, size)
+
+        async with bench_client(engine, max(concurrency_levels)) as client:
+            for name in endpoints:
+                make_request = ENDPOINTS[name]
+                count = requests
+                if name.startswith("export_"):
+                    count = min(requests, EXPORT_MAX_REQUESTS)
+                # Warm up the pool, prepared statements and compiled caches.
+                await drive(client, make_request, rng, dataset, 5, 1)
+                for concurrency in concurrency_levels:
+                    latencies, errors, elapsed = await drive(
+                        client, make_request, rng, dataset, count, concurrency
+                    )
+                    results.append(
+                        Result(
+                            size=size,
+                            endpoint=name,
+                            concurrency=concurrency,
+                            requests=count,
+                            errors=errors,
+                            throughput=count / elapsed,
+                            p50_ms=percentile(latencies, 50) * 1e3,
+                            p95_ms=percentile(latencies, 95) * 1e3,
+                            p99_ms=percentile(latencies, 99) * 1e3,
+                        )
+                    )
+    return results
+
+
+def regressions(
+    results: list[Result], baseline: list[Result], tolerance: float
+) -> list[tuple[Result, Result]]:
+    """
+    Pair up results with the baseline run and return those whose throughput
+    dropped, or p95 latency grew, by more than `tolerance`.
+    """
+    previous = {(r.size, r.endpoint, r.concurrency): r for r in baseline}
+    found = []
+    for result in results:
+        before = previous.get((result.size, result.endpoint, result.concurrency))
+        if before is None:
+            continue
+        if (
+            result.throughput < before.throughput * (1 - tolerance)
+            or result.p95_ms > before.p95_ms * (1 + tolerance)
+            or result.errors > before.errors
+        ):
+            found.append((before, result))
+    return found
+
+
+def load_results(path: Path) -> list[Result]:
+    return [Result(**result) for result in json.loads(path.read_text())["results"]]
+
+
+def save_results(path: Path, results: list[Result], options: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "created_at": datetime.now(UTC).isoformat(),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "options": options,
+        "results": [asdict(result) for result in results],
+    }
+    path.write_text(json.dumps(document, indent=2))
+
+
+@click.command()
+@click.option("--size", "sizes", multiple=True, type=int, default=[1_000])
+@click.option("--concurrency", "concurrency_levels", multiple=True, type=int)
+@click.option("--requests", default=200, show_default=True)
+@click.option(
+    "--endpoint",
+    "endpoints",
+    multiple=True,
+    type=click.Choice(list(ENDPOINTS)),
+    help="Only benchmark these endpoints. Defaults to all of them.",
+)
+@click.option("--cache/--no-cache", default=False, show_default=True)
+@click.option("--seed", "random_seed", default=0, show_default=True)
+@click.option("--output", type=click.Path(path_type=Path))
+@click.option("--compare", type=click.Path(exists=True, path_type=Path))
+@click.option("--tolerance", default=0.1, show_default=True)
+def main(
+    sizes: tuple[int, ...],
+    concurrency_levels: tuple[int, ...],
+    requests: int,
+    endpoints: tuple[str, ...],
+    cache: bool,
+    random_seed: int,
+    output: Path | None,
+    compare: Path | None,
+    tolerance: float,
+) -> None:
+    levels = list(concurrency_levels or (1, 10, 50))
+    selected = list(endpoints or ENDPOINTS)
+    rng = random.Random(random_seed)
+    customer_cache.enabled = cache
+
+    results: list[Result] = []
+    for size in sizes:
+        results += asyncio.run(run_size(size, selected, levels, requests, rng))
+
+    print_table(
+        "Endpoint throughput and latency",
+        [
+            "size",
+            "endpoint",
+            "concurrency",
+            "req/s",
+            "p50 ms",
+            "p95 ms",
+            "p99 ms",
+            "errors",
+        ],
+        [
+            (
+                str(r.size),
+                r.endpoint,
+                str(r.concurrency),
+                f"{r.throughput:.0f}",
+                f"{r.p50_ms:.2f}",
+                f"{r.p95_ms:.2f}",
+                f"{r.p99_ms:.2f}",
+                str(r.errors),
+            )
+            for r in results
+        ],
+    )
+
+    if output is None:
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S")
+        output = RESULTS_DIR / f"endpoints-{stamp}.json"
+    options = {
+        "sizes": list(sizes),
+        "concurrency": levels,
+        "requests": requests,
+        "cache": cache,
+        "seed": random_seed,
+    }
+    save_results(output, results, options)
+    console.print(f"Results saved to {output}")
+
+    if compare is not None:
+        found = regressions(results, load_results(compare), tolerance)
+        if found:
+            print_table(
+                f"Regressions against {compare} (tolerance {tolerance:.0%})",
+                ["size", "endpoint", "concurrency", "req/s", "p95 ms", "errors"],
+                [
+                    (
+                        str(after.size),
+                        after.endpoint,
+                        str(after.concurrency),
+                        f"{before.throughput:.0f} → {after.throughput:.0f}",
+                        f"{before.p95_ms:.2f} → {after.p95_ms:.2f}",
+                        f"{before.errors} → {after.errors}",
+                    )
+                    for before, after in found
+                ],
+            )
+            raise SystemExit(1)
+        console.print(f"No regressions against {compare}")
+
+
+if __name__ == "__main__":
+    main()
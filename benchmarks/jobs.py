@@ -0,0 +1,123 @@
+"""
+Job queue throughput: enqueueing with one transaction per job or many jobs per
+transaction, and draining the queue at different concurrency and claim batch
+sizes, with one worker or several sharing the table.
+
+    uv run python -m benchmarks.jobs --jobs 5000 --latency 0.02
+"""
+
+import asyncio
+from typing import Any
+
+import click
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from apat.jobs.crud import JobCRUD
+from apat.jobs.tables import JobsTable
+from apat.jobs.worker import Worker
+from benchmarks.utils import Timer, bench_database, print_table
+
+ENQUEUE_BATCH = 100
+# (workers, concurrency per worker, claim batch size)
+WORKER_SETUPS = [(1, 1, 1), (1, 10, 1), (1, 10, 10), (1, 50, 50), (4, 50, 50)]
+
+
+async def enqueue(engine: AsyncEngine, jobs: int, per_transaction: int) -> None:
+    for start in range(0, jobs, per_transaction):
+        async with engine.connect() as conn:
+            for i in range(start, min(start + per_transaction, jobs)):
+                await JobCRUD.enqueue(conn, "sleep", {"i": i})
+            await conn.commit()
+
+
+async def queued(engine: AsyncEngine) -> int:
+    async with engine.connect() as conn:
+        count = await conn.execute(select(func.count()).select_from(JobsTable))
+        return count.scalar_one()
+
+
+async def drain(
+    engine: AsyncEngine,
+    latency: float,
+    workers: int,
+    concurrency: int,
+    batch_size: int,
+) -> None:
+    async def sleep(payload: dict[str, Any]) -> None:
+        await asyncio.sleep(latency)
+
+    pool = [
+        Worker(
+            engine.connect,
+            {"sleep": sleep},
+            concurrency=concurrency,
+            batch_size=batch_size,
+            poll_interval=0.01,
+        )
+        for _ in range(workers)
+    ]
+    tasks = [asyncio.create_task(worker.run()) for worker in pool]
+    while await queued(engine):
+        await asyncio.sleep(0.01)
+    for worker in pool:
+        worker.stop()
+    await asyncio.gather(*tasks)
+
+
+async def run(jobs: int, latency: float) -> None:
+    async with bench_database("bench") as engine:
+        enqueue_results = []
+        for per_transaction in (1, ENQUEUE_BATCH):
+            with Timer() as timer:
+                await enqueue(engine, jobs, per_transaction)
+            enqueue_results.append((per_transaction, timer.elapsed))
+        print_table(
+            "Enqueue throughput",
+            ["jobs per transaction", "jobs", "seconds", "jobs/s"],
+            [
+                (str(n), str(jobs), f"{elapsed:.3f}", f"{jobs / elapsed:,.0f}")
+                for n, elapsed in enqueue_results
+            ],
+        )
+
+        # Both enqueue runs are queued; drain them with the first setup.
+        queue_size = jobs * 2
+        drain_results = []
+        for workers, concurrency, batch_size in WORKER_SETUPS:
+            if not await queued(engine):
+                await enqueue(engine, queue_size, ENQUEUE_BATCH)
+            with Timer() as timer:
+                await drain(engine, latency, workers, concurrency, batch_size)
+            drain_results.append((workers, concurrency, batch_size, timer.elapsed))
+
+    print_table(
+        f"Drain throughput, {queue_size} jobs of {latency * 1e3:.0f}ms each",
+        ["workers", "concurrency", "batch size", "seconds", "jobs/s"],
+        [
+            (
+                str(workers),
+                str(concurrency),
+                str(batch_size),
+                f"{elapsed:.3f}",
+                f"{queue_size / elapsed:,.0f}",
+            )
+            for workers, concurrency, batch_size, elapsed in drain_results
+        ],
+    )
+
+
+@click.command()
+@click.option("--jobs", default=1_000, show_default=True)
+@click.option(
+    "--latency",
+    default=0.02,
+    show_default=True,
+    help="Seconds each job waits, standing in for an SMTP or API call.",
+)
+def main(jobs: int, latency: float) -> None:
+    asyncio.run(run(jobs, latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Per-call cost of the hot reads on SQLAlchemy Core versus the raw asyncpg path
+(`settings.database_raw_reads`), on one connection against a throwaway database.
+
+Both include the round trip; the difference is SQLAlchemy's execution and result
+layers against mapping asyncpg records directly, which grows with the rows read.
+
+    uv run python -m benchmarks.raw_reads --executions 2000
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import UUID
+
+import click
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from apat.customers.crud import AddressCRUD, CustomerCRUD
+from apat.customers.models import AddressValues, CustomerValues
+from apat.settings import settings
+from benchmarks.utils import bench_database, print_table
+
+ADDRESSES = 1_000
+CUSTOMERS_PER_ADDRESS = 5
+
+type Read = Callable[[AsyncConnection], Awaitable[Any]]
+
+
+async def seed(conn: AsyncConnection) -> tuple[UUID, UUID, list[UUID]]:
+    addresses = await AddressCRUD.create_many(
+        conn,
+        [
+            AddressValues(
+                street=f"{i} Main St", city="Springfield", state="IL", zip_code="1"
+            )
+            for i in range(ADDRESSES)
+        ],
+    )
+    customers = await CustomerCRUD.create_many(
+        conn,
+        [
+            CustomerValues(
+                first_name=f"First{i}", last_name=f"Last{i}", address_bid=address.bid
+            )
+            for address in addresses
+            for i in range(CUSTOMERS_PER_ADDRESS)
+        ],
+    )
+    await conn.commit()
+    return addresses[0].bid, customers[0].bid, [c.bid for c in customers[:50]]
+
+
+def reads(
+    address_bid: UUID, customer_bid: UUID, customer_bids: list[UUID]
+) -> dict[str, Read]:
+    return {
+        "customer with address": lambda conn: CustomerCRUD.get_by_id_with_customer(
+            conn, customer_bid
+        ),
+        "address with customers": lambda conn: AddressCRUD.get_by_id_with_customers(
+            conn, address_bid
+        ),
+        "50 customers with address": lambda conn: CustomerCRUD.get_many_with_address(
+            conn, customer_bids
+        ),
+        "customers page of 50": lambda conn: CustomerCRUD.get_all(conn, limit=50),
+        "customers page of 500": lambda conn: CustomerCRUD.get_all(conn, limit=500),
+        "addresses page of 500": lambda conn: AddressCRUD.get_all(conn, limit=500),
+    }
+
+
+async def cost(conn: AsyncConnection, read: Read, raw: bool, executions: int) -> float:
+    settings.database_raw_reads = raw
+    # Warm up SQLAlchemy's compiled cache and both prepared statement caches.
+    for _ in range(10):
+        await read(conn)
+    start = time.perf_counter()
+    for _ in range(executions):
+        await read(conn)
+    return (time.perf_counter() - start) / executions * 1e6
+
+
+async def run(executions: int) -> None:
+    rows = []
+    async with bench_database() as engine, engine.connect() as conn:
+        bids = await seed(conn)
+        for name, read in reads(*bids).items():
+            core = await cost(conn, read, False, executions)
+            raw = await cost(conn, read, True, executions)
+            rows.append((name, f"{core:.0f}", f"{raw:.0f}", f"{core / raw:.2f}x"))
+            await conn.rollback()
+
+    print_table(
+        f"Per-call cost (µs), {executions} calls each",
+        ["read", "core", "raw", "speedup"],
+        rows,
+    )
+
+
+@click.command()
+@click.option("--executions", default=2_000, show_default=True)
+def main(executions: int) -> None:
+    asyncio.run(run(executions))
+
+
+if __name__ == "__main__":
+    main()
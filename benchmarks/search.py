@@ -0,0 +1,151 @@
+"""
+Latency of the indexed customer search and autocomplete queries versus a
+naive `ILIKE '%term%'` scan over the name columns.
+
+Names are drawn from common first names and surname stems with a random suffix,
+so terms are neither unique nor shared by every row. Search terms are surnames
+with one letter changed; autocomplete terms are 3-5 letter surname prefixes.
+
+    uv run python -m benchmarks.search --rows 1000000 --queries 500
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+
+import click
+from sqlalchemy import or_, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from apat.customers.crud import CustomerCRUD
+from apat.customers.models import CustomerValues
+from apat.customers.tables import CustomersTable
+from benchmarks.utils import bench_database, console, percentile, print_table
+
+FIRST_NAMES = (
+    "Ada Alan Alice Barbara Carl David Edsger Emma Frances Grace Hedy Ivan John "
+    "Karen Linus Margaret Mary Niklaus Olga Peter Radia Sophie Tim Ursula Vint"
+).split()
+SURNAME_STEMS = (
+    "Anders Berg Carl Dahl Eriks Fisch Gold Hart Isak Jans Karl Lind Mont Nord "
+    "Olof Peder Quist Ros Stein Thor Ulf Vall Wester Young Zimmer"
+).split()
+SURNAME_ENDINGS = "son sen berg ström man mann feld holm lund quist".split()
+SEED_CHUNK_SIZE = 50_000
+LIMIT = 10
+
+type Query = Callable[[AsyncConnection, str], Awaitable[object]]
+
+
+def surname(rng: random.Random) -> str:
+    return (
+        f"{rng.choice(SURNAME_STEMS)}{rng.choice(SURNAME_ENDINGS)}{rng.randrange(100)}"
+    )
+
+
+def misspell(rng: random.Random, term: str) -> str:
+    i = rng.randrange(len(term))
+    return term[:i] + rng.choice("aeiouy") + term[i + 1 :]
+
+
+async def naive(conn: AsyncConnection, term: str) -> object:
+    pattern = f"%{term}%"
+    query = (
+        select(CustomersTable)
+        .where(
+            or_(
+                CustomersTable.first_name.ilike(pattern),
+                CustomersTable.last_name.ilike(pattern),
+            )
+        )
+        .order_by(CustomersTable.last_name, CustomersTable.id)
+        .limit(LIMIT)
+    )
+    return (await conn.execute(query)).all()
+
+
+async def seed(conn: AsyncConnection, rng: random.Random, rows: int) -> None:
+    for start in range(0, rows, SEED_CHUNK_SIZE):
+        await CustomerCRUD.create_many(
+            conn,
+            [
+                CustomerValues(
+                    first_name=rng.choice(FIRST_NAMES), last_name=surname(rng)
+                )
+                for _ in range(min(SEED_CHUNK_SIZE, rows - start))
+            ],
+        )
+    await conn.commit()
+    # Flush the trigram index's pending list and refresh statistics.
+    await conn.execution_options(isolation_level="AUTOCOMMIT")
+    await conn.execute(text("VACUUM ANALYZE customers"))
+
+
+async def measure(conn: AsyncConnection, query: Query, terms: list[str]) -> list[float]:
+    for term in terms[:10]:
+        await query(conn, term)
+    latencies = []
+    for term in terms:
+        start = time.perf_counter()
+        await query(conn, term)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(rows: int, queries: int) -> None:
+    rng = random.Random(0)
+    async with bench_database("search") as engine:
+        with console.status(f"Seeding {rows} customers"):
+            async with engine.connect() as conn:
+                await seed(conn, rng, rows)
+
+        misspelt = [misspell(rng, surname(rng)) for _ in range(queries)]
+        prefixes = [surname(rng)[: rng.randint(3, 5)] for _ in range(queries)]
+        cases: list[tuple[str, Query, list[str]]] = [
+            (
+                "search (trigram)",
+                lambda conn, term: CustomerCRUD.search(conn, term, LIMIT),
+                misspelt,
+            ),
+            ("search (naive ILIKE)", naive, misspelt),
+            (
+                "autocomplete (prefix index)",
+                lambda conn, term: CustomerCRUD.autocomplete(conn, term, LIMIT),
+                prefixes,
+            ),
+            ("autocomplete (naive ILIKE)", naive, prefixes),
+        ]
+
+        results = []
+        async with engine.connect() as conn:
+            for name, query, terms in cases:
+                # The naive scan is slow enough that a fraction of the terms will do.
+                if "naive" in name:
+                    terms = terms[: max(queries // 10, 20)]
+                latencies = await measure(conn, query, terms)
+                results.append((name, len(terms), latencies))
+
+    print_table(
+        f"Name lookup latency over {rows} customers (ms)",
+        ["query", "runs", "p50", "p95", "p99"],
+        [
+            (
+                name,
+                str(runs),
+                *(f"{percentile(latencies, pct) * 1e3:.2f}" for pct in (50, 95, 99)),
+            )
+            for name, runs, latencies in results
+        ],
+    )
+
+
+@click.command()
+@click.option("--rows", default=200_000, show_default=True)
+@click.option("--queries", default=500, show_default=True)
+def main(rows: int, queries: int) -> None:
+    asyncio.run(run(rows, queries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-row cost of turning `models` dataclasses into a JSON list response.
+
+"before" mirrors what FastAPI did for the list endpoints when they returned
+`PageResponse[CustomerResponse]`: `from_model` per row, `model_dump` of the
+returned model, validation against `response_model`, JSON-mode serialization and
+`json.dumps` in `JSONResponse.render`. "after" is the `TypeAdapter.dump_json` path
+the endpoints use now. No database is needed.
+
+    uv run python -m benchmarks.serialization --rows 1000
+"""
+
+import json
+import timeit
+from uuid import uuid4
+
+import click
+from pydantic import TypeAdapter
+
+from apat.api.pagination import PageBody, PageResponse
+from apat.customers.models import Customer
+from apat.customers.schema import CustomerResponse, customer_page_adapter
+from benchmarks.utils import print_table
+
+response_adapter = TypeAdapter(PageResponse[CustomerResponse])
+
+
+def before(customers: list[Customer]) -> bytes:
+    page = PageResponse(
+        items=[CustomerResponse.from_model(customer) for customer in customers],
+        next=None,
+    )
+    content = response_adapter.validate_python(page.model_dump())
+    return json.dumps(
+        response_adapter.dump_python(content, mode="json"),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def after(customers: list[Customer]) -> bytes:
+    return customer_page_adapter.dump_json(PageBody(items=customers, next=None))
+
+
+@click.command()
+@click.option("--rows", default=1_000, show_default=True)
+@click.option("--repeat", default=50, show_default=True)
+def main(rows: int, repeat: int) -> None:
+    customers = [
+        Customer(
+            bid=uuid4(),
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            address_bid=uuid4() if i % 2 else None,
+        )
+        for i in range(rows)
+    ]
+    assert json.loads(before(customers)) == json.loads(after(customers))
+
+    results = []
+    for name, fn in (("before", before), ("after", after)):
+        best = min(timeit.repeat(lambda: fn(customers), number=1, repeat=repeat))
+        results.append((name, best / rows * 1e6))
+
+    baseline = results[0][1]
+    print_table(
+        f"List serialization, {rows} rows",
+        ["path", "µs/row", "speedup"],
+        [
+            (name, f"{per_row:.2f}", f"{baseline / per_row:.1f}x")
+            for name, per_row in results
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Python-side cost per query of rebuilding CRUD statements versus reusing the
+module-level constructs in `apat.customers.crud`.
+
+"construct" times what SQLAlchemy does before it can hit its compiled cache:
+building the statement and generating its cache key (memoized on a reused
+construct). "execute" is a full round trip against a throwaway database.
+
+    uv run python -m benchmarks.statements --executions 2000
+"""
+
+import asyncio
+import time
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+import click
+from sqlalchemy import Executable, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from apat.customers import crud
+from apat.customers.models import Address, Customer
+from apat.customers.tables import AddressTable, CustomersTable
+from benchmarks.utils import bench_database, print_table
+
+type Query = tuple[Executable, dict[str, Any] | None]
+type QueryFactory = Callable[[Address, Customer], Query]
+
+
+def rebuilt_address_with_customers(address: Address, customer: Customer) -> Query:
+    statement = (
+        select(AddressTable, CustomersTable, CustomersTable.id.label("customer_id"))
+        .where(AddressTable.id == address.bid)
+        .outerjoin(CustomersTable, AddressTable.id == CustomersTable.address_id)
+    )
+    return statement, None
+
+
+def rebuilt_customer_with_address(address: Address, customer: Customer) -> Query:
+    statement = (
+        select(CustomersTable, AddressTable)
+        .where(CustomersTable.id == customer.bid)
+        .outerjoin(AddressTable, CustomersTable.address_id == AddressTable.id)
+    )
+    return statement, None
+
+
+def rebuilt_insert_customer(address: Address, customer: Customer) -> Query:
+    statement = (
+        insert(CustomersTable)
+        .values(first_name="Ada", last_name="Lovelace", address_id=address.bid)
+        .returning(CustomersTable)
+    )
+    return statement, None
+
+
+def cached_address_with_customers(address: Address, customer: Customer) -> Query:
+    return crud.SELECT_ADDRESS_WITH_CUSTOMERS, {"bid": address.bid}
+
+
+def cached_customer_with_address(address: Address, customer: Customer) -> Query:
+    return crud.SELECT_CUSTOMER_WITH_ADDRESS, {"bid": customer.bid}
+
+
+def cached_insert_customer(address: Address, customer: Customer) -> Query:
+    values = {"first_name": "Ada", "last_name": "Lovelace", "address_id": address.bid}
+    return crud.INSERT_CUSTOMER, values
+
+
+QUERIES = {
+    "address with customers": (
+        rebuilt_address_with_customers,
+        cached_address_with_customers,
+    ),
+    "customer with address": (
+        rebuilt_customer_with_address,
+        cached_customer_with_address,
+    ),
+    "insert customer": (rebuilt_insert_customer, cached_insert_customer),
+}
+
+
+def construct_cost(make: QueryFactory, address: Address, customer: Customer) -> float:
+    number = 2_000
+    total = min(
+        timeit.repeat(
+            lambda: make(address, customer)[0]._generate_cache_key(),
+            number=number,
+            repeat=5,
+        )
+    )
+    return total / number * 1e6
+
+
+async def execute_cost(
+    conn: AsyncConnection,
+    make: QueryFactory,
+    address: Address,
+    customer: Customer,
+    executions: int,
+) -> float:
+    start = time.perf_counter()
+    for _ in range(executions):
+        await conn.execute(*make(address, customer))
+    return (time.perf_counter() - start) / executions * 1e6
+
+
+async def run(executions: int) -> None:
+    rows = []
+    async with bench_database() as engine, engine.connect() as conn:
+        address = await crud.AddressCRUD.create(
+            conn, street="1 Main St", city="Springfield", state="IL", zip_code="1"
+        )
+        customer = await crud.CustomerCRUD.create(
+            conn, first_name="Ada", last_name="Lovelace", address_bid=address.bid
+        )
+        for name, (rebuilt, cached) in QUERIES.items():
+            # Warm up SQLAlchemy's compiled cache and the prepared statements.
+            for make in (rebuilt, cached):
+                await execute_cost(conn, make, address, customer, 10)
+            before = await execute_cost(conn, rebuilt, address, customer, executions)
+            after = await execute_cost(conn, cached, address, customer, executions)
+            rows.append(
+                (
+                    name,
+                    f"{construct_cost(rebuilt, address, customer):.1f}",
+                    f"{construct_cost(cached, address, customer):.1f}",
+                    f"{before:.0f}",
+                    f"{after:.0f}",
+                )
+            )
+        await conn.rollback()
+
+    print_table(
+        "Per-query cost (µs)",
+        [
+            "query",
+            "construct before",
+            "construct after",
+            "execute before",
+            "execute after",
+        ],
+        rows,
+    )
+
+
+@click.command()
+@click.option("--executions", default=2_000, show_default=True)
+def main(executions: int) -> None:
+    asyncio.run(run(executions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Customer stats read from the `customer_stats` rollup versus the same counts
+grouped live over `customers` joined to `addresses`, as the number of customers
+grows, and how long a concurrent refresh of the rollup takes.
+
+    uv run python -m benchmarks.stats --sizes 100000,1000000 --zip-codes 10000
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import Any
+from uuid import UUID
+
+import click
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from apat.customers.crud import AddressCRUD, CustomerCRUD, CustomerStatsCRUD
+from apat.customers.models import AddressValues, CustomerValues, StatsLevel
+from apat.customers.tables import AddressTable, CustomersTable
+from benchmarks.utils import Timer, bench_database, print_table
+
+STATES = 50
+INSERT_BATCH = 100_000
+READS = 20
+
+LIVE_BY_STATE = (
+    select(AddressTable.state, func.count())
+    .select_from(CustomersTable)
+    .join(AddressTable, AddressTable.id == CustomersTable.address_id)
+    .group_by(AddressTable.state)
+    .order_by(AddressTable.state)
+)
+
+
+async def add_addresses(conn: AsyncConnection, zip_codes: int) -> list[UUID]:
+    addresses = await AddressCRUD.create_many(
+        conn,
+        [
+            AddressValues(
+                street=f"{i} Main St",
+                city=f"City {i // 10}",
+                state=f"S{i % STATES:02}",
+                zip_code=f"{i:05}",
+            )
+            for i in range(zip_codes)
+        ],
+    )
+    await conn.commit()
+    return [address.bid for address in addresses]
+
+
+async def add_customers(conn: AsyncConnection, bids: list[UUID], count: int) -> None:
+    for start in range(0, count, INSERT_BATCH):
+        await CustomerCRUD.create_many(
+            conn,
+            [
+                CustomerValues(
+                    first_name="Ada",
+                    last_name="Lovelace",
+                    address_bid=random.choice(bids),
+                )
+                for _ in range(min(INSERT_BATCH, count - start))
+            ],
+        )
+        await conn.commit()
+
+
+async def mean_ms(read: Callable[[], Awaitable[Any]]) -> float:
+    await read()
+    start = time.perf_counter()
+    for _ in range(READS):
+        await read()
+    return (time.perf_counter() - start) / READS * 1e3
+
+
+async def run(sizes: list[int], zip_codes: int) -> None:
+    rows = []
+    async with bench_database() as engine, engine.connect() as conn:
+        bids = await add_addresses(conn, zip_codes)
+        customers = 0
+        for size in sizes:
+            await add_customers(conn, bids, size - customers)
+            customers = size
+            with Timer() as refresh:
+                await CustomerStatsCRUD.refresh(conn, max_age=timedelta(0))
+                await conn.commit()
+
+            async def live() -> None:
+                (await conn.execute(LIVE_BY_STATE)).all()
+                await conn.rollback()
+
+            async def rollup(by: StatsLevel) -> None:
+                await CustomerStatsCRUD.get(conn, by)
+                await conn.rollback()
+
+            rows.append(
+                (
+                    f"{size:,}",
+                    f"{await mean_ms(live):.2f}",
+                    f"{await mean_ms(lambda: rollup('state')):.2f}",
+                    f"{await mean_ms(lambda: rollup('zip_code')):.2f}",
+                    f"{refresh.elapsed * 1e3:,.0f}",
+                )
+            )
+
+    print_table(
+        f"Customer stats, {zip_codes:,} zip codes (ms)",
+        [
+            "customers",
+            "live by state",
+            "rollup by state",
+            "rollup by zip code",
+            "refresh",
+        ],
+        rows,
+    )
+
+
+@click.command()
+@click.option("--sizes", default="100000,1000000", show_default=True)
+@click.option("--zip-codes", default=10_000, show_default=True)
+def main(sizes: str, zip_codes: int) -> None:
+    asyncio.run(run([int(size) for size in sizes.split(",")], zip_codes))
+
+
+if __name__ == "__main__":
+    main()
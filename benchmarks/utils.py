@@ -0,0 +1,67 @@
+import statistics
+import time
+from collections.abc import AsyncGenerator, Iterable
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse, urlunparse
+
+from pydantic import PostgresDsn
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from apat.database.database import engine
+from apat.settings import settings
+from tests.conftest import create_test_database, migrate_test_db
+
+console = Console()
+
+
+@asynccontextmanager
+async def bench_database(suffix: str = "bench") -> AsyncGenerator[AsyncEngine]:
+    """
+    Create and migrate a throwaway `<db>_<suffix>` database for a benchmark run.
+    """
+    url = urlparse(str(settings.database_dsn))
+    bench_url = PostgresDsn(urlunparse(url._replace(path=f"{url.path}_{suffix}")))
+
+    async with engine.connect() as connection:
+        await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await create_test_database(connection, bench_url)
+    await engine.dispose()
+
+    bench_engine = create_async_engine(str(bench_url))
+    try:
+        async with bench_engine.connect() as connection:
+            await connection.run_sync(migrate_test_db, test_db_url=bench_url)
+        yield bench_engine
+    finally:
+        await bench_engine.dispose()
+
+
+class Timer:
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.elapsed = time.perf_counter() - self._start
+
+
+def percentile(samples: list[float], pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def print_table(
+    title: str, columns: Iterable[str], rows: Iterable[Iterable[str]]
+) -> None:
+    table = Table(title=title)
+    for column in columns:
+        table.add_column(column, justify="right")
+    for row in rows:
+        table.add_row(*row)
+    console.print(table)
@@ -0,0 +1,118 @@
+"""
+Insert throughput and primary key index size with random (v4) versus
+time-ordered (v7) UUID keys, filling one table per key kind batch by batch.
+
+Random keys insert into every leaf page of the index in turn, so once it outgrows
+shared_buffers most inserts read a page back in, and splits leave pages half
+empty. Time-ordered keys append to the rightmost leaf. The last tenth of the run
+shows the steady state at full size; WAL includes the full-page images written the
+first time a page changes after each checkpoint.
+
+    uv run python -m benchmarks.uuid_keys --rows 10000000 --batch 100000
+"""
+
+import asyncio
+
+import click
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.utils import Timer, bench_database, print_table
+
+KEYS = {"v4": "gen_random_uuid()", "v7": "uuid_generate_v7()"}
+
+
+async def fill(
+    engine: AsyncEngine, name: str, default: str, rows: int, batch: int
+) -> tuple[list[float], int, int, int]:
+    """
+    Insert `rows` rows into a new table keyed on `default`, one transaction per
+    `batch`. Returns each batch's seconds, the WAL written and the sizes of the
+    primary key index and of the table, in bytes.
+    """
+    table = f"uuid_keys_{name}"
+    async with engine.connect() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        await conn.execute(
+            text(
+                f"CREATE TABLE {table} ("
+                f"id uuid PRIMARY KEY DEFAULT {default}, "
+                f"created_at timestamptz NOT NULL DEFAULT now(), "
+                f"payload text NOT NULL)"
+            )
+        )
+        await conn.commit()
+        await conn.execute(text("CHECKPOINT"))
+        wal_start = await conn.scalar(text("SELECT pg_current_wal_lsn()"))
+
+        elapsed = []
+        insert = text(
+            f"INSERT INTO {table} (payload) "
+            f"SELECT md5(i::text) FROM generate_series(1, :batch) AS i"
+        )
+        for start in range(0, rows, batch):
+            with Timer() as timer:
+                await conn.execute(insert, {"batch": min(batch, rows - start)})
+                await conn.commit()
+            elapsed.append(timer.elapsed)
+
+        wal = await conn.scalar(
+            text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :start)"),
+            {"start": wal_start},
+        )
+        index_size = await conn.scalar(
+            text("SELECT pg_relation_size(:index)"), {"index": f"{table}_pkey"}
+        )
+        table_size = await conn.scalar(
+            text("SELECT pg_relation_size(:table)"), {"table": table}
+        )
+        await conn.execute(text(f"DROP TABLE {table}"))
+        await conn.commit()
+    return elapsed, int(wal), index_size, table_size
+
+
+async def run(rows: int, batch: int) -> None:
+    results = []
+    async with bench_database() as engine:
+        for name, default in KEYS.items():
+            elapsed, wal, index_size, table_size = await fill(
+                engine, name, default, rows, batch
+            )
+            tail = elapsed[-max(len(elapsed) // 10, 1) :]
+            tail_rows = min(len(tail) * batch, rows)
+            results.append(
+                (
+                    name,
+                    f"{sum(elapsed):.1f}",
+                    f"{rows / sum(elapsed):,.0f}",
+                    f"{tail_rows / sum(tail):,.0f}",
+                    f"{wal / 2**20:,.0f}",
+                    f"{index_size / 2**20:,.0f}",
+                    f"{table_size / 2**20:,.0f}",
+                )
+            )
+
+    print_table(
+        f"{rows:,} rows in batches of {batch:,}",
+        [
+            "key",
+            "seconds",
+            "rows/s",
+            "rows/s, last 10%",
+            "WAL MiB",
+            "pkey MiB",
+            "table MiB",
+        ],
+        results,
+    )
+
+
+@click.command()
+@click.option("--rows", default=10_000_000, show_default=True)
+@click.option("--batch", default=100_000, show_default=True)
+def main(rows: int, batch: int) -> None:
+    asyncio.run(run(rows, batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ from alembic import context
 
 from apat.customers.tables import AddressTable, CustomersTable
 from apat.database.database import metadata
+from apat.jobs.tables import JobsTable
 from apat.settings import settings
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,54 @@
+"""add keyset pagination indexes
+
+Revision ID: 3f1c7a92d5e4
+Revises: 90096645dccd
+Create Date: 2026-10-18 09:12:41.203518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c7a92d5e4"
+down_revision: Union[str, None] = "90096645dccd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination compares `(created_at, id)` row values, which never match
+    # a NULL `created_at` - the server default always fills it in, so enforce it.
+    for table in ("addresses", "customers"):
+        op.execute(
+            f"UPDATE {table} SET created_at = updated_at WHERE created_at IS NULL"
+        )
+        op.alter_column(
+            table,
+            "created_at",
+            existing_type=sa.DateTime(timezone=True),
+            existing_server_default=sa.text("current_timestamp(0)"),
+            nullable=False,
+        )
+    op.create_index(
+        "ix_addresses_created_at_id", "addresses", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_customers_created_at_id", "customers", ["created_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_customers_created_at_id", table_name="customers")
+    op.drop_index("ix_addresses_created_at_id", table_name="addresses")
+    for table in ("addresses", "customers"):
+        op.alter_column(
+            table,
+            "created_at",
+            existing_type=sa.DateTime(timezone=True),
+            existing_server_default=sa.text("current_timestamp(0)"),
+            nullable=True,
+        )
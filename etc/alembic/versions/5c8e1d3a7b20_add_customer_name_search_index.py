@@ -0,0 +1,44 @@
+"""add customer name search indexes
+
+Revision ID: 5c8e1d3a7b20
+Revises: b7d2e4f19a06
+Create Date: 2026-10-18 14:48:37.092611
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c8e1d3a7b20"
+down_revision: Union[str, None] = "b7d2e4f19a06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # pg_trgm is a trusted extension, so the database owner can create it.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_customers_full_name_trgm",
+        "customers",
+        [sa.text("(first_name || ' ' || last_name) gin_trgm_ops")],
+        unique=False,
+        postgresql_using="gin",
+    )
+    for column in ("first_name", "last_name"):
+        op.create_index(
+            f"ix_customers_{column}_prefix",
+            "customers",
+            [sa.text(f'lower({column}) COLLATE "C"'), "id"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_customers_last_name_prefix", table_name="customers")
+    op.drop_index("ix_customers_first_name_prefix", table_name="customers")
+    op.drop_index("ix_customers_full_name_trgm", table_name="customers")
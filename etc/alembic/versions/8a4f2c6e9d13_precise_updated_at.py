@@ -0,0 +1,37 @@
+"""precise updated_at
+
+Revision ID: 8a4f2c6e9d13
+Revises: 5c8e1d3a7b20
+Create Date: 2026-10-18 15:02:41.730118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8a4f2c6e9d13"
+down_revision: Union[str, None] = "5c8e1d3a7b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("addresses", "customers")
+
+
+def upgrade() -> None:
+    # `updated_at` versions rows for ETags, so two writes within one second must
+    # not leave it unchanged.
+    for table in TABLES:
+        op.alter_column(
+            table, "updated_at", server_default=sa.text("current_timestamp")
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.alter_column(
+            table, "updated_at", server_default=sa.text("current_timestamp(0)")
+        )
@@ -0,0 +1,30 @@
+"""add customers address_id index
+
+Revision ID: b7d2e4f19a06
+Revises: 3f1c7a92d5e4
+Create Date: 2026-10-18 14:05:12.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d2e4f19a06"
+down_revision: Union[str, None] = "3f1c7a92d5e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Address lookups outer join `customers` on `address_id`, which otherwise
+    # scans the whole table for every address.
+    op.create_index(
+        "ix_customers_address_id", "customers", ["address_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_customers_address_id", table_name="customers")
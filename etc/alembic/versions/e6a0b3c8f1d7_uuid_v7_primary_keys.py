@@ -0,0 +1,65 @@
+"""uuid v7 primary keys
+
+Revision ID: e6a0b3c8f1d7
+Revises: d41b7c9e2f58
+Create Date: 2026-10-18 19:40:17.518204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a0b3c8f1d7"
+down_revision: Union[str, None] = "d41b7c9e2f58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("addresses", "customers", "jobs")
+
+# PostgreSQL 18 generates version 7 UUIDs itself, with sub-millisecond precision
+# and strictly increasing within a backend.
+NATIVE_UUID_V7 = "SELECT uuidv7()"
+# Before that, a version 4 UUID with its first 48 bits replaced by the Unix time in
+# milliseconds and its version bits turned from 0100 into 0111.
+PORTABLE_UUID_V7 = """
+SELECT encode(
+    set_bit(
+        set_bit(
+            overlay(
+                uuid_send(gen_random_uuid())
+                PLACING substring(
+                    int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint)
+                    FROM 3
+                )
+                FROM 1 FOR 6
+            ),
+            52, 1
+        ),
+        53, 1
+    ),
+    'hex'
+)::uuid
+"""
+
+
+def upgrade() -> None:
+    server_version = op.get_bind().dialect.server_version_info or (0,)
+    body = NATIVE_UUID_V7 if server_version >= (18,) else PORTABLE_UUID_V7
+    op.execute(
+        f"CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid "
+        f"LANGUAGE sql VOLATILE PARALLEL SAFE AS $$ {body} $$"
+    )
+    # Existing rows keep their random ids: they may be referenced from outside the
+    # database, and only new rows are inserted where the index ordering matters.
+    for table in TABLES:
+        op.alter_column(table, "id", server_default=sa.text("uuid_generate_v7()"))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.alter_column(table, "id", server_default=sa.text("gen_random_uuid()"))
+    op.execute("DROP FUNCTION uuid_generate_v7()")
@@ -0,0 +1,55 @@
+"""add customer stats view
+
+Revision ID: f3c9a1d6b8e2
+Revises: e6a0b3c8f1d7
+Create Date: 2026-10-18 20:21:45.093316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c9a1d6b8e2"
+down_revision: Union[str, None] = "e6a0b3c8f1d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per zip code, city and state, plus a grand total, which `ROLLUP`
+    # produces even with no customers and which records when the view was built.
+    # Created empty, so the migration does not aggregate every customer; the
+    # first `CustomerStatsCRUD.refresh` populates it.
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW customer_stats AS
+        SELECT
+            CASE grouping(a.state, a.city, a.zip_code)
+                WHEN 0 THEN 'zip_code'
+                WHEN 1 THEN 'city'
+                WHEN 3 THEN 'state'
+                ELSE 'total'
+            END AS level,
+            coalesce(a.state, '') AS state,
+            coalesce(a.city, '') AS city,
+            coalesce(a.zip_code, '') AS zip_code,
+            count(*) AS customers,
+            CASE WHEN grouping(a.state) = 1 THEN now() END AS refreshed_at
+        FROM customers AS c
+        JOIN addresses AS a ON a.id = c.address_id
+        GROUP BY ROLLUP (a.state, a.city, a.zip_code)
+        WITH NO DATA
+        """
+    )
+    # Needed to refresh the view concurrently, and serves every read of it.
+    op.execute(
+        "CREATE UNIQUE INDEX ix_customer_stats_level_state_city_zip_code "
+        "ON customer_stats (level, state, city, zip_code)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW customer_stats")
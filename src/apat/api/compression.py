@@ -0,0 +1,150 @@
+import zlib
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from apat.settings import settings
+
+# zlib `wbits` for each content coding: a gzip header and trailer, or the zlib
+# format that HTTP's "deflate" means.
+WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    The content coding to use for an `Accept-Encoding` header value: the supported
+    one with the highest q-value, preferring gzip on a tie, or None for identity.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        name, _, value = params.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for coding in WBITS:
+        weight = weights.get(coding, wildcard)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class Encoder:
+    """
+    Compresses one response body, possibly across several chunks.
+    """
+
+    def __init__(self, encoding: str, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, WBITS[encoding])
+
+    def encode(self, data: bytes, last: bool) -> bytes:
+        # A sync flush ends each chunk on a byte boundary the client can decode.
+        mode = zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies with gzip or deflate, as negotiated from
+    `Accept-Encoding`.
+
+    Single-message bodies under `minimum_size` bytes are sent as they are.
+    Streamed bodies are compressed chunk by chunk, each flushed so clients can
+    decode lines as they arrive. Bodies or chunks of `offload_size` bytes or more
+    are compressed in a worker thread, as zlib releases the GIL, so the event loop
+    keeps serving other requests meanwhile. Strong ETags are weakened, as the
+    compressed bytes are a different representation.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        enabled: bool = settings.compression_enabled,
+        minimum_size: int = settings.compression_minimum_size,
+        level: int = settings.compression_level,
+        offload_size: int = settings.compression_offload_size,
+    ) -> None:
+        self.app = app
+        self.enabled = enabled
+        self.minimum_size = minimum_size
+        self.level = level
+        self.offload_size = offload_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # The start message is held back until the first body message shows
+        # whether the body is worth compressing.
+        start: Message | None = None
+        encoder: Encoder | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                if "content-encoding" in Headers(raw=message["headers"]):
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or (
+                start is None and encoder is None
+            ):
+                await send(message)
+                return
+
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+            if start is not None:
+                if not more_body and len(body) < self.minimum_size:
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                encoder = Encoder(encoding, self.level)
+                body = await self._encode(encoder, body, last=not more_body)
+                set_encoding_headers(
+                    start, encoding, length=None if more_body else len(body)
+                )
+                await send(start)
+                start = None
+            else:
+                assert encoder is not None
+                body = await self._encode(encoder, body, last=not more_body)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _encode(self, encoder: Encoder, data: bytes, last: bool) -> bytes:
+        if len(data) >= self.offload_size:
+            return await anyio.to_thread.run_sync(encoder.encode, data, last)
+        return encoder.encode(data, last)
+
+
+def set_encoding_headers(start: Message, encoding: str, length: int | None) -> None:
+    headers = MutableHeaders(scope=start)
+    headers["Content-Encoding"] = encoding
+    headers.add_vary_header("Accept-Encoding")
+    if length is None:
+        del headers["Content-Length"]
+    else:
+        headers["Content-Length"] = str(length)
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
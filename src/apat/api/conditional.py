@@ -0,0 +1,56 @@
+from datetime import UTC
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+from apat.database.versions import Version
+
+
+def is_conditional(request: Request) -> bool:
+    headers = request.headers
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def etag(version: Version) -> str:
+    return f'"{version.tag}"'
+
+
+def is_not_modified(request: Request, version: Version) -> bool:
+    """
+    Whether the client's copy, described by `If-None-Match` or, only without it,
+    `If-Modified-Since`, is still current.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, as RFC 9110 prescribes for If-None-Match.
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag(version) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or version.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # HTTP dates have whole seconds.
+    return version.last_modified.replace(microsecond=0) <= since
+
+
+def version_headers(version: Version) -> dict[str, str]:
+    headers = {"ETag": etag(version)}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            version.last_modified.astimezone(UTC), usegmt=True
+        )
+    return headers
+
+
+def not_modified(version: Version) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers=version_headers(version)
+    )
@@ -0,0 +1,31 @@
+from dataclasses import asdict
+from typing import Any
+
+from fastapi import APIRouter
+
+from apat.customers.cache import cache
+from apat.database.database import pool_metrics, read_replicas
+
+router = APIRouter()
+
+
+@router.get("/pool")
+async def get_pool_stats() -> dict[str, Any]:
+    return asdict(pool_metrics.stats())
+
+
+@router.get("/cache")
+async def get_cache_stats() -> dict[str, Any]:
+    return asdict(cache.stats)
+
+
+@router.get("/replicas")
+async def get_replica_stats() -> list[dict[str, Any]]:
+    return [
+        {
+            "url": replica.engine.url.render_as_string(),
+            "down_until": replica.down_until,
+            "pool": asdict(replica.metrics.stats()),
+        }
+        for replica in read_replicas.replicas
+    ]
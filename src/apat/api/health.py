@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Request, Response, status
+
+router = APIRouter()
+
+
+@router.get("/ready")
+async def get_readiness(request: Request, response: Response) -> dict[str, bool]:
+    """
+    200 once startup has warmed up the connection pools, 503 before that and
+    while shutting down.
+    """
+    ready = getattr(request.app.state, "ready", False)
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"ready": ready}
@@ -0,0 +1,57 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from sqlalchemy.exc import DBAPIError
+
+from apat.customers.crud import HOT_STATEMENTS
+from apat.customers.stats import refresh_stats
+from apat.database.database import engine, read_replicas
+from apat.database.warmup import warm_up
+from apat.settings import settings
+
+LOGGER = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Fill the connection pools before reporting ready, and close them on shutdown.
+    In between, keep the customer stats fresh in the background.
+
+    A replica that can't be warmed up is skipped like one that fails to connect;
+    the primary failing fails startup.
+    """
+    app.state.ready = False
+    start = time.perf_counter()
+    await warm_up(engine, settings.database_pool_size, HOT_STATEMENTS)
+    for replica in read_replicas.replicas:
+        try:
+            await warm_up(replica.engine, settings.database_pool_size, HOT_STATEMENTS)
+        except* (OSError, TimeoutError, DBAPIError):
+            read_replicas.mark_down(replica)
+    LOGGER.info(
+        "Warmed up %d connections per pool in %.1fms",
+        settings.database_pool_size,
+        (time.perf_counter() - start) * 1e3,
+    )
+    app.state.ready = True
+    refresher = None
+    if settings.stats_refresh_interval is not None:
+        refresher = asyncio.create_task(
+            refresh_stats(engine.connect, settings.stats_refresh_interval)
+        )
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        if refresher is not None:
+            refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await refresher
+        await engine.dispose()
+        await read_replicas.dispose()
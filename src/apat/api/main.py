@@ -1,11 +1,24 @@
 from fastapi import FastAPI
 
+from apat.api.compression import CompressionMiddleware
+from apat.api.debug import router as debug_router
+from apat.api.health import router as health_router
+from apat.api.lifespan import lifespan
+from apat.api.metrics import MetricsMiddleware
+from apat.api.metrics import router as metrics_router
+from apat.api.timing import ServerTimingMiddleware
 from apat.customers.endpoints import router as customers_router
 from apat.settings import LOGGING
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(customers_router, prefix="/customers")
+app.include_router(debug_router, prefix="/debug")
+app.include_router(health_router, prefix="/health")
+app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
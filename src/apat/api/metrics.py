@@ -0,0 +1,97 @@
+import time
+
+from fastapi import APIRouter
+from starlette.responses import Response
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from apat.database.database import pool_metrics, read_replicas
+from apat.database.pool import PoolMetrics
+from apat.metrics.metrics import (
+    POOL_CHECKED_OUT,
+    POOL_CHECKOUTS,
+    POOL_OVERFLOW,
+    POOL_SIZE,
+    POOL_TIMEOUTS,
+    POOL_WAIT,
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    RESPONSE_SIZE,
+    registry,
+)
+from apat.settings import settings
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Requests that matched no route share one label value, so that scanning random
+# paths cannot grow the number of series.
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(await registry.render(), media_type=CONTENT_TYPE)
+
+
+def collect_pool_stats() -> None:
+    pools: list[tuple[str, PoolMetrics]] = [("primary", pool_metrics)]
+    pools += [
+        (replica.engine.url.render_as_string(), replica.metrics)
+        for replica in read_replicas.replicas
+    ]
+    for name, metrics in pools:
+        stats = metrics.stats()
+        labels = (name,)
+        POOL_SIZE.set(stats.size, labels)
+        POOL_CHECKED_OUT.set(stats.checked_out, labels)
+        POOL_OVERFLOW.set(stats.overflow, labels)
+        POOL_CHECKOUTS.set_total(stats.checkouts, labels)
+        POOL_TIMEOUTS.set_total(stats.timeouts, labels)
+        POOL_WAIT.set_total(stats.wait_seconds_total, labels)
+
+
+registry.add_collector(collect_pool_stats)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, response size and in-flight count for every HTTP request,
+    labelled by the route template that served it rather than the raw path.
+    """
+
+    def __init__(self, app: ASGIApp, enabled: bool = settings.metrics_enabled) -> None:
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # Routing stores the matched route in the shared scope.
+            route: BaseRoute | None = scope.get("route")
+            template = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start, (method, template, str(status))
+            )
+            RESPONSE_SIZE.observe(size, (method, template))
+            registry.schedule_flush()
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Annotated, Any, TypedDict
+
+from fastapi import Depends, HTTPException, Query, Request, status
+from pydantic import BaseModel
+
+from apat.database.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Cursor,
+    InvalidCursorError,
+    Page,
+)
+
+
+class PageResponse[T](BaseModel):
+    items: list[T]
+    next: str | None = None
+
+
+class PageBody[T](TypedDict):
+    """Serialization counterpart of `PageResponse` for `TypeAdapter.dump_json`."""
+
+    items: list[T]
+    next: str | None
+
+
+@dataclass(frozen=True, kw_only=True)
+class Pagination:
+    limit: int
+    after: Cursor | None = None
+
+
+def pagination(
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> Pagination:
+    if cursor is None:
+        return Pagination(limit=limit)
+    try:
+        return Pagination(limit=limit, after=Cursor.decode(cursor))
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from None
+
+
+def next_page_url(request: Request, page: Page[Any]) -> str | None:
+    if page.next_cursor is None:
+        return None
+    return str(request.url.include_query_params(cursor=page.next_cursor.encode()))
+
+
+def page_body[T](request: Request, page: Page[T]) -> PageBody[T]:
+    return PageBody(items=page.items, next=next_page_url(request, page))
+
+
+PaginationDep = Annotated[Pagination, Depends(pagination)]
@@ -0,0 +1,28 @@
+from typing import Any
+
+from pydantic import TypeAdapter
+from starlette.responses import Response, StreamingResponse
+
+from apat import timing
+
+
+class NDJSONResponse(StreamingResponse):
+    media_type = "application/x-ndjson"
+
+
+class RawJSONResponse(Response):
+    """
+    A response whose content is already-encoded JSON bytes.
+
+    Endpoints returning one skip FastAPI's `response_model` validation and
+    `jsonable_encoder` pass entirely, so pair it with an explicit `response_model`
+    on the route to keep the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+
+def dump_json[T](adapter: TypeAdapter[T], value: T, **kwargs: Any) -> RawJSONResponse:
+    with timing.phase(timing.SERIALIZE):
+        content = adapter.dump_json(value)
+    return RawJSONResponse(content, **kwargs)
@@ -0,0 +1,131 @@
+import asyncio
+import functools
+import inspect
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import Request, Response
+
+from apat.metrics.metrics import COALESCED_REQUESTS, registry
+from apat.settings import settings
+
+SAFE_METHODS = frozenset(("GET", "HEAD"))
+# Request headers, besides the route and its parameters, that a coalesced endpoint's
+# response may depend on: conditional requests can be answered with a 304, and
+# links in page bodies are absolute.
+KEY_HEADERS = ("host", "if-none-match", "if-modified-since")
+
+
+@dataclass(frozen=True, kw_only=True)
+class SharedResponse:
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    @classmethod
+    def of(cls, response: Response) -> "SharedResponse":
+        body = getattr(response, "body", None)
+        if not isinstance(body, bytes):
+            raise TypeError(
+                f"single_flight endpoints must return a complete body, "
+                f"got {type(response).__name__}"
+            )
+        return cls(
+            status_code=response.status_code,
+            headers=list(response.raw_headers),
+            body=body,
+        )
+
+    def to_response(self) -> Response:
+        # Each caller gets its own header list, as middleware edits it in place.
+        response = Response(self.body, status_code=self.status_code)
+        response.raw_headers = list(self.headers)
+        return response
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time: callers arriving while one is in flight
+    wait for it and get its result, or its exception, instead of starting another.
+
+    The call runs in its own task, so a caller that is cancelled, say because its
+    client disconnected, does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do[T](
+        self, key: Hashable, call: Callable[[], Awaitable[T]]
+    ) -> tuple[T, bool]:
+        """
+        Return the result of `call()`, or of the call in flight for `key`, and
+        whether it was shared with an earlier caller.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieve the exception, in case every caller was cancelled before it.
+        if not task.cancelled():
+            task.exception()
+
+
+flights = SingleFlight()
+
+
+def request_key(request: Request) -> tuple[Hashable, ...]:
+    route = request.scope.get("route")
+    return (
+        request.method,
+        getattr(route, "path", request.url.path),
+        tuple(sorted(request.path_params.items())),
+        tuple(sorted(request.query_params.multi_items())),
+        *(request.headers.get(name) for name in KEY_HEADERS),
+    )
+
+
+def single_flight[**P](
+    endpoint: Callable[P, Awaitable[Response]],
+) -> Callable[P, Awaitable[Response]]:
+    """
+    Coalesce identical concurrent requests to `endpoint`: while one is being
+    handled, the others with the same method, route, path and query parameters wait
+    for it and are sent copies of the same serialized response.
+
+    For read endpoints whose response depends on nothing but those and the
+    `KEY_HEADERS`, that return a complete body rather than a stream. The endpoint
+    must take the `request`. Only safe methods are coalesced.
+    """
+    if "request" not in inspect.signature(endpoint).parameters:
+        raise TypeError(f"{endpoint.__name__} must take a `request` parameter")
+
+    async def respond(*args: P.args, **kwargs: P.kwargs) -> SharedResponse:
+        return SharedResponse.of(await endpoint(*args, **kwargs))
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> Response:
+        request = kwargs["request"]
+        assert isinstance(request, Request)
+        if not settings.single_flight_enabled or request.method not in SAFE_METHODS:
+            return await endpoint(*args, **kwargs)
+
+        key = request_key(request)
+        response, shared = await flights.do(key, lambda: respond(*args, **kwargs))
+        if shared:
+            COALESCED_REQUESTS.inc(labels=(request.method, str(key[1])))
+            registry.schedule_flush()
+        return response.to_response()
+
+    return wrapper
@@ -0,0 +1,89 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from apat import timing
+from apat.settings import settings
+
+LOGGER = logging.getLogger(__name__)
+
+
+def server_timing_header(timings: timing.RequestTimings, total: float) -> str:
+    """
+    Render `timings` as a `Server-Timing` header value, in milliseconds.
+
+    `handler` is the part of `total` not covered by any measured phase: handler
+    and framework code, validation and waiting on the event loop.
+    """
+    measured = 0.0
+    metrics = []
+    for name in timing.PHASES:
+        seconds = timings.phases.get(name)
+        if seconds is None:
+            continue
+        measured += seconds
+        metric = f"{name};dur={seconds * 1e3:.3f}"
+        if name == timing.DB:
+            metric += f';desc="{timings.queries} queries"'
+        metrics.append(metric)
+    metrics.append(f"handler;dur={max(total - measured, 0.0) * 1e3:.3f}")
+    metrics.append(f"total;dur={total * 1e3:.3f}")
+    return ", ".join(metrics)
+
+
+class ServerTimingMiddleware:
+    """
+    Time each HTTP request by phase and report it in a `Server-Timing` header and
+    a log line.
+
+    The header covers the request up to the start of the response. The log line is
+    written once the body is sent, so for streamed responses it includes the time
+    spent producing the body. When disabled, requests pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp, enabled: bool = settings.server_timing) -> None:
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = timing.start()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    server_timing_header(timings, time.perf_counter() - start),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            timing.stop(token)
+            total = time.perf_counter() - start
+            LOGGER.info(
+                "%s %s %d %.1fms",
+                scope["method"],
+                scope["path"],
+                status,
+                total * 1e3,
+                extra={
+                    "timings": {
+                        name: round(seconds * 1e3, 3)
+                        for name, seconds in timings.phases.items()
+                    },
+                    "queries": timings.queries,
+                    "duration": round(total * 1e3, 3),
+                },
+            )
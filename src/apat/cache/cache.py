@@ -0,0 +1,57 @@
+from collections.abc import Awaitable, Callable
+
+from pydantic import TypeAdapter
+
+from apat.cache.backends import CacheBackend, CacheStats
+
+
+class ReadThroughCache:
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._invalidations = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.backend.stats
+
+    async def get_or_load[T](
+        self,
+        key: str,
+        adapter: TypeAdapter[T],
+        load: Callable[[], Awaitable[T | None]],
+        is_current: Callable[[T], bool] | None = None,
+    ) -> T | None:
+        """
+        Return the cached value for `key`, or `load()` it and cache the result.
+
+        Misses (`None`) are not cached. A cached value `is_current` rejects is
+        counted as a miss and replaced. A value loaded while any invalidation ran
+        is returned but not stored, as it may predate the write that invalidated it.
+        """
+        if not self.enabled:
+            return await load()
+
+        raw = await self.backend.get(key)
+        if raw is not None:
+            cached = adapter.validate_json(raw)
+            if is_current is None or is_current(cached):
+                self.stats.hits += 1
+                return cached
+
+        self.stats.misses += 1
+        invalidations = self._invalidations
+        value = await load()
+        if value is not None and invalidations == self._invalidations:
+            await self.backend.set(key, adapter.dump_json(value), self.ttl)
+        return value
+
+    async def invalidate(self, *keys: str) -> None:
+        self._invalidations += 1
+        self.stats.invalidations += len(keys)
+        await self.backend.delete(*keys)
+
+    async def clear(self) -> None:
+        self._invalidations += 1
+        await self.backend.clear()
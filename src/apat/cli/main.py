@@ -0,0 +1,13 @@
+import click
+
+from apat.cli.serve import serve
+from apat.cli.worker import worker
+
+
+@click.group()
+def main() -> None:
+    pass
+
+
+main.add_command(serve)
+main.add_command(worker)
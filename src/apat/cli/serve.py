@@ -0,0 +1,143 @@
+import os
+import random
+import shutil
+import socket
+import tempfile
+from pathlib import Path
+
+import click
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from apat.settings import LOGGING, settings
+
+APP = "apat.api.main:app"
+
+
+class Server(uvicorn.Server):
+    """
+    A uvicorn server that spreads worker recycling out: each worker process adds
+    up to `max_requests_jitter` to `limit_max_requests`, so workers started
+    together don't all restart together.
+    """
+
+    def __init__(self, config: uvicorn.Config, max_requests_jitter: int = 0) -> None:
+        super().__init__(config)
+        self.max_requests_jitter = max_requests_jitter
+
+    def run(self, sockets: list[socket.socket] | None = None) -> None:
+        if self.config.limit_max_requests is not None:
+            self.config.limit_max_requests += random.randint(
+                0, self.max_requests_jitter
+            )
+        super().run(sockets)
+
+
+def prepare_metrics_dir(supervised: bool) -> Path | None:
+    """
+    Empty `settings.metrics_dir`, so `/metrics` doesn't report the counters of a
+    previous run. Servers whose workers run under a supervisor get a temporary
+    directory without one, passed to the workers through the environment, which
+    is returned for removal.
+    """
+    if settings.metrics_dir is not None:
+        settings.metrics_dir.mkdir(parents=True, exist_ok=True)
+        for path in settings.metrics_dir.glob("metrics-*"):
+            path.unlink(missing_ok=True)
+        return None
+    if not supervised or not settings.metrics_enabled:
+        return None
+    directory = Path(tempfile.mkdtemp(prefix="apat-metrics-"))
+    os.environ["METRICS_DIR"] = str(directory)
+    return directory
+
+
+@click.command()
+@click.option("--host", default="0.0.0.0", show_default=True)
+@click.option("--port", default=8000, show_default=True)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes.  [default: CPUs available to this process]",
+)
+@click.option(
+    "--keep-alive",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="Seconds an idle keep-alive connection is held open.",
+)
+@click.option(
+    "--backlog",
+    type=click.IntRange(min=1),
+    default=2048,
+    show_default=True,
+    help="Connections the kernel queues while all workers are busy.",
+)
+@click.option(
+    "--max-requests",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Restart a worker after it has handled this many requests.",
+)
+@click.option(
+    "--max-requests-jitter",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Random extra requests per worker before it restarts.",
+)
+@click.option(
+    "--graceful-timeout",
+    type=click.IntRange(min=0),
+    default=30,
+    show_default=True,
+    help="Seconds to let in-flight requests finish on SIGTERM.",
+)
+def serve(
+    host: str,
+    port: int,
+    workers: int | None,
+    keep_alive: int,
+    backlog: int,
+    max_requests: int | None,
+    max_requests_jitter: int,
+    graceful_timeout: int,
+) -> None:
+    """
+    Run the API with uvloop and httptools.
+
+    On SIGTERM or SIGINT each worker stops accepting connections and exits once its
+    in-flight requests finish, or after --graceful-timeout. Workers that exit,
+    including after --max-requests, are replaced.
+    """
+    workers = workers or os.process_cpu_count() or 1
+    # A worker reaching --max-requests exits; only the supervisor replaces it.
+    supervised = workers > 1 or max_requests is not None
+    metrics_dir = prepare_metrics_dir(supervised)
+    config = uvicorn.Config(
+        APP,
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=keep_alive,
+        backlog=backlog,
+        limit_max_requests=max_requests,
+        timeout_graceful_shutdown=graceful_timeout,
+        log_config=LOGGING,
+    )
+    server = Server(config, max_requests_jitter=max_requests_jitter)
+    try:
+        if supervised:
+            sock = config.bind_socket()
+            Multiprocess(config, target=server.run, sockets=[sock]).run()
+        else:
+            server.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
@@ -0,0 +1,64 @@
+import asyncio
+import logging.config
+import signal
+
+import click
+import uvloop
+
+from apat.database.database import db_conn, engine
+from apat.jobs.worker import Worker
+from apat.settings import LOGGING
+
+
+async def run_worker(concurrency: int, batch_size: int, poll_interval: float) -> None:
+    worker = Worker(
+        db_conn,
+        concurrency=concurrency,
+        batch_size=batch_size,
+        poll_interval=poll_interval,
+    )
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(signum)
+        await engine.dispose()
+
+
+@click.command()
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Jobs run at the same time.",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Jobs claimed per query.",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0),
+    default=1.0,
+    show_default=True,
+    help="Seconds between claims while the queue is empty.",
+)
+def worker(concurrency: int, batch_size: int, poll_interval: float) -> None:
+    """
+    Run queued background jobs.
+
+    On SIGTERM or SIGINT the worker stops claiming jobs and exits once the running
+    ones finish. Run several to scale out; they never claim the same job.
+    """
+    logging.config.dictConfig(LOGGING)
+    asyncio.run(
+        run_worker(concurrency, batch_size, poll_interval),
+        loop_factory=uvloop.new_event_loop,
+    )
@@ -0,0 +1,65 @@
+from typing import Annotated
+from weakref import WeakKeyDictionary
+
+from fastapi import Depends
+
+from apat.customers.crud import AddressCRUD, CustomerCRUD
+from apat.customers.models import Address, AddressValues, Customer, CustomerValues
+from apat.database.batcher import WriteBatcher
+from apat.database.database import ConnectionFactory
+from apat.database.deps import DBConnDep
+from apat.settings import settings
+
+type CustomerBatcher = WriteBatcher[CustomerValues, Customer]
+type AddressBatcher = WriteBatcher[AddressValues, Address]
+
+# One batcher per connection factory, shared by every request using it - that is
+# what lets creates from concurrent requests end up in the same transaction.
+_customer_batchers: WeakKeyDictionary[ConnectionFactory, CustomerBatcher] = (
+    WeakKeyDictionary()
+)
+_address_batchers: WeakKeyDictionary[ConnectionFactory, AddressBatcher] = (
+    WeakKeyDictionary()
+)
+
+
+def customer_batcher(get_db: DBConnDep) -> CustomerBatcher:
+    batcher = _customer_batchers.get(get_db)
+    if batcher is None:
+
+        async def write_batch(values: list[CustomerValues]) -> list[Customer]:
+            async with get_db() as conn:
+                customers = await CustomerCRUD.create_many(conn, values)
+                await conn.commit()
+            return customers
+
+        batcher = _customer_batchers[get_db] = WriteBatcher(
+            write_batch,
+            max_batch_size=settings.write_batch_max_size,
+            max_delay=settings.write_batch_max_delay,
+            enabled=settings.write_batching_enabled,
+        )
+    return batcher
+
+
+def address_batcher(get_db: DBConnDep) -> AddressBatcher:
+    batcher = _address_batchers.get(get_db)
+    if batcher is None:
+
+        async def write_batch(values: list[AddressValues]) -> list[Address]:
+            async with get_db() as conn:
+                addresses = await AddressCRUD.create_many(conn, values)
+                await conn.commit()
+            return addresses
+
+        batcher = _address_batchers[get_db] = WriteBatcher(
+            write_batch,
+            max_batch_size=settings.write_batch_max_size,
+            max_delay=settings.write_batch_max_delay,
+            enabled=settings.write_batching_enabled,
+        )
+    return batcher
+
+
+CustomerBatcherDep = Annotated[CustomerBatcher, Depends(customer_batcher)]
+AddressBatcherDep = Annotated[AddressBatcher, Depends(address_batcher)]
@@ -0,0 +1,87 @@
+from collections.abc import Callable, Iterable
+from typing import Any
+from uuid import UUID
+
+from pydantic import TypeAdapter
+
+from apat.cache.backends import MemoryBackend
+from apat.cache.cache import ReadThroughCache
+from apat.customers.loaders import AddressLoader, CustomerLoader
+from apat.customers.models import (
+    Address,
+    AddressWithCustomers,
+    Customer,
+    CustomerWithAddress,
+)
+from apat.database.versions import Version, Versioned
+from apat.settings import settings
+
+cache = ReadThroughCache(
+    MemoryBackend(
+        max_entries=settings.cache_max_entries, max_bytes=settings.cache_max_bytes
+    ),
+    ttl=settings.cache_ttl,
+    enabled=settings.cache_enabled,
+)
+
+# Entries keep the version of the rows they were loaded from, to send as the ETag
+# of exactly that body.
+versioned_customer_adapter = TypeAdapter(Versioned[CustomerWithAddress])
+versioned_address_adapter = TypeAdapter(Versioned[AddressWithCustomers])
+
+
+def customer_key(bid: UUID) -> str:
+    return f"customer:{bid}"
+
+
+def address_key(bid: UUID) -> str:
+    return f"address:{bid}"
+
+
+def is_version(version: Version | None) -> Callable[[Versioned[Any]], bool]:
+    """
+    Accept any entry without a `version` to compare with: creates invalidate the
+    entries they change, so only writes made outside this process can leave one
+    behind, until its TTL. A conditional request has read the current version, and
+    replaces an entry older than that.
+    """
+    return lambda entry: version is None or entry.version == version
+
+
+async def get_customer_with_address(
+    loader: CustomerLoader, bid: UUID, version: Version | None = None
+) -> Versioned[CustomerWithAddress] | None:
+    return await cache.get_or_load(
+        customer_key(bid),
+        versioned_customer_adapter,
+        lambda: loader.load(bid),
+        is_version(version),
+    )
+
+
+async def get_address_with_customers(
+    loader: AddressLoader, bid: UUID, version: Version | None = None
+) -> Versioned[AddressWithCustomers] | None:
+    return await cache.get_or_load(
+        address_key(bid),
+        versioned_address_adapter,
+        lambda: loader.load(bid),
+        is_version(version),
+    )
+
+
+async def invalidate_customers(customers: Iterable[Customer]) -> None:
+    """
+    Drop cached entries for `customers` and for the addresses they belong to, whose
+    cached entries list their customers.
+    """
+    keys = set()
+    for customer in customers:
+        keys.add(customer_key(customer.bid))
+        if customer.address_bid is not None:
+            keys.add(address_key(customer.address_bid))
+    await cache.invalidate(*keys)
+
+
+async def invalidate_addresses(addresses: Iterable[Address]) -> None:
+    await cache.invalidate(*(address_key(address.bid) for address in addresses))
@@ -1,16 +1,61 @@
+from collections.abc import AsyncIterator, Mapping, Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert
+from asyncpg.exceptions import (  # type: ignore[import-untyped]
+    ObjectNotInPrerequisiteStateError,
+)
+from sqlalchemy import (
+    Float,
+    Integer,
+    Interval,
+    String,
+    any_,
+    bindparam,
+    func,
+    literal_column,
+    select,
+    text,
+    true,
+    type_coerce,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.sql import Executable
 
+from apat import timing
 from apat.customers.models import (
     Address,
+    AddressValues,
     AddressWithCustomers,
     Customer,
+    CustomerCount,
+    CustomerStats,
+    CustomerValues,
     CustomerWithAddress,
+    StatsLevel,
 )
-from apat.customers.tables import AddressTable, CustomersTable
+from apat.customers.tables import CUSTOMER_STATS, AddressTable, CustomersTable
+from apat.database import raw
+from apat.database.database import driver_connection
+from apat.database.pagination import (
+    DEFAULT_PAGE_SIZE,
+    Cursor,
+    Page,
+    build_page,
+    build_record_page,
+    page_params,
+    paginate,
+    paginate_params,
+)
+from apat.database.raw import RawStatement
+from apat.database.uuids import uuid7
+from apat.database.versions import Version, Versioned, rows_version
+from apat.settings import settings
 
 # type SessionOrConnection = AsyncConnection | AsyncSession
 AsyncConnection
@@ -18,6 +63,259 @@ AsyncSession
 # type SessionOrConnection = AsyncSession
 type SessionOrConnection = AsyncConnection
 
+# Rows fetched per server-side cursor round trip when streaming whole tables.
+EXPORT_BATCH_SIZE = 1_000
+# Batches larger than this are loaded with COPY instead of a multi-row INSERT.
+COPY_THRESHOLD = 1_000
+
+# Customer names are searched as one string, matching `ix_customers_full_name_trgm`.
+FULL_NAME = (
+    CustomersTable.first_name + literal_column("' '") + CustomersTable.last_name
+).self_group()
+
+# Hot statements are built once and executed with only their parameters changing,
+# so SQLAlchemy reuses the memoized cache key and compiled form on every call.
+INSERT_ADDRESS = insert(AddressTable).returning(AddressTable)
+SELECT_ADDRESS = select(AddressTable).where(AddressTable.id == bindparam("bid"))
+SELECT_ADDRESS_WITH_CUSTOMERS = (
+    select(
+        AddressTable,
+        CustomersTable,
+        CustomersTable.id.label("customer_id"),
+        CustomersTable.updated_at.label("customer_updated_at"),
+    )
+    .where(AddressTable.id == bindparam("bid"))
+    .outerjoin(CustomersTable, AddressTable.id == CustomersTable.address_id)
+)
+SELECT_ADDRESSES_WITH_CUSTOMERS_BY_IDS = (
+    select(
+        AddressTable,
+        CustomersTable,
+        CustomersTable.id.label("customer_id"),
+        CustomersTable.updated_at.label("customer_updated_at"),
+    )
+    .where(AddressTable.id == any_(bindparam("bids", type_=ARRAY(PG_UUID))))
+    .outerjoin(CustomersTable, AddressTable.id == CustomersTable.address_id)
+)
+INSERT_CUSTOMER = insert(CustomersTable).returning(CustomersTable)
+SELECT_CUSTOMER = select(CustomersTable).where(CustomersTable.id == bindparam("bid"))
+SELECT_CUSTOMER_WITH_ADDRESS = (
+    select(
+        CustomersTable,
+        AddressTable,
+        AddressTable.updated_at.label("address_updated_at"),
+    )
+    .where(CustomersTable.id == bindparam("bid"))
+    .outerjoin(AddressTable, CustomersTable.address_id == AddressTable.id)
+)
+SELECT_CUSTOMERS_WITH_ADDRESS_BY_IDS = (
+    select(
+        CustomersTable,
+        AddressTable,
+        AddressTable.updated_at.label("address_updated_at"),
+    )
+    .where(CustomersTable.id == any_(bindparam("bids", type_=ARRAY(PG_UUID))))
+    .outerjoin(AddressTable, CustomersTable.address_id == AddressTable.id)
+)
+
+# The hottest reads, compiled once more to run straight on asyncpg when
+# `settings.database_raw_reads` is on; see `apat.database.raw`.
+RAW_SELECT_ADDRESS_WITH_CUSTOMERS = RawStatement(SELECT_ADDRESS_WITH_CUSTOMERS)
+RAW_SELECT_ADDRESSES_WITH_CUSTOMERS_BY_IDS = RawStatement(
+    SELECT_ADDRESSES_WITH_CUSTOMERS_BY_IDS
+)
+RAW_SELECT_ADDRESS_PAGE = RawStatement(
+    paginate_params(select(AddressTable), AddressTable, after=False)
+)
+RAW_SELECT_ADDRESS_PAGE_AFTER = RawStatement(
+    paginate_params(select(AddressTable), AddressTable, after=True)
+)
+RAW_SELECT_CUSTOMER_WITH_ADDRESS = RawStatement(SELECT_CUSTOMER_WITH_ADDRESS)
+RAW_SELECT_CUSTOMERS_WITH_ADDRESS_BY_IDS = RawStatement(
+    SELECT_CUSTOMERS_WITH_ADDRESS_BY_IDS
+)
+RAW_SELECT_CUSTOMER_PAGE = RawStatement(
+    paginate_params(select(CustomersTable), CustomersTable, after=False)
+)
+RAW_SELECT_CUSTOMER_PAGE_AFTER = RawStatement(
+    paginate_params(select(CustomersTable), CustomersTable, after=True)
+)
+
+# Versions of the detail representations, read without loading them to answer
+# conditional requests: an address changes with any of its customers, a customer
+# with its address.
+_ADDRESS_CUSTOMERS = (
+    select(
+        func.max(CustomersTable.updated_at).label("customers_updated_at"),
+        func.count().label("customers"),
+    )
+    .where(CustomersTable.address_id == AddressTable.id)
+    .lateral()
+)
+SELECT_ADDRESS_VERSION = (
+    select(
+        AddressTable.updated_at,
+        _ADDRESS_CUSTOMERS.c.customers_updated_at,
+        _ADDRESS_CUSTOMERS.c.customers,
+    )
+    .select_from(AddressTable)
+    .join(_ADDRESS_CUSTOMERS, true())
+    .where(AddressTable.id == bindparam("bid"))
+)
+SELECT_CUSTOMER_VERSION = (
+    select(
+        CustomersTable.updated_at,
+        AddressTable.updated_at.label("address_updated_at"),
+    )
+    .where(CustomersTable.id == bindparam("bid"))
+    .outerjoin(AddressTable, CustomersTable.address_id == AddressTable.id)
+)
+
+
+# `:q <% name` matches names containing a word similar to `q` (pg_trgm's
+# `word_similarity_threshold`) using the trigram index, and `<<->` ranks them.
+_SEARCH_QUERY = bindparam("q", type_=String)
+SEARCH_CUSTOMERS = (
+    select(CustomersTable)
+    .where(_SEARCH_QUERY.op("<%", is_comparison=True)(FULL_NAME))
+    .order_by(_SEARCH_QUERY.op("<<->", return_type=Float)(FULL_NAME), CustomersTable.id)
+    .limit(bindparam("limit"))
+)
+
+# Autocomplete reads the first `limit` last-name and first-name prefix matches in
+# index order and merges them, instead of ranking every match of a short prefix.
+_PREFIX = bindparam("prefix", type_=String)
+_LIMIT = bindparam("limit", type_=Integer)
+_FIRST_NAME = func.lower(CustomersTable.first_name).collate("C")
+_LAST_NAME = func.lower(CustomersTable.last_name).collate("C")
+_PREFIX_MATCHES = union_all(
+    select(CustomersTable, _LAST_NAME.label("matched"))
+    .where(_LAST_NAME.like(_PREFIX))
+    .order_by(_LAST_NAME, CustomersTable.id)
+    .limit(_LIMIT),
+    select(CustomersTable, _FIRST_NAME.label("matched"))
+    .where(_FIRST_NAME.like(_PREFIX), ~_LAST_NAME.like(_PREFIX))
+    .order_by(_FIRST_NAME, CustomersTable.id)
+    .limit(_LIMIT),
+).subquery()
+AUTOCOMPLETE_CUSTOMERS = (
+    select(_PREFIX_MATCHES)
+    .order_by(_PREFIX_MATCHES.c.matched, _PREFIX_MATCHES.c.id)
+    .limit(_LIMIT)
+)
+
+# The total row, which carries the view's age, and one level's rows, in one
+# statement so both come from the same refresh.
+_CUSTOMER_STATS_AGE = type_coerce(func.now() - CUSTOMER_STATS.c.refreshed_at, Interval)
+SELECT_CUSTOMER_STATS = (
+    select(CUSTOMER_STATS, _CUSTOMER_STATS_AGE.label("staleness"))
+    .where(CUSTOMER_STATS.c.level.in_(["total", bindparam("level")]))
+    .order_by(CUSTOMER_STATS.c.state, CUSTOMER_STATS.c.city, CUSTOMER_STATS.c.zip_code)
+)
+SELECT_CUSTOMER_STATS_IN_STATE = SELECT_CUSTOMER_STATS.where(
+    (CUSTOMER_STATS.c.level == "total") | (CUSTOMER_STATS.c.state == bindparam("state"))
+)
+SELECT_CUSTOMER_STATS_AGE = select(_CUSTOMER_STATS_AGE).where(
+    CUSTOMER_STATS.c.level == "total"
+)
+# Held for the transaction refreshing `customer_stats`, so that other processes
+# skip their refresh instead of queueing behind it. Any constant will do.
+CUSTOMER_STATS_LOCK = 0x637573745F7374
+LOCK_CUSTOMER_STATS = select(func.pg_try_advisory_xact_lock(CUSTOMER_STATS_LOCK))
+REFRESH_CUSTOMER_STATS = text("REFRESH MATERIALIZED VIEW CONCURRENTLY customer_stats")
+# The view is created empty, and CONCURRENTLY only refreshes a populated view.
+IS_CUSTOMER_STATS_POPULATED = text(
+    "SELECT relispopulated FROM pg_class WHERE oid = 'customer_stats'::regclass"
+)
+POPULATE_CUSTOMER_STATS = text("REFRESH MATERIALIZED VIEW customer_stats")
+
+# Read statements run on every pooled connection at startup, with parameters that
+# match no rows, to prepare them before the first requests need them.
+_NO_ROW = UUID(int=0)
+_PAST_LAST_PAGE = Cursor(created_at=datetime.max.replace(tzinfo=UTC), bid=_NO_ROW)
+HOT_STATEMENTS: list[tuple[Executable, Mapping[str, Any]]] = [
+    (SELECT_ADDRESS, {"bid": _NO_ROW}),
+    (SELECT_ADDRESS_WITH_CUSTOMERS, {"bid": _NO_ROW}),
+    (SELECT_ADDRESSES_WITH_CUSTOMERS_BY_IDS, {"bids": [_NO_ROW]}),
+    (SELECT_ADDRESS_VERSION, {"bid": _NO_ROW}),
+    (paginate(select(AddressTable), AddressTable, DEFAULT_PAGE_SIZE), {}),
+    (
+        paginate(
+            select(AddressTable), AddressTable, DEFAULT_PAGE_SIZE, _PAST_LAST_PAGE
+        ),
+        {},
+    ),
+    (SELECT_CUSTOMER, {"bid": _NO_ROW}),
+    (SELECT_CUSTOMER_WITH_ADDRESS, {"bid": _NO_ROW}),
+    (SELECT_CUSTOMERS_WITH_ADDRESS_BY_IDS, {"bids": [_NO_ROW]}),
+    (SELECT_CUSTOMER_VERSION, {"bid": _NO_ROW}),
+    (paginate(select(CustomersTable), CustomersTable, DEFAULT_PAGE_SIZE), {}),
+    (
+        paginate(
+            select(CustomersTable), CustomersTable, DEFAULT_PAGE_SIZE, _PAST_LAST_PAGE
+        ),
+        {},
+    ),
+    (SEARCH_CUSTOMERS, {"q": "zzzzzz", "limit": 1}),
+    (AUTOCOMPLETE_CUSTOMERS, {"prefix": "zzzzzz%", "limit": 1}),
+]
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Built the same way from the version statements and from the rows a detail
+# representation is loaded from, so a loaded body carries the version a
+# conditional request for it is compared against.
+def _address_version(
+    bid: UUID,
+    updated_at: datetime,
+    customers_updated_at: datetime | None,
+    customers: int,
+) -> Version:
+    return Version.of(
+        bid,
+        updated_at,
+        customers_updated_at,
+        customers,
+        last_modified=max(updated_at, customers_updated_at or updated_at),
+    )
+
+
+def _customer_version(
+    bid: UUID, updated_at: datetime, address_updated_at: datetime | None
+) -> Version:
+    return Version.of(
+        bid,
+        updated_at,
+        address_updated_at,
+        last_modified=max(updated_at, address_updated_at or updated_at),
+    )
+
+
+def _versioned_addresses(
+    addresses: dict[UUID, AddressWithCustomers],
+    updated_at: dict[UUID, list[datetime]],
+) -> dict[UUID, Versioned[AddressWithCustomers]]:
+    """
+    Pair each address with its version, from the `updated_at` of the address
+    followed by those of its customers.
+    """
+    versioned = {}
+    for bid, address in addresses.items():
+        address_updated_at, *customers_updated_at = updated_at[bid]
+        versioned[bid] = Versioned(
+            value=address,
+            version=_address_version(
+                bid,
+                address_updated_at,
+                max(customers_updated_at, default=None),
+                len(customers_updated_at),
+            ),
+        )
+    return versioned
+
 
 class AddressCRUD:
     @classmethod
@@ -29,62 +327,169 @@ class AddressCRUD:
         state: str,
         zip_code: str,
     ) -> Address:
+        result = await session_or_connection.execute(
+            INSERT_ADDRESS,
+            {"street": street, "city": city, "state": state, "zip_code": zip_code},
+        )
+        with timing.phase(timing.MAP):
+            row = result.one()
+            return Address(
+                bid=row.id,
+                street=row.street,
+                city=row.city,
+                state=row.state,
+                zip_code=row.zip_code,
+            )
+
+    @classmethod
+    async def create_many(
+        cls,
+        session_or_connection: SessionOrConnection,
+        addresses: Sequence[AddressValues],
+    ) -> list[Address]:
+        if not addresses:
+            return []
+        if len(addresses) == 1:
+            # The single-row INSERT is a cached prepared statement.
+            return [await cls.create(session_or_connection, **addresses[0])]
+
+        if len(addresses) > COPY_THRESHOLD:
+            created = [Address(bid=uuid7(), **values) for values in addresses]
+            conn = await driver_connection(session_or_connection)
+            await conn.copy_records_to_table(
+                AddressTable.__tablename__,
+                columns=["id", "street", "city", "state", "zip_code"],
+                records=[
+                    (a.bid, a.street, a.city, a.state, a.zip_code) for a in created
+                ],
+            )
+            return created
+
+        # RETURNING rows of a multi-row INSERT come in no guaranteed order, so
+        # the ids are generated here and the rows matched back to them.
+        bids = [uuid7() for _ in addresses]
         query = (
             insert(AddressTable)
             .values(
-                street=street,
-                city=city,
-                state=state,
-                zip_code=zip_code,
+                [
+                    {"id": bid, **values}
+                    for bid, values in zip(bids, addresses, strict=True)
+                ]
             )
             .returning(AddressTable)
         )
         result = await session_or_connection.execute(query)
-        row = result.first()
-        return Address(
-            bid=row.id,
-            street=row.street,
-            city=row.city,
-            state=row.state,
-            zip_code=row.zip_code,
-        )
+        with timing.phase(timing.MAP):
+            rows = {row.id: row for row in result.all()}
+            return [
+                Address(
+                    bid=row.id,
+                    street=row.street,
+                    city=row.city,
+                    state=row.state,
+                    zip_code=row.zip_code,
+                )
+                for row in (rows[bid] for bid in bids)
+            ]
 
     @classmethod
     async def get_all(
         cls,
         session_or_connection: SessionOrConnection,
-    ) -> list[Address]:
-        query = select(AddressTable)
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Cursor | None = None,
+    ) -> Page[Address]:
+        if settings.database_raw_reads:
+            return await cls._get_all_raw(session_or_connection, limit, after)
+        query = paginate(select(AddressTable), AddressTable, limit, after)
+        result = await session_or_connection.execute(query)
+        with timing.phase(timing.MAP):
+            rows = result.all()
+            return build_page(
+                rows,
+                limit,
+                lambda row: Address(
+                    bid=row.id,
+                    street=row.street,
+                    city=row.city,
+                    state=row.state,
+                    zip_code=row.zip_code,
+                ),
+            )
+
+    @classmethod
+    async def get_page_version(
+        cls,
+        session_or_connection: SessionOrConnection,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Cursor | None = None,
+    ) -> Version:
+        """
+        The `version` of the page `get_all` would return, from ids and timestamps.
+        """
+        query = paginate(
+            select(AddressTable.id, AddressTable.updated_at), AddressTable, limit, after
+        )
         result = await session_or_connection.execute(query)
-        rows = result.all()
-        return [
-            Address(
+        return rows_version(result.all())
+
+    @classmethod
+    async def stream_all(
+        cls,
+        session_or_connection: SessionOrConnection,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[list[Address]]:
+        query = select(AddressTable).execution_options(yield_per=batch_size)
+        result = await session_or_connection.stream(query)
+        async for rows in result.partitions():
+            yield [
+                Address(
+                    bid=row.id,
+                    street=row.street,
+                    city=row.city,
+                    state=row.state,
+                    zip_code=row.zip_code,
+                )
+                for row in rows
+            ]
+
+    @classmethod
+    async def get_by_id(
+        cls,
+        session_or_connection: SessionOrConnection,
+        bid: UUID,
+    ) -> Address | None:
+        result = await session_or_connection.execute(SELECT_ADDRESS, {"bid": bid})
+        with timing.phase(timing.MAP):
+            row = result.first()
+            if row is None:
+                return None
+            return Address(
                 bid=row.id,
                 street=row.street,
                 city=row.city,
                 state=row.state,
                 zip_code=row.zip_code,
             )
-            for row in rows
-        ]
 
     @classmethod
-    async def get_by_id(
+    async def get_version(
         cls,
         session_or_connection: SessionOrConnection,
         bid: UUID,
-    ) -> Address | None:
-        query = select(AddressTable).where(AddressTable.id == bid)
-        result = await session_or_connection.execute(query)
-        row = await result.scalars().all()
+    ) -> Version | None:
+        """
+        Version of the address and its customers, as `get_by_id_with_customers`
+        would load them.
+        """
+        result = await session_or_connection.execute(
+            SELECT_ADDRESS_VERSION, {"bid": bid}
+        )
+        row = result.first()
         if row is None:
             return None
-        return Address(
-            bid=row.id,
-            street=row.street,
-            city=row.city,
-            state=row.state,
-            zip_code=row.zip_code,
+        return _address_version(
+            bid, row.updated_at, row.customers_updated_at, row.customers
         )
 
     @classmethod
@@ -93,40 +498,146 @@ class AddressCRUD:
         session_or_connection: SessionOrConnection,
         bid: UUID,
     ) -> AddressWithCustomers | None:
-        query = (
-            select(
-                AddressTable,
-                CustomersTable,
-                CustomersTable.id.label("customer_id"),
+        if settings.database_raw_reads:
+            found = await cls._with_customers_raw(
+                session_or_connection, RAW_SELECT_ADDRESS_WITH_CUSTOMERS, {"bid": bid}
             )
-            .where(AddressTable.id == bid)
-            .outerjoin(CustomersTable, AddressTable.id == CustomersTable.address_id)
+            return found[bid].value if bid in found else None
+        result = await session_or_connection.execute(
+            SELECT_ADDRESS_WITH_CUSTOMERS, {"bid": bid}
         )
-        result = await session_or_connection.execute(query)
+        with timing.phase(timing.MAP):
+            rows = result.all()
 
-        rows = result.all()
+            if not rows:
+                return None
 
-        if not rows:
-            return None
+            first_row = rows[0]
 
-        first_row = rows[0]
+            return AddressWithCustomers(
+                bid=first_row.id,
+                street=first_row.street,
+                city=first_row.city,
+                state=first_row.state,
+                zip_code=first_row.zip_code,
+                customers=[
+                    Customer(
+                        bid=row.customer_id,
+                        first_name=row.first_name,
+                        last_name=row.last_name,
+                        address_bid=row.address_id,
+                    )
+                    for row in rows
+                    if row.customer_id is not None
+                ],
+            )
 
-        return AddressWithCustomers(
-            bid=first_row.id,
-            street=first_row.street,
-            city=first_row.city,
-            state=first_row.state,
-            zip_code=first_row.zip_code,
-            customers=[
-                Customer(
-                    bid=row.customer_id,
-                    first_name=row.first_name,
-                    last_name=row.last_name,
-                    address_bid=row.address_id,
-                )
-                for row in rows
-            ],
+    @classmethod
+    async def get_many_with_customers(
+        cls,
+        session_or_connection: SessionOrConnection,
+        bids: Sequence[UUID],
+    ) -> dict[UUID, Versioned[AddressWithCustomers]]:
+        """
+        The addresses found among `bids` with their customers, each with its
+        version as `get_version` reads it.
+        """
+        if settings.database_raw_reads:
+            return await cls._with_customers_raw(
+                session_or_connection,
+                RAW_SELECT_ADDRESSES_WITH_CUSTOMERS_BY_IDS,
+                {"bids": list(bids)},
+            )
+        result = await session_or_connection.execute(
+            SELECT_ADDRESSES_WITH_CUSTOMERS_BY_IDS, {"bids": list(bids)}
         )
+        with timing.phase(timing.MAP):
+            addresses: dict[UUID, AddressWithCustomers] = {}
+            updated_at: dict[UUID, list[datetime]] = {}
+            for row in result.all():
+                address = addresses.get(row.id)
+                if address is None:
+                    address = addresses[row.id] = AddressWithCustomers(
+                        bid=row.id,
+                        street=row.street,
+                        city=row.city,
+                        state=row.state,
+                        zip_code=row.zip_code,
+                    )
+                    updated_at[row.id] = [row.updated_at]
+                if row.customer_id is not None:
+                    address.customers.append(
+                        Customer(
+                            bid=row.customer_id,
+                            first_name=row.first_name,
+                            last_name=row.last_name,
+                            address_bid=row.address_id,
+                        )
+                    )
+                    updated_at[row.id].append(row.customer_updated_at)
+            return _versioned_addresses(addresses, updated_at)
+
+    # The same reads on `raw.fetch`, mapping asyncpg records straight to models.
+
+    @classmethod
+    async def _get_all_raw(
+        cls,
+        session_or_connection: SessionOrConnection,
+        limit: int,
+        after: Cursor | None,
+    ) -> Page[Address]:
+        records = await raw.fetch(
+            session_or_connection,
+            RAW_SELECT_ADDRESS_PAGE if after is None else RAW_SELECT_ADDRESS_PAGE_AFTER,
+            page_params(limit, after),
+        )
+        with timing.phase(timing.MAP):
+            return build_record_page(
+                records,
+                limit,
+                lambda record: Address(
+                    bid=record["id"],
+                    street=record["street"],
+                    city=record["city"],
+                    state=record["state"],
+                    zip_code=record["zip_code"],
+                ),
+            )
+
+    @classmethod
+    async def _with_customers_raw(
+        cls,
+        session_or_connection: SessionOrConnection,
+        statement: RawStatement,
+        params: Mapping[str, Any],
+    ) -> dict[UUID, Versioned[AddressWithCustomers]]:
+        records = await raw.fetch(session_or_connection, statement, params)
+        with timing.phase(timing.MAP):
+            addresses: dict[UUID, AddressWithCustomers] = {}
+            updated_at: dict[UUID, list[datetime]] = {}
+            for record in records:
+                address = addresses.get(record["id"])
+                if address is None:
+                    address = addresses[record["id"]] = AddressWithCustomers(
+                        bid=record["id"],
+                        street=record["street"],
+                        city=record["city"],
+                        state=record["state"],
+                        zip_code=record["zip_code"],
+                    )
+                    updated_at[record["id"]] = [record["updated_at"]]
+                customer_bid = record["customer_id"]
+                if customer_bid is not None:
+                    address.customers.append(
+                        Customer(
+                            bid=customer_bid,
+                            first_name=record["first_name"],
+                            last_name=record["last_name"],
+                            address_bid=record["address_id"],
+                        )
+                    )
+                    updated_at[record["id"]].append(record["customer_updated_at"])
+            return _versioned_addresses(addresses, updated_at)
 
 
 class CustomerCRUD:
@@ -138,61 +649,225 @@ class CustomerCRUD:
         last_name: str,
         address_bid: UUID | None = None,
     ) -> Customer:
+        result = await session_or_connection.execute(
+            INSERT_CUSTOMER,
+            {
+                "first_name": first_name,
+                "last_name": last_name,
+                "address_id": address_bid,
+            },
+        )
+        with timing.phase(timing.MAP):
+            row = result.one()
+            return Customer(
+                bid=row.id,
+                first_name=row.first_name,
+                last_name=row.last_name,
+                address_bid=row.address_id,
+            )
+
+    @classmethod
+    async def create_many(
+        cls,
+        session_or_connection: SessionOrConnection,
+        customers: Sequence[CustomerValues],
+    ) -> list[Customer]:
+        if not customers:
+            return []
+        if len(customers) == 1:
+            # The single-row INSERT is a cached prepared statement.
+            return [await cls.create(session_or_connection, **customers[0])]
+
+        if len(customers) > COPY_THRESHOLD:
+            created = [Customer(bid=uuid7(), **values) for values in customers]
+            conn = await driver_connection(session_or_connection)
+            await conn.copy_records_to_table(
+                CustomersTable.__tablename__,
+                columns=["id", "first_name", "last_name", "address_id"],
+                records=[
+                    (c.bid, c.first_name, c.last_name, c.address_bid) for c in created
+                ],
+            )
+            return created
+
+        # As for addresses, rows are matched back to the ids generated here.
+        bids = [uuid7() for _ in customers]
         query = (
             insert(CustomersTable)
             .values(
-                first_name=first_name,
-                last_name=last_name,
-                address_id=address_bid,
+                [
+                    {
+                        "id": bid,
+                        "first_name": values["first_name"],
+                        "last_name": values["last_name"],
+                        "address_id": values.get("address_bid"),
+                    }
+                    for bid, values in zip(bids, customers, strict=True)
+                ]
             )
             .returning(CustomersTable)
         )
         result = await session_or_connection.execute(query)
-        row = result.first()
-        return Customer(
-            bid=row.id,
-            first_name=row.first_name,
-            last_name=row.last_name,
-            address_bid=row.address_id,
-        )
+        with timing.phase(timing.MAP):
+            rows = {row.id: row for row in result.all()}
+            return [
+                Customer(
+                    bid=row.id,
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    address_bid=row.address_id,
+                )
+                for row in (rows[bid] for bid in bids)
+            ]
 
     @classmethod
     async def get_all(
         cls,
         session_or_connection: SessionOrConnection,
-    ) -> list[Customer]:
-        query = select(CustomersTable)
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Cursor | None = None,
+    ) -> Page[Customer]:
+        if settings.database_raw_reads:
+            return await cls._get_all_raw(session_or_connection, limit, after)
+        query = paginate(select(CustomersTable), CustomersTable, limit, after)
         result = await session_or_connection.execute(query)
+        with timing.phase(timing.MAP):
+            rows = result.all()
 
-        rows = result.all()
+            return build_page(
+                rows,
+                limit,
+                lambda row: Customer(
+                    bid=row.id,
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    address_bid=row.address_id,
+                ),
+            )
+
+    @classmethod
+    async def get_page_version(
+        cls,
+        session_or_connection: SessionOrConnection,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Cursor | None = None,
+    ) -> Version:
+        """
+        The `version` of the page `get_all` would return, from ids and timestamps.
+        """
+        query = paginate(
+            select(CustomersTable.id, CustomersTable.updated_at),
+            CustomersTable,
+            limit,
+            after,
+        )
+        result = await session_or_connection.execute(query)
+        return rows_version(result.all())
+
+    @classmethod
+    async def stream_all(
+        cls,
+        session_or_connection: SessionOrConnection,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[list[Customer]]:
+        query = select(CustomersTable).execution_options(yield_per=batch_size)
+        result = await session_or_connection.stream(query)
+        async for rows in result.partitions():
+            yield [
+                Customer(
+                    bid=row.id,
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    address_bid=row.address_id,
+                )
+                for row in rows
+            ]
 
-        return [
-            Customer(
+    @classmethod
+    async def get_by_id(
+        cls,
+        session_or_connection: SessionOrConnection,
+        bid: UUID,
+    ) -> Customer | None:
+        result = await session_or_connection.execute(SELECT_CUSTOMER, {"bid": bid})
+        with timing.phase(timing.MAP):
+            row = result.first()
+            if row is None:
+                return None
+            return Customer(
                 bid=row.id,
                 first_name=row.first_name,
                 last_name=row.last_name,
                 address_bid=row.address_id,
             )
-            for row in rows
-        ]
 
     @classmethod
-    async def get_by_id(
+    async def search(
+        cls,
+        session_or_connection: SessionOrConnection,
+        query: str,
+        limit: int,
+    ) -> list[Customer]:
+        """
+        Customers whose name contains a word similar to `query`, closest first.
+        """
+        result = await session_or_connection.execute(
+            SEARCH_CUSTOMERS, {"q": query, "limit": limit}
+        )
+        with timing.phase(timing.MAP):
+            return [
+                Customer(
+                    bid=row.id,
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    address_bid=row.address_id,
+                )
+                for row in result.all()
+            ]
+
+    @classmethod
+    async def autocomplete(
+        cls,
+        session_or_connection: SessionOrConnection,
+        prefix: str,
+        limit: int,
+    ) -> list[Customer]:
+        """
+        Customers with a first or last name starting with `prefix`, ignoring case,
+        in order of the matching name.
+        """
+        result = await session_or_connection.execute(
+            AUTOCOMPLETE_CUSTOMERS,
+            {"prefix": f"{escape_like(prefix.lower())}%", "limit": limit},
+        )
+        with timing.phase(timing.MAP):
+            return [
+                Customer(
+                    bid=row.id,
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    address_bid=row.address_id,
+                )
+                for row in result.all()
+            ]
+
+    @classmethod
+    async def get_version(
         cls,
         session_or_connection: SessionOrConnection,
         bid: UUID,
-    ) -> Customer | None:
-        query = select(CustomersTable).where(CustomersTable.id == bid)
-        result = await session_or_connection.execute(query)
-        row = result.scalars().first()
+    ) -> Version | None:
+        """
+        Version of the customer and its address, as `get_by_id_with_customer` would
+        load them.
+        """
+        result = await session_or_connection.execute(
+            SELECT_CUSTOMER_VERSION, {"bid": bid}
+        )
+        row = result.first()
         if row is None:
             return None
-        return Customer(
-            bid=row.id,
-            first_name=row.first_name,
-            last_name=row.last_name,
-            address_bid=row.address_id,
-        )
+        return _customer_version(bid, row.updated_at, row.address_updated_at)
 
     @classmethod
     async def get_by_id_with_customer(
@@ -200,35 +875,221 @@ class CustomerCRUD:
         session_or_connection: SessionOrConnection,
         bid: UUID,
     ) -> CustomerWithAddress | None:
-        query = (
-            select(
-                CustomersTable,
-                # AddressTable.id.label("addressid"),
-                AddressTable,
-                # AddressTable.street,
-                # AddressTable.city,
-                # AddressTable.state,
-                # AddressTable.zip_code,
-            )
-            .where(CustomersTable.id == bid)
-            .outerjoin(AddressTable, CustomersTable.address_id == AddressTable.id)
+        if settings.database_raw_reads:
+            found = await cls._with_address_raw(
+                session_or_connection, RAW_SELECT_CUSTOMER_WITH_ADDRESS, {"bid": bid}
+            )
+            return found[bid].value if bid in found else None
+        result = await session_or_connection.execute(
+            SELECT_CUSTOMER_WITH_ADDRESS, {"bid": bid}
         )
-        result = await session_or_connection.execute(query)
-        row = result.first()
-        print(row)
-        if row is None:
-            return None
-        return CustomerWithAddress(
-            bid=row.id,
-            first_name=row.first_name,
-            last_name=row.last_name,
-            address=Address(
-                bid=row.address_id,
-                street=row.street,
-                city=row.city,
-                state=row.state,
-                zip_code=row.zip_code,
+        with timing.phase(timing.MAP):
+            row = result.first()
+            if row is None:
+                return None
+            return CustomerWithAddress(
+                bid=row.id,
+                first_name=row.first_name,
+                last_name=row.last_name,
+                address_bid=row.address_id,
+                address=Address(
+                    bid=row.address_id,
+                    street=row.street,
+                    city=row.city,
+                    state=row.state,
+                    zip_code=row.zip_code,
+                )
+                if row.address_id is not None
+                else None,
+            )
+
+    @classmethod
+    async def get_many_with_address(
+        cls,
+        session_or_connection: SessionOrConnection,
+        bids: Sequence[UUID],
+    ) -> dict[UUID, Versioned[CustomerWithAddress]]:
+        """
+        The customers found among `bids` with their address, each with its version
+        as `get_version` reads it.
+        """
+        if settings.database_raw_reads:
+            return await cls._with_address_raw(
+                session_or_connection,
+                RAW_SELECT_CUSTOMERS_WITH_ADDRESS_BY_IDS,
+                {"bids": list(bids)},
             )
-            if row.address_id is not None
-            else None,
+        result = await session_or_connection.execute(
+            SELECT_CUSTOMERS_WITH_ADDRESS_BY_IDS, {"bids": list(bids)}
         )
+        with timing.phase(timing.MAP):
+            return {
+                row.id: Versioned(
+                    value=CustomerWithAddress(
+                        bid=row.id,
+                        first_name=row.first_name,
+                        last_name=row.last_name,
+                        address_bid=row.address_id,
+                        address=Address(
+                            bid=row.address_id,
+                            street=row.street,
+                            city=row.city,
+                            state=row.state,
+                            zip_code=row.zip_code,
+                        )
+                        if row.address_id is not None
+                        else None,
+                    ),
+                    version=_customer_version(
+                        row.id, row.updated_at, row.address_updated_at
+                    ),
+                )
+                for row in result.all()
+            }
+
+    # The same reads on `raw.fetch`, mapping asyncpg records straight to models.
+
+    @classmethod
+    async def _get_all_raw(
+        cls,
+        session_or_connection: SessionOrConnection,
+        limit: int,
+        after: Cursor | None,
+    ) -> Page[Customer]:
+        records = await raw.fetch(
+            session_or_connection,
+            RAW_SELECT_CUSTOMER_PAGE
+            if after is None
+            else RAW_SELECT_CUSTOMER_PAGE_AFTER,
+            page_params(limit, after),
+        )
+        with timing.phase(timing.MAP):
+            return build_record_page(
+                records,
+                limit,
+                lambda record: Customer(
+                    bid=record["id"],
+                    first_name=record["first_name"],
+                    last_name=record["last_name"],
+                    address_bid=record["address_id"],
+                ),
+            )
+
+    @classmethod
+    async def _with_address_raw(
+        cls,
+        session_or_connection: SessionOrConnection,
+        statement: RawStatement,
+        params: Mapping[str, Any],
+    ) -> dict[UUID, Versioned[CustomerWithAddress]]:
+        records = await raw.fetch(session_or_connection, statement, params)
+        with timing.phase(timing.MAP):
+            customers: dict[UUID, Versioned[CustomerWithAddress]] = {}
+            for record in records:
+                address_bid = record["address_id"]
+                customers[record["id"]] = Versioned(
+                    value=CustomerWithAddress(
+                        bid=record["id"],
+                        first_name=record["first_name"],
+                        last_name=record["last_name"],
+                        address_bid=address_bid,
+                        address=Address(
+                            bid=address_bid,
+                            street=record["street"],
+                            city=record["city"],
+                            state=record["state"],
+                            zip_code=record["zip_code"],
+                        )
+                        if address_bid is not None
+                        else None,
+                    ),
+                    version=_customer_version(
+                        record["id"],
+                        record["updated_at"],
+                        record["address_updated_at"],
+                    ),
+                )
+            return customers
+
+
+class StatsNotRefreshedError(LookupError):
+    """
+    `customer_stats` has not been populated by a first refresh yet.
+    """
+
+
+class CustomerStatsCRUD:
+    @classmethod
+    async def get(
+        cls,
+        session_or_connection: SessionOrConnection,
+        by: StatsLevel = "state",
+        state: str | None = None,
+    ) -> CustomerStats:
+        """
+        Customer counts per `by` group, within `state` if given, as of the last
+        refresh of `customer_stats`. Reads only the groups asked for, however many
+        customers there are. Raises `StatsNotRefreshedError` before the first
+        refresh.
+        """
+        try:
+            if state is None:
+                result = await session_or_connection.execute(
+                    SELECT_CUSTOMER_STATS, {"level": by}
+                )
+            else:
+                result = await session_or_connection.execute(
+                    SELECT_CUSTOMER_STATS_IN_STATE, {"level": by, "state": state}
+                )
+        except DBAPIError as exc:
+            # Only raised by a read of the view before its first refresh.
+            cause = exc.orig.__cause__ if exc.orig is not None else None
+            if isinstance(cause, ObjectNotInPrerequisiteStateError):
+                raise StatsNotRefreshedError from exc
+            raise
+        with timing.phase(timing.MAP):
+            groups = []
+            for row in result.all():
+                # `ROLLUP` produces the total row even without customers.
+                if row.level == "total":
+                    total = row
+                    continue
+                groups.append(
+                    CustomerCount(
+                        state=row.state,
+                        city=row.city if by != "state" else None,
+                        zip_code=row.zip_code if by == "zip_code" else None,
+                        customers=row.customers,
+                    )
+                )
+            return CustomerStats(
+                by=by,
+                total=total.customers,
+                groups=groups,
+                refreshed_at=total.refreshed_at,
+                staleness_seconds=total.staleness.total_seconds(),
+            )
+
+    @classmethod
+    async def refresh(
+        cls, session_or_connection: SessionOrConnection, max_age: timedelta
+    ) -> bool:
+        """
+        Refresh `customer_stats` if it is at least `max_age` old, unless another
+        transaction is refreshing it already. Returns whether it did.
+
+        The refresh is concurrent, so reads of the view go on meanwhile, and
+        rewrites only the rows whose counts changed. The first one, which populates
+        the view, is not: reads fail until then anyway. It takes effect, and the
+        lock is released, when the caller commits.
+        """
+        if not await session_or_connection.scalar(LOCK_CUSTOMER_STATS):
+            return False
+        if not await session_or_connection.scalar(IS_CUSTOMER_STATS_POPULATED):
+            await session_or_connection.execute(POPULATE_CUSTOMER_STATS)
+            return True
+        age = await session_or_connection.scalar(SELECT_CUSTOMER_STATS_AGE)
+        if age is not None and age < max_age:
+            return False
+        await session_or_connection.execute(REFRESH_CUSTOMER_STATS)
+        return True
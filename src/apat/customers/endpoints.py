@@ -1,89 +1,351 @@
+from collections.abc import AsyncIterator
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status
 
-from apat.customers.crud import AddressCRUD, CustomerCRUD
+from apat.api.conditional import (
+    is_conditional,
+    is_not_modified,
+    not_modified,
+    version_headers,
+)
+from apat.api.pagination import PageResponse, PaginationDep, page_body
+from apat.api.responses import NDJSONResponse, RawJSONResponse, dump_json
+from apat.api.single_flight import single_flight
+from apat.customers import cache
+from apat.customers.batchers import AddressBatcherDep, CustomerBatcherDep
+from apat.customers.crud import (
+    AddressCRUD,
+    CustomerCRUD,
+    CustomerStatsCRUD,
+    StatsNotRefreshedError,
+)
+from apat.customers.loaders import AddressLoaderDep, CustomerLoaderDep
+from apat.customers.models import AddressValues, CustomerValues, StatsLevel
 from apat.customers.schema import (
     AddressCreate,
     AddressResponse,
     AddressWithCustomersResponse,
     CustomerCreate,
     CustomerResponse,
+    CustomerStatsResponse,
     CustomerWithAddressResponse,
+    address_adapter,
+    address_list_adapter,
+    address_page_adapter,
+    address_with_customers_adapter,
+    address_with_customers_list_adapter,
+    customer_adapter,
+    customer_list_adapter,
+    customer_page_adapter,
+    customer_stats_adapter,
+    customer_with_address_adapter,
+    customer_with_address_list_adapter,
 )
-from apat.database.deps import DBConnDep, DBSessionDep
+from apat.database.deps import DBConnDep, DBReadConnDep, DBSessionDep
 
 router = APIRouter()
 DBConnDep, DBSessionDep
 
+MAX_BULK_SIZE = 50_000
+MAX_BATCH_IDS = 100
+MAX_SEARCH_RESULTS = 50
+# Shorter terms have no trigrams to look up and would scan the whole index.
+MIN_SEARCH_LENGTH = 3
+
+SearchLimit = Annotated[int, Query(ge=1, le=MAX_SEARCH_RESULTS)]
 
-@router.get("/customers/")
+
+@router.get("/customers/", response_model=PageResponse[CustomerResponse])
+@single_flight
 async def get_customers(
-    get_db: DBConnDep,
-):
+    request: Request,
+    get_db: DBReadConnDep,
+    pagination: PaginationDep,
+) -> Response:
+    async with get_db() as conn:
+        if is_conditional(request):
+            version = await CustomerCRUD.get_page_version(
+                conn, limit=pagination.limit, after=pagination.after
+            )
+            if is_not_modified(request, version):
+                return not_modified(version)
+        page = await CustomerCRUD.get_all(
+            conn, limit=pagination.limit, after=pagination.after
+        )
+
+    return dump_json(
+        customer_page_adapter,
+        page_body(request, page),
+        headers=version_headers(page.version),
+    )
+
+
+@router.get("/customers/export", response_class=NDJSONResponse)
+async def export_customers(
+    get_db: DBReadConnDep,
+) -> NDJSONResponse:
+    async def lines() -> AsyncIterator[bytes]:
+        async with get_db() as conn:
+            async for customers in CustomerCRUD.stream_all(conn):
+                yield b"".join(
+                    customer_adapter.dump_json(customer) + b"\n"
+                    for customer in customers
+                )
+
+    return NDJSONResponse(lines())
+
+
+@router.get("/customers/batch", response_model=list[CustomerWithAddressResponse])
+async def get_customers_by_ids(
+    ids: Annotated[list[UUID], Query(min_length=1, max_length=MAX_BATCH_IDS)],
+    loader: CustomerLoaderDep,
+) -> RawJSONResponse:
+    customers = await loader.load_many(dict.fromkeys(ids))
+
+    return dump_json(
+        customer_with_address_list_adapter,
+        [customer.value for customer in customers if customer is not None],
+    )
+
+
+@router.get("/customers/search", response_model=list[CustomerResponse])
+async def search_customers(
+    q: Annotated[str, Query(min_length=MIN_SEARCH_LENGTH, max_length=100)],
+    get_db: DBReadConnDep,
+    limit: SearchLimit = 10,
+) -> RawJSONResponse:
     async with get_db() as conn:
-        customers = await CustomerCRUD.get_all(conn)
+        customers = await CustomerCRUD.search(conn, q, limit)
+
+    return dump_json(customer_list_adapter, customers)
+
+
+@router.get("/customers/autocomplete", response_model=list[CustomerResponse])
+async def autocomplete_customers(
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    get_db: DBReadConnDep,
+    limit: SearchLimit = 10,
+) -> RawJSONResponse:
+    async with get_db() as conn:
+        customers = await CustomerCRUD.autocomplete(conn, q, limit)
+
+    return dump_json(customer_list_adapter, customers)
 
-    return [CustomerResponse.from_model(customer) for customer in customers]
 
+# Served from a rollup refreshed in the background: the counts are as of
+# `refreshed_at` and cost the same to read however many customers there are.
+@router.get("/customers/stats/", response_model=CustomerStatsResponse)
+@single_flight
+async def get_customer_stats(
+    request: Request,
+    get_db: DBReadConnDep,
+    by: StatsLevel = "state",
+    state: str | None = None,
+) -> Response:
+    try:
+        async with get_db() as conn:
+            stats = await CustomerStatsCRUD.get(conn, by, state)
+    except StatsNotRefreshedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Customer stats are not refreshed yet",
+        ) from None
+    return dump_json(customer_stats_adapter, stats)
 
-@router.get("/customers/{bid}")
+
+@router.get("/customers/{bid}", response_model=CustomerWithAddressResponse)
+@single_flight
 async def get_customer(
+    request: Request,
     bid: UUID,
-    get_db: DBConnDep,
-):
-    async with get_db() as conn:
-        customer = await CustomerCRUD.get_by_id_with_customer(conn, bid)
+    get_db: DBReadConnDep,
+    loader: CustomerLoaderDep,
+) -> Response:
+    version = None
+    if is_conditional(request):
+        async with get_db() as conn:
+            version = await CustomerCRUD.get_version(conn, bid)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        if is_not_modified(request, version):
+            return not_modified(version)
+
+    customer = await cache.get_customer_with_address(loader, bid, version)
 
     if customer is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
-    return CustomerWithAddressResponse.from_model(customer)
+    return dump_json(
+        customer_with_address_adapter,
+        customer.value,
+        headers=version_headers(customer.version),
+    )
 
 
-@router.post("/customers/")
+@router.post("/customers/", response_model=CustomerResponse)
 async def create_customer(
     customer: CustomerCreate,
+    batcher: CustomerBatcherDep,
+) -> RawJSONResponse:
+    new_customer = await batcher.write(
+        CustomerValues(
+            first_name=customer.first_name,
+            last_name=customer.last_name,
+            address_bid=customer.address_bid,
+        )
+    )
+    await cache.invalidate_customers([new_customer])
+
+    return dump_json(customer_adapter, new_customer)
+
+
+@router.post("/customers/bulk", response_model=list[CustomerResponse])
+async def create_customers(
+    customers: Annotated[
+        list[CustomerCreate], Body(min_length=1, max_length=MAX_BULK_SIZE)
+    ],
     get_db: DBConnDep,
-):
+) -> RawJSONResponse:
     async with get_db() as conn:
-        new_customer = await CustomerCRUD.create(conn, **customer.dict())
+        new_customers = await CustomerCRUD.create_many(
+            conn,
+            [
+                CustomerValues(
+                    first_name=customer.first_name,
+                    last_name=customer.last_name,
+                    address_bid=customer.address_bid,
+                )
+                for customer in customers
+            ],
+        )
         await conn.commit()
+    await cache.invalidate_customers(new_customers)
 
-    return CustomerResponse.from_model(new_customer)
+    return dump_json(customer_list_adapter, new_customers)
 
 
-@router.get("/addresses/")
+@router.get("/addresses/", response_model=PageResponse[AddressResponse])
+@single_flight
 async def get_addresses(
-    get_db: DBConnDep,
-):
+    request: Request,
+    get_db: DBReadConnDep,
+    pagination: PaginationDep,
+) -> Response:
     async with get_db() as conn:
-        addresses = await AddressCRUD.get_all(conn)
+        if is_conditional(request):
+            version = await AddressCRUD.get_page_version(
+                conn, limit=pagination.limit, after=pagination.after
+            )
+            if is_not_modified(request, version):
+                return not_modified(version)
+        page = await AddressCRUD.get_all(
+            conn, limit=pagination.limit, after=pagination.after
+        )
+
+    return dump_json(
+        address_page_adapter,
+        page_body(request, page),
+        headers=version_headers(page.version),
+    )
+
 
-    return [AddressResponse.from_model(address) for address in addresses]
+@router.get("/addresses/export", response_class=NDJSONResponse)
+async def export_addresses(
+    get_db: DBReadConnDep,
+) -> NDJSONResponse:
+    async def lines() -> AsyncIterator[bytes]:
+        async with get_db() as conn:
+            async for addresses in AddressCRUD.stream_all(conn):
+                yield b"".join(
+                    address_adapter.dump_json(address) + b"\n" for address in addresses
+                )
 
+    return NDJSONResponse(lines())
 
-@router.post("/addresses/")
+
+@router.post("/addresses/", response_model=AddressResponse)
 async def create_address(
     address: AddressCreate,
+    batcher: AddressBatcherDep,
+) -> RawJSONResponse:
+    new_address = await batcher.write(
+        AddressValues(
+            street=address.street,
+            city=address.city,
+            state=address.state,
+            zip_code=address.zip_code,
+        )
+    )
+    await cache.invalidate_addresses([new_address])
+
+    return dump_json(address_adapter, new_address)
+
+
+@router.post("/addresses/bulk", response_model=list[AddressResponse])
+async def create_addresses(
+    addresses: Annotated[
+        list[AddressCreate], Body(min_length=1, max_length=MAX_BULK_SIZE)
+    ],
     get_db: DBConnDep,
-):
+) -> RawJSONResponse:
     async with get_db() as conn:
-        new_address = await AddressCRUD.create(conn, **address.dict())
+        new_addresses = await AddressCRUD.create_many(
+            conn,
+            [
+                AddressValues(
+                    street=address.street,
+                    city=address.city,
+                    state=address.state,
+                    zip_code=address.zip_code,
+                )
+                for address in addresses
+            ],
+        )
         await conn.commit()
+    await cache.invalidate_addresses(new_addresses)
+
+    return dump_json(address_list_adapter, new_addresses)
 
-    return AddressResponse.from_model(new_address)
 
+@router.get("/addresses/batch", response_model=list[AddressWithCustomersResponse])
+async def get_addresses_by_ids(
+    ids: Annotated[list[UUID], Query(min_length=1, max_length=MAX_BATCH_IDS)],
+    loader: AddressLoaderDep,
+) -> RawJSONResponse:
+    addresses = await loader.load_many(dict.fromkeys(ids))
 
-@router.get("/addresses/{bid}")
+    return dump_json(
+        address_with_customers_list_adapter,
+        [address.value for address in addresses if address is not None],
+    )
+
+
+@router.get("/addresses/{bid}", response_model=AddressWithCustomersResponse)
+@single_flight
 async def get_address(
+    request: Request,
     bid: UUID,
-    get_db: DBConnDep,
-):
-    async with get_db() as conn:
-        address = await AddressCRUD.get_by_id_with_customers(conn, bid)
+    get_db: DBReadConnDep,
+    loader: AddressLoaderDep,
+) -> Response:
+    version = None
+    if is_conditional(request):
+        async with get_db() as conn:
+            version = await AddressCRUD.get_version(conn, bid)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        if is_not_modified(request, version):
+            return not_modified(version)
+
+    address = await cache.get_address_with_customers(loader, bid, version)
 
     if address is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
-    return AddressWithCustomersResponse.from_model(address)
+    return dump_json(
+        address_with_customers_adapter,
+        address.value,
+        headers=version_headers(address.version),
+    )
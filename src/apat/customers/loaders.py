@@ -0,0 +1,56 @@
+from typing import Annotated
+from uuid import UUID
+from weakref import WeakKeyDictionary
+
+from fastapi import Depends
+
+from apat.customers.crud import AddressCRUD, CustomerCRUD
+from apat.customers.models import AddressWithCustomers, CustomerWithAddress
+from apat.database.database import ConnectionFactory
+from apat.database.deps import DBReadConnDep
+from apat.database.loader import BatchLoader
+from apat.database.versions import Versioned
+
+type CustomerLoader = BatchLoader[UUID, Versioned[CustomerWithAddress]]
+type AddressLoader = BatchLoader[UUID, Versioned[AddressWithCustomers]]
+
+# One loader per connection factory, shared by every request using it - that is
+# what lets lookups from concurrent requests end up in the same batch.
+_customer_loaders: WeakKeyDictionary[ConnectionFactory, CustomerLoader] = (
+    WeakKeyDictionary()
+)
+_address_loaders: WeakKeyDictionary[ConnectionFactory, AddressLoader] = (
+    WeakKeyDictionary()
+)
+
+
+def customer_loader(get_db: DBReadConnDep) -> CustomerLoader:
+    loader = _customer_loaders.get(get_db)
+    if loader is None:
+
+        async def batch_load(
+            bids: list[UUID],
+        ) -> dict[UUID, Versioned[CustomerWithAddress]]:
+            async with get_db() as conn:
+                return await CustomerCRUD.get_many_with_address(conn, bids)
+
+        loader = _customer_loaders[get_db] = BatchLoader(batch_load)
+    return loader
+
+
+def address_loader(get_db: DBReadConnDep) -> AddressLoader:
+    loader = _address_loaders.get(get_db)
+    if loader is None:
+
+        async def batch_load(
+            bids: list[UUID],
+        ) -> dict[UUID, Versioned[AddressWithCustomers]]:
+            async with get_db() as conn:
+                return await AddressCRUD.get_many_with_customers(conn, bids)
+
+        loader = _address_loaders[get_db] = BatchLoader(batch_load)
+    return loader
+
+
+CustomerLoaderDep = Annotated[CustomerLoader, Depends(customer_loader)]
+AddressLoaderDep = Annotated[AddressLoader, Depends(address_loader)]
@@ -1,6 +1,11 @@
 from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Literal, NotRequired, TypedDict
 from uuid import UUID
 
+# How finely `CustomerStats` groups customers, by their address.
+type StatsLevel = Literal["state", "city", "zip_code"]
+
 
 @dataclass(frozen=True, kw_only=True)
 class Address:
@@ -27,3 +32,43 @@ class Customer:
 @dataclass(frozen=True, kw_only=True)
 class CustomerWithAddress(Customer):
     address: Address | None = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class CustomerCount:
+    """
+    Customers living in one state, city or zip code. The fields finer than the
+    grouping are `None`.
+    """
+
+    state: str
+    city: str | None = None
+    zip_code: str | None = None
+    customers: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class CustomerStats:
+    """
+    Customers with an address, counted per `by` group, as of `refreshed_at`: the
+    counts are `staleness_seconds` old.
+    """
+
+    by: StatsLevel
+    total: int
+    groups: list[CustomerCount]
+    refreshed_at: datetime
+    staleness_seconds: float
+
+
+class AddressValues(TypedDict):
+    street: str
+    city: str
+    state: str
+    zip_code: str
+
+
+class CustomerValues(TypedDict):
+    first_name: str
+    last_name: str
+    address_bid: NotRequired[UUID | None]
@@ -1,15 +1,17 @@
-from typing import TYPE_CHECKING
+from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
-if TYPE_CHECKING:
-    from apat.customers.models import (
-        Address,
-        AddressWithCustomers,
-        Customer,
-        CustomerWithAddress,
-    )
+from apat.api.pagination import PageBody
+from apat.customers.models import (
+    Address,
+    AddressWithCustomers,
+    Customer,
+    CustomerStats,
+    CustomerWithAddress,
+    StatsLevel,
+)
 
 
 class CustomerCreate(BaseModel):
@@ -96,3 +98,33 @@ class AddressWithCustomersResponse(AddressResponse):
                 CustomerResponse.from_model(customer) for customer in address.customers
             ],
         )
+
+
+class CustomerCountResponse(BaseModel):
+    state: str
+    city: str | None = None
+    zip_code: str | None = None
+    customers: int
+
+
+class CustomerStatsResponse(BaseModel):
+    by: StatsLevel
+    total: int
+    groups: list[CustomerCountResponse]
+    refreshed_at: datetime
+    staleness_seconds: float
+
+
+# Serialize the `models` dataclasses straight to JSON bytes. Field names match the
+# `*Response` models above, which stay the documented `response_model`s.
+address_adapter = TypeAdapter(Address)
+address_list_adapter = TypeAdapter(list[Address])
+address_page_adapter = TypeAdapter(PageBody[Address])
+address_with_customers_adapter = TypeAdapter(AddressWithCustomers)
+address_with_customers_list_adapter = TypeAdapter(list[AddressWithCustomers])
+customer_adapter = TypeAdapter(Customer)
+customer_list_adapter = TypeAdapter(list[Customer])
+customer_page_adapter = TypeAdapter(PageBody[Customer])
+customer_stats_adapter = TypeAdapter(CustomerStats)
+customer_with_address_adapter = TypeAdapter(CustomerWithAddress)
+customer_with_address_list_adapter = TypeAdapter(list[CustomerWithAddress])
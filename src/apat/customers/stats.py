@@ -0,0 +1,29 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from apat.customers.crud import CustomerStatsCRUD
+from apat.database.database import ConnectionFactory
+
+LOGGER = logging.getLogger(__name__)
+
+
+async def refresh_stats(get_db: ConnectionFactory, interval: float) -> None:
+    """
+    Refresh `customer_stats` whenever it is `interval` seconds old, until
+    cancelled.
+
+    Every server process runs this; the first to find the view due refreshes it
+    and the others skip that round, so the counts are at most about twice
+    `interval` old. Failures are logged and retried on the next round.
+    """
+    max_age = timedelta(seconds=interval)
+    while True:
+        try:
+            async with get_db() as conn:
+                if await CustomerStatsCRUD.refresh(conn, max_age):
+                    LOGGER.debug("Refreshed customer stats")
+                await conn.commit()
+        except Exception:
+            LOGGER.exception("Could not refresh customer stats")
+        await asyncio.sleep(interval)
@@ -1,6 +1,15 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    column,
+    table,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from apat.database.tables import BaseTable
@@ -8,6 +17,7 @@ from apat.database.tables import BaseTable
 
 class AddressTable(BaseTable):
     __tablename__ = "addresses"
+    __table_args__ = (Index("ix_addresses_created_at_id", "created_at", "id"),)
 
     street: Mapped[str]
     city: Mapped[str]
@@ -17,7 +27,45 @@ class AddressTable(BaseTable):
 
 class CustomersTable(BaseTable):
     __tablename__ = "customers"
+    __table_args__ = (
+        Index("ix_customers_created_at_id", "created_at", "id"),
+        Index("ix_customers_address_id", "address_id"),
+        # Trigram index for fuzzy name search, on the same expression the search
+        # query uses. Needs the `pg_trgm` extension.
+        Index(
+            "ix_customers_full_name_trgm",
+            text("(first_name || ' ' || last_name) gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
+        # Byte-ordered, so autocomplete can both range-scan a prefix and read the
+        # matches back in (name, id) order without sorting them.
+        Index(
+            "ix_customers_first_name_prefix",
+            text('lower(first_name) COLLATE "C"'),
+            "id",
+        ),
+        Index(
+            "ix_customers_last_name_prefix", text('lower(last_name) COLLATE "C"'), "id"
+        ),
+    )
 
     first_name: Mapped[str]
     last_name: Mapped[str]
     address_id: Mapped[UUID | None] = mapped_column(ForeignKey("addresses.id"))
+
+
+# Customers with an address counted per state, city and zip code, and in total. A
+# materialized view created by migration, so it is not part of `metadata`.
+#
+# `level` is "state", "city", "zip_code" or "total"; columns finer than the level
+# are '' rather than NULL, which `REFRESH ... CONCURRENTLY` could not match to the
+# previous contents of the view. Only the "total" row has `refreshed_at`.
+CUSTOMER_STATS = table(
+    "customer_stats",
+    column("level", String),
+    column("state", String),
+    column("city", String),
+    column("zip_code", String),
+    column("customers", BigInteger),
+    column("refreshed_at", DateTime(timezone=True)),
+)
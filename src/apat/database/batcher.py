@@ -0,0 +1,91 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from apat.database.replicas import mark_written
+
+
+class WriteBatcher[V, R]:
+    """
+    Group-commit `write(values)` calls made within `max_delay` seconds of each
+    other - from any number of concurrent requests - into a single
+    `write_batch(values)` call, which writes them in one transaction and returns one
+    result per value, in order. A batch is written as soon as it holds
+    `max_batch_size` values.
+
+    A batch failing with one of the `isolate` exceptions, which a single bad value
+    can cause, is split in halves that are written separately, down to single
+    values, so only the values at fault get the exception. Any other exception
+    fails the whole batch. Values of callers cancelled meanwhile are still written.
+    Callers' later reads go to the primary, as after a commit of their own.
+
+    When disabled, each value is written on its own straight away.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[list[V]], Awaitable[list[R]]],
+        max_batch_size: int = 500,
+        max_delay: float = 0.002,
+        enabled: bool = True,
+        isolate: tuple[type[Exception], ...] = (IntegrityError, DataError),
+    ) -> None:
+        self._write_batch = write_batch
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self.enabled = enabled
+        self._isolate = isolate
+        self._pending: list[tuple[V, asyncio.Future[R]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def write(self, values: V) -> R:
+        if not self.enabled:
+            [result] = await self._write_batch([values])
+            return result
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._pending.append((values, future))
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self._flush)
+        # Shielded so that one cancelled caller does not cancel the others.
+        result = await asyncio.shield(future)
+        # The batch committed in a task of its own, which did not mark this one.
+        mark_written()
+        return result
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[V, asyncio.Future[R]]]) -> None:
+        try:
+            results = await self._write_batch([values for values, _ in batch])
+        except self._isolate as exc:
+            if len(batch) == 1:
+                self._fail(batch, exc)
+                return
+            middle = len(batch) // 2
+            await asyncio.gather(self._run(batch[:middle]), self._run(batch[middle:]))
+            return
+        except Exception as exc:
+            self._fail(batch, exc)
+            return
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if not future.done():
+                future.set_result(result)
+
+    def _fail(self, batch: list[tuple[V, asyncio.Future[R]]], exc: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
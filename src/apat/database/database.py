@@ -1,21 +1,62 @@
 from collections.abc import AsyncGenerator, Callable
 from contextlib import AbstractAsyncContextManager, asynccontextmanager
 
+from asyncpg import Connection as DriverConnection  # type: ignore[import-untyped]
 from sqlalchemy import (
     MetaData,
 )
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
-from apat.settings import settings
+from apat.database.log import log_queries
+from apat.database.metrics import track_query_metrics
+from apat.database.pool import PoolMetrics
+from apat.database.replicas import ReplicaSet, track_writes
+from apat.database.timing import track_query_timings
+from apat.settings import Settings, settings
 
 type SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
 type ConnectionFactory = Callable[[], AbstractAsyncContextManager[AsyncConnection]]
-engine = create_async_engine(str(settings.database_dsn))
+
+
+def create_engine(dsn: str, settings: Settings = settings) -> AsyncEngine:
+    statement_cache_size = settings.database_statement_cache_size
+    return create_async_engine(
+        dsn,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+        pool_pre_ping=settings.database_pool_pre_ping,
+        connect_args={
+            # SQLAlchemy's own prepared statement LRU, and asyncpg's, used by raw
+            # driver calls.
+            "prepared_statement_cache_size": statement_cache_size,
+            "statement_cache_size": statement_cache_size,
+        },
+    )
+
+
+engine = create_engine(str(settings.database_dsn))
+pool_metrics = PoolMetrics(engine)
+track_writes(engine)
+read_replicas = ReplicaSet(
+    pool_metrics,
+    [create_engine(str(dsn)) for dsn in settings.database_replica_dsns],
+    retry_after=settings.database_replica_retry_after,
+)
+for tracked_engine in (engine, *(r.engine for r in read_replicas.replicas)):
+    if settings.server_timing:
+        track_query_timings(tracked_engine.sync_engine)
+    if settings.metrics_enabled:
+        track_query_metrics(tracked_engine.sync_engine)
+    if settings.sql_log_threshold is not None or settings.sql_log_sample_rate:
+        log_queries(tracked_engine.sync_engine)
 autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
 _sessionmaker = async_sessionmaker(autocommit=False, bind=engine)
 metadata = MetaData()
@@ -52,10 +93,7 @@ async def db_conn(autocommit: bool = False) -> AsyncGenerator[AsyncConnection]:
     """
     ...
     """
-    if autocommit:
-        conn = await autocommit_engine.connect()
-    else:
-        conn = await engine.connect()
+    conn = await pool_metrics.connect(autocommit_engine if autocommit else engine)
     try:
         yield conn
     except Exception:
@@ -67,3 +105,41 @@ async def db_conn(autocommit: bool = False) -> AsyncGenerator[AsyncConnection]:
 
 def conn_factory() -> ConnectionFactory:
     return db_conn
+
+
+@asynccontextmanager
+async def db_read_conn() -> AsyncGenerator[AsyncConnection]:
+    """
+    Like `db_conn`, but served by a read replica when one is configured and
+    healthy. Only use it for handlers that do not write.
+    """
+    conn = await read_replicas.connect()
+    try:
+        yield conn
+    except Exception:
+        await conn.rollback()
+        raise
+    finally:
+        await conn.close()
+
+
+def read_conn_factory() -> ConnectionFactory:
+    return db_read_conn
+
+
+async def driver_connection(conn: AsyncConnection) -> DriverConnection:
+    """
+    Return the asyncpg connection underneath `conn`, joined to its transaction.
+
+    SQLAlchemy only begins the driver-level transaction on the first statement it
+    executes itself, so one is run here when needed for raw driver calls (COPY,
+    etc.) to run in the same transaction as the surrounding CRUD calls. The
+    connection's own transaction is begun too, or a later `commit()` would have
+    nothing to commit.
+    """
+    if not conn.in_transaction():
+        await conn.begin()
+    driver: DriverConnection = (await conn.get_raw_connection()).driver_connection
+    if not driver.is_in_transaction():
+        await conn.exec_driver_sql("SELECT 1")
+    return driver
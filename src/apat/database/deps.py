@@ -6,6 +6,7 @@ from apat.database.database import (
     ConnectionFactory,
     SessionFactory,
     conn_factory,
+    read_conn_factory,
     session_factory,
 )
 
@@ -18,3 +19,8 @@ DBConnDep = Annotated[
     ConnectionFactory,
     Depends(conn_factory),
 ]
+
+DBReadConnDep = Annotated[
+    ConnectionFactory,
+    Depends(read_conn_factory),
+]
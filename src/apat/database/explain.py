@@ -0,0 +1,76 @@
+import json
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import ClauseElement
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql.compiler import SQLCompiler
+
+type PlanNode = dict[str, Any]
+
+
+@dataclass(frozen=True, kw_only=True)
+class SeqScan:
+    relation: str
+    # Rows read by the scan across all loops, including those the filter dropped.
+    rows: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class QueryPlan:
+    plan: PlanNode
+
+    @property
+    def shared_buffers(self) -> int:
+        """
+        Shared buffers hit or read by the whole plan.
+        """
+        return int(self.plan["Shared Hit Blocks"] + self.plan["Shared Read Blocks"])
+
+    @property
+    def seq_scans(self) -> list[SeqScan]:
+        return [
+            SeqScan(
+                relation=node["Relation Name"],
+                rows=int(
+                    (node["Actual Rows"] + node.get("Rows Removed by Filter", 0))
+                    * node["Actual Loops"]
+                ),
+            )
+            for node in walk(self.plan)
+            if node["Node Type"] == "Seq Scan"
+        ]
+
+
+def walk(node: PlanNode) -> Iterator[PlanNode]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from walk(child)
+
+
+async def explain(
+    conn: AsyncConnection,
+    statement: ClauseElement,
+    params: Mapping[str, Any] | None = None,
+) -> QueryPlan:
+    """
+    Run `statement` under `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`, compiled and
+    bound the way `conn.execute(statement, params)` would.
+
+    ANALYZE executes the statement - wrap writes in a transaction that is rolled
+    back.
+    """
+    compiled = statement.compile(
+        dialect=conn.dialect, column_keys=list(params) if params else None
+    )
+    assert isinstance(compiled, SQLCompiler)
+    bound = compiled.construct_params(params)
+    args = tuple(bound[name] for name in compiled.positiontup or ())
+    result = await conn.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}", args
+    )
+    document = result.scalar_one()
+    if isinstance(document, str):
+        document = json.loads(document)
+    return QueryPlan(plan=document[0]["Plan"])
@@ -0,0 +1,98 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from contextvars import Context, copy_context
+from dataclasses import dataclass, field
+from itertools import batched
+
+from apat import timing
+from apat.database.replicas import wrote_to_primary
+
+
+@dataclass(kw_only=True)
+class _Load[V]:
+    future: asyncio.Future[V | None]
+    # Of the requests waiting for the key, which its batch adds its own time to.
+    timings: list[timing.RequestTimings] = field(default_factory=list)
+
+
+class BatchLoader[K: Hashable, V]:
+    """
+    Coalesce `load(key)` calls made during the same event-loop tick - from any
+    number of concurrent requests - into a single `batch_load(keys)` call, and fan
+    the results back out. Concurrent loads of the same key share one lookup.
+
+    `batch_load` returns a mapping from key to value; keys missing from it load as
+    `None`. An exception fails every key in that batch.
+
+    Loads of requests that committed on the primary are batched apart from the
+    others, and each batch runs in the context of one of its callers, so it is
+    routed to a replica or the primary as their own reads would be. The time a
+    batch spends is added to the timings of every request waiting for it.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[list[K]], Awaitable[Mapping[K, V]]],
+        max_batch_size: int = 500,
+    ) -> None:
+        self._batch_load = batch_load
+        self._max_batch_size = max_batch_size
+        self._pending: dict[bool, tuple[Context, dict[K, _Load[V]]]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def load(self, key: K) -> V | None:
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            loop.call_soon(self._dispatch)
+        wrote = wrote_to_primary()
+        if wrote not in self._pending:
+            self._pending[wrote] = (copy_context(), {})
+        _, pending = self._pending[wrote]
+        load = pending.get(key)
+        if load is None:
+            load = pending[key] = _Load(future=loop.create_future())
+        timings = timing.current()
+        if timings is not None:
+            load.timings.append(timings)
+        # Shielded so that one cancelled caller does not cancel the others.
+        return await asyncio.shield(load.future)
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        return await asyncio.gather(*(self.load(key) for key in keys))
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        for context, loads in pending.values():
+            for batch in batched(loads.items(), self._max_batch_size):
+                task = asyncio.create_task(
+                    self._run(dict(batch)), context=context.copy()
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[K, _Load[V]]) -> None:
+        try:
+            results = await self._timed_batch_load(batch)
+        except Exception as exc:
+            for load in batch.values():
+                if not load.future.done():
+                    load.future.set_exception(exc)
+            return
+
+        for key, load in batch.items():
+            if not load.future.done():
+                load.future.set_result(results.get(key))
+
+    async def _timed_batch_load(self, batch: dict[K, _Load[V]]) -> Mapping[K, V]:
+        # Each waiting request once, however many of the keys it asked for.
+        waiters = {id(t): t for load in batch.values() for t in load.timings}
+        if not waiters:
+            return await self._batch_load(list(batch))
+        # Timed apart from the caller whose context the batch runs in.
+        batch_timings, token = timing.start()
+        try:
+            return await self._batch_load(list(batch))
+        finally:
+            timing.stop(token)
+            for timings in waiters.values():
+                timings.merge(batch_timings)
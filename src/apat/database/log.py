@@ -0,0 +1,53 @@
+import logging
+import random
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from apat.settings import settings
+
+LOGGER = logging.getLogger(__name__)
+
+
+def log_queries(engine: Engine) -> None:
+    """
+    Log the statements `engine` runs that take at least `settings.sql_log_threshold`
+    seconds, plus a random `settings.sql_log_sample_rate` fraction of all of them.
+
+    Cheaper than SQLAlchemy's statement logging, which formats every statement.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, *args: Any
+) -> None:
+    context._log_started = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, *args: Any
+) -> None:
+    duration = time.perf_counter() - context._log_started
+    threshold = settings.sql_log_threshold
+    slow = threshold is not None and duration >= threshold
+    if not slow and random.random() >= settings.sql_log_sample_rate:
+        return
+    extra: dict[str, Any] = {
+        "statement": statement,
+        "duration": round(duration * 1e3, 3),
+        "slow": slow,
+    }
+    if settings.sql_log_parameters:
+        extra["parameters"] = parameters
+    LOGGER.log(
+        logging.WARNING if slow else logging.INFO,
+        "%.1fms %s",
+        duration * 1e3,
+        statement,
+        extra=extra,
+    )
@@ -0,0 +1,28 @@
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from apat.metrics.metrics import DB_QUERY_DURATION
+
+
+def track_query_metrics(engine: Engine) -> None:
+    """
+    Observe the execution time of every query `engine` runs.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, *args: Any
+) -> None:
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, *args: Any
+) -> None:
+    DB_QUERY_DURATION.observe(time.perf_counter() - context._metrics_started)
@@ -0,0 +1,155 @@
+import base64
+import binascii
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from asyncpg import Record  # type: ignore[import-untyped]
+from sqlalchemy import DateTime, Integer, Row, Select, bindparam, tuple_
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from apat.database.tables import BaseTable
+from apat.database.versions import Version, records_version, rows_version
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True, kw_only=True)
+class Cursor:
+    """
+    Keyset position of the last row of a page, ordered on `(created_at, id)`.
+
+    The encoded form is opaque to clients - they should only ever pass back what
+    they were given in a `next` link.
+    """
+
+    created_at: datetime
+    bid: UUID
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            [self.created_at.isoformat(), str(self.bid)], separators=(",", ":")
+        )
+        return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            created_at, bid = json.loads(raw)
+            return cls(created_at=datetime.fromisoformat(created_at), bid=UUID(bid))
+        except (binascii.Error, ValueError, TypeError) as exc:
+            raise InvalidCursorError(token) from exc
+
+
+@dataclass(frozen=True, kw_only=True)
+class Page[T]:
+    items: list[T]
+    version: Version
+    next_cursor: Cursor | None = None
+
+
+def paginate[S: Select[Any]](
+    query: S,
+    table: type[BaseTable],
+    limit: int,
+    after: Cursor | None = None,
+) -> S:
+    """
+    Restrict `query` to one keyset page of `table`.
+
+    One extra row is fetched so `build_page` can tell whether a next page exists
+    without a separate count.
+    """
+    query = query.order_by(table.created_at, table.id).limit(
+        min(limit, MAX_PAGE_SIZE) + 1
+    )
+    if after is not None:
+        query = query.where(
+            tuple_(table.created_at, table.id) > (after.created_at, after.bid)
+        )
+    return query
+
+
+def paginate_params[S: Select[Any]](
+    query: S,
+    table: type[BaseTable],
+    after: bool,
+) -> S:
+    """
+    `paginate`, with the limit and the cursor - when `after` - left as the bound
+    parameters `page_params` fills in, so one compiled statement serves every page.
+    """
+    query = query.order_by(table.created_at, table.id).limit(
+        bindparam("limit", type_=Integer)
+    )
+    if after:
+        query = query.where(
+            tuple_(table.created_at, table.id)
+            > tuple_(
+                bindparam("after_created_at", type_=DateTime(timezone=True)),
+                bindparam("after_bid", type_=PG_UUID),
+            )
+        )
+    return query
+
+
+def page_params(limit: int, after: Cursor | None = None) -> dict[str, Any]:
+    params: dict[str, Any] = {"limit": min(limit, MAX_PAGE_SIZE) + 1}
+    if after is not None:
+        params["after_created_at"] = after.created_at
+        params["after_bid"] = after.bid
+    return params
+
+
+def build_page[T](
+    rows: Sequence[Row[Any]],
+    limit: int,
+    mapper: Callable[[Row[Any]], T],
+) -> Page[T]:
+    """
+    The page's `version` covers every fetched row, the extra one included, so it
+    matches the version of the same `paginate` query's `id` and `updated_at`.
+    """
+    limit = min(limit, MAX_PAGE_SIZE)
+    version = rows_version(rows)
+    if len(rows) <= limit:
+        return Page(items=[mapper(row) for row in rows], version=version)
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(
+        items=[mapper(row) for row in rows],
+        next_cursor=Cursor(created_at=last.created_at, bid=last.id),
+        version=version,
+    )
+
+
+def build_record_page[T](
+    records: Sequence[Record],
+    limit: int,
+    mapper: Callable[[Record], T],
+) -> Page[T]:
+    """
+    `build_page` for asyncpg records of a `paginate_params` query.
+    """
+    limit = min(limit, MAX_PAGE_SIZE)
+    version = records_version(records)
+    if len(records) <= limit:
+        return Page(items=[mapper(record) for record in records], version=version)
+
+    records = records[:limit]
+    last = records[-1]
+    return Page(
+        items=[mapper(record) for record in records],
+        next_cursor=Cursor(created_at=last["created_at"], bid=last["id"]),
+        version=version,
+    )
@@ -0,0 +1,98 @@
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from apat import timing
+
+
+@dataclass(frozen=True, kw_only=True)
+class PoolStats:
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    connects: int
+    invalidations: int
+    wait_count: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class PoolMetrics:
+    """
+    Connection pool instrumentation for one engine.
+
+    Counters come from SQLAlchemy pool events. Checkout wait - the time a caller
+    spends getting a connection, including opening a new one when the pool is not
+    full - is measured around `engine.connect()` by `connect`.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+        event.listen(engine.sync_engine, "checkout", self._on_checkout)
+        event.listen(engine.sync_engine, "connect", self._on_connect)
+        event.listen(engine.sync_engine, "invalidate", self._on_invalidate)
+
+    async def connect(self, engine: AsyncEngine | None = None) -> AsyncConnection:
+        """
+        Check out a connection from `engine` (or an execution-options variant of it
+        sharing the same pool), recording the wait.
+        """
+        start = time.perf_counter()
+        try:
+            return await (engine or self.engine).connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            timing.record(timing.POOL, waited)
+
+    def stats(self) -> PoolStats:
+        pool = self.engine.pool
+        if isinstance(pool, QueuePool):
+            size, checked_out, overflow = (
+                pool.size(),
+                pool.checkedout(),
+                max(pool.overflow(), 0),
+            )
+        else:
+            size = checked_out = overflow = 0
+        return PoolStats(
+            size=size,
+            checked_out=checked_out,
+            overflow=overflow,
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            connects=self.connects,
+            invalidations=self.invalidations,
+            wait_count=self.wait_count,
+            wait_seconds_total=self.wait_seconds_total,
+            wait_seconds_max=self.wait_seconds_max,
+        )
+
+    def _on_checkout(self, *args: Any) -> None:
+        self.checkouts += 1
+
+    def _on_connect(self, *args: Any) -> None:
+        self.connects += 1
+
+    def _on_invalidate(self, *args: Any) -> None:
+        self.invalidations += 1
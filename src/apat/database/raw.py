@@ -0,0 +1,68 @@
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from asyncpg import Connection as DriverConnection  # type: ignore[import-untyped]
+from asyncpg import Record
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql.compiler import SQLCompiler
+
+from apat import timing
+from apat.metrics.metrics import DB_QUERY_DURATION
+from apat.settings import settings
+
+_DIALECT = PGDialect_asyncpg()  # type: ignore[no-untyped-call]
+
+
+class RawStatement:
+    """
+    A Core statement compiled once, up front, to asyncpg's SQL and positional
+    parameters, for `fetch` to run straight on the driver connection.
+
+    That skips SQLAlchemy's work on every execution - cache key lookup, parameter
+    processing, building a `Result` and its `Row`s - leaving asyncpg's. asyncpg
+    prepares each SQL string as a named statement once per connection and keeps it
+    in its statement cache (`database_statement_cache_size`), so later calls only
+    bind and execute it.
+
+    Only for statements whose column types need no SQLAlchemy result processing:
+    values come back exactly as asyncpg decodes them.
+    """
+
+    __slots__ = ("_names", "sql")
+
+    def __init__(self, statement: ClauseElement) -> None:
+        compiled = statement.compile(dialect=_DIALECT)
+        assert isinstance(compiled, SQLCompiler)
+        self.sql = str(compiled)
+        self._names = tuple(compiled.positiontup or ())
+
+    def args(self, params: Mapping[str, Any]) -> list[Any]:
+        return [params[name] for name in self._names]
+
+
+async def fetch(
+    conn: AsyncConnection, statement: RawStatement, params: Mapping[str, Any]
+) -> list[Record]:
+    """
+    Run `statement` on the asyncpg connection underneath `conn` and return its
+    records.
+
+    The statement joins the driver-level transaction if SQLAlchemy has begun one,
+    so it reads the connection's own uncommitted writes. It bypasses the engine's
+    event hooks, so its time is recorded towards the current request's timings and
+    the query duration metric here; the SQL log does not see it.
+    """
+    driver: DriverConnection = (await conn.get_raw_connection()).driver_connection
+    start = time.perf_counter()
+    records: list[Record] = await driver.fetch(statement.sql, *statement.args(params))
+    elapsed = time.perf_counter() - start
+    timings = timing.current()
+    if timings is not None:
+        timings.add(timing.DB, elapsed)
+        timings.queries += 1
+    if settings.metrics_enabled:
+        DB_QUERY_DURATION.observe(elapsed)
+    return records
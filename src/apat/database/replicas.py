@@ -0,0 +1,101 @@
+import logging
+import time
+from collections.abc import Callable, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from apat.database.pool import PoolMetrics
+
+LOGGER = logging.getLogger(__name__)
+
+# Set once the current task commits on the primary, so that its later reads are
+# not served by a replica that may not have replayed the write yet.
+_wrote_to_primary: ContextVar[bool] = ContextVar("wrote_to_primary", default=False)
+
+
+def track_writes(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "commit", _mark_written)
+
+
+def _mark_written(*args: Any) -> None:
+    mark_written()
+
+
+def wrote_to_primary() -> bool:
+    return _wrote_to_primary.get()
+
+
+def mark_written() -> None:
+    """
+    Route the current task's later reads to the primary, for a write committed on
+    its behalf by another task, whose context it does not share.
+    """
+    _wrote_to_primary.set(True)
+
+
+@dataclass(kw_only=True)
+class Replica:
+    engine: AsyncEngine
+    metrics: PoolMetrics
+    down_until: float = 0.0
+
+
+class ReplicaSet:
+    """
+    Route read-only connections round-robin over replicas.
+
+    A replica that fails to connect is skipped for `retry_after` seconds. With no
+    healthy replica - or none configured, or after the current task committed on
+    the primary - reads fall back to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: PoolMetrics,
+        replicas: Sequence[AsyncEngine],
+        retry_after: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.primary = primary
+        self.replicas = [
+            Replica(engine=engine, metrics=PoolMetrics(engine)) for engine in replicas
+        ]
+        self.retry_after = retry_after
+        self._clock = clock
+        self._next = 0
+
+    async def connect(self) -> AsyncConnection:
+        if not _wrote_to_primary.get():
+            for replica in self._healthy():
+                try:
+                    return await replica.metrics.connect()
+                except (OSError, TimeoutError, DBAPIError):
+                    self.mark_down(replica)
+        return await self.primary.connect()
+
+    def mark_down(self, replica: Replica) -> None:
+        LOGGER.warning(
+            "Replica %s is unavailable, skipping it for %ss",
+            replica.engine.url.render_as_string(),
+            self.retry_after,
+            exc_info=True,
+        )
+        replica.down_until = self._clock() + self.retry_after
+
+    def _healthy(self) -> list[Replica]:
+        if not self.replicas:
+            return []
+        now = self._clock()
+        start = self._next
+        self._next = (self._next + 1) % len(self.replicas)
+        rotated = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in rotated if replica.down_until <= now]
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
@@ -11,10 +11,17 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 from apat.database.database import metadata
 
+# Time-ordered version 7 UUIDs, from the `uuid_generate_v7()` function the
+# migrations install, keep inserts at the right edge of the primary key index;
+# random ones touch a different leaf page each. See `apat.database.uuids.uuid7` for
+# ids generated in the app.
 PrimaryKeyColumn = Annotated[
     uuid.UUID,
     mapped_column(
-        UUID, primary_key=True, nullable=False, server_default=text("gen_random_uuid()")
+        UUID,
+        primary_key=True,
+        nullable=False,
+        server_default=text("uuid_generate_v7()"),
     ),
 ]
 AutoAddColumn = Annotated[
@@ -22,18 +29,20 @@ AutoAddColumn = Annotated[
     mapped_column(
         DateTime(timezone=True),
         server_default=text("current_timestamp(0)"),
-        nullable=True,
+        nullable=False,
         default=None,
     ),
 ]
+# Microsecond precision, unlike `AutoAddColumn`: it versions the row for ETags,
+# which must change with every write, not just with every second.
 AutoAddNowColumn = Annotated[
     datetime,
     mapped_column(
         DateTime(timezone=True),
-        server_default=text("current_timestamp(0)"),
+        server_default=text("current_timestamp"),
         nullable=False,
         default=None,
-        onupdate=text("current_timestamp(0)"),
+        onupdate=text("current_timestamp"),
     ),
 ]
 
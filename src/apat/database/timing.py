@@ -0,0 +1,33 @@
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from apat import timing
+
+
+def track_query_timings(engine: Engine) -> None:
+    """
+    Count the queries `engine` runs, and their time, towards the current request.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, *args: Any
+) -> None:
+    if timing.current() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, *args: Any
+) -> None:
+    timings = timing.current()
+    started = getattr(context, "_query_started", None)
+    if timings is not None and started is not None:
+        timings.add(timing.DB, time.perf_counter() - started)
+        timings.queries += 1
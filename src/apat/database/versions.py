@@ -0,0 +1,57 @@
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from asyncpg import Record  # type: ignore[import-untyped]
+from sqlalchemy import Row
+
+
+@dataclass(frozen=True, kw_only=True)
+class Version:
+    """
+    Identifies the state of the rows a representation is built from. `tag` changes
+    whenever any of them is inserted, updated or removed.
+    """
+
+    tag: str
+    last_modified: datetime | None = None
+
+    @classmethod
+    def of(cls, *parts: object, last_modified: datetime | None) -> "Version":
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=16)
+        return cls(tag=digest.hexdigest(), last_modified=last_modified)
+
+
+@dataclass(frozen=True, kw_only=True)
+class Versioned[T]:
+    """
+    `value` with the version of the rows it was built from, read together so the
+    two always match.
+    """
+
+    value: T
+    version: Version
+
+
+def rows_version(rows: Iterable[Row[Any]]) -> Version:
+    """
+    Version of a list built from `rows`, which need `id` and `updated_at` columns.
+    """
+    return _list_version([(row.id, row.updated_at) for row in rows])
+
+
+def records_version(records: Iterable[Record]) -> Version:
+    """
+    `rows_version` of asyncpg records, for lists read with `apat.database.raw`.
+    """
+    return _list_version([(record["id"], record["updated_at"]) for record in records])
+
+
+def _list_version(parts: list[tuple[UUID, datetime]]) -> Version:
+    return Version.of(
+        *parts,
+        last_modified=max((updated_at for _, updated_at in parts), default=None),
+    )
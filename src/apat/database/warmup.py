@@ -0,0 +1,38 @@
+import asyncio
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import Executable
+
+type Statements = Sequence[tuple[Executable, Mapping[str, Any]]]
+
+
+async def warm_up(
+    engine: AsyncEngine, connections: int, statements: Statements = ()
+) -> None:
+    """
+    Open `connections` connections to `engine` at once and run each of `statements`
+    on every one of them, so the pool holds validated connections with the
+    statements already compiled and prepared when the first requests arrive.
+
+    Every connection stays checked out until all are done, or the pool would hand
+    the same few back out. Statements run in a transaction that is rolled back.
+    Nothing is opened for no `connections`, as with an unbounded pool.
+    """
+    if connections < 1:
+        return
+    done = asyncio.Barrier(connections)
+
+    async def warm_up_connection() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(sqlalchemy.text("SELECT 1"))
+            for statement, params in statements:
+                await conn.execute(statement, params)
+            await conn.rollback()
+            await done.wait()
+
+    async with asyncio.TaskGroup() as group:
+        for _ in range(connections):
+            group.create_task(warm_up_connection())
@@ -0,0 +1,134 @@
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Interval, any_, bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from apat.customers.crud import SessionOrConnection
+from apat.jobs.models import Job
+from apat.jobs.tables import JobsTable
+from apat.settings import settings
+
+INSERT_JOB = (
+    insert(JobsTable)
+    .values(run_at=func.now() + bindparam("delay", type_=Interval))
+    .returning(JobsTable.id)
+)
+# Due jobs, oldest first, skipping those another worker is claiming right now.
+CLAIMABLE_JOBS = (
+    select(JobsTable.id)
+    .where(JobsTable.failed_at.is_(None), JobsTable.run_at <= func.now())
+    .order_by(JobsTable.run_at)
+    .limit(bindparam("limit"))
+    .with_for_update(skip_locked=True)
+    .cte("claimable")
+)
+CLAIM_JOBS = (
+    update(JobsTable)
+    .where(JobsTable.id == CLAIMABLE_JOBS.c.id)
+    .values(
+        attempts=JobsTable.attempts + 1,
+        run_at=func.now() + bindparam("lease", type_=Interval),
+    )
+    .returning(
+        JobsTable.id,
+        JobsTable.task,
+        JobsTable.payload,
+        JobsTable.attempts,
+        JobsTable.max_attempts,
+    )
+)
+RETRY_JOB = (
+    update(JobsTable)
+    .where(JobsTable.id == bindparam("job_id"))
+    .values(
+        run_at=func.now() + bindparam("delay", type_=Interval),
+        last_error=bindparam("error"),
+    )
+)
+FAIL_JOB = (
+    update(JobsTable)
+    .where(JobsTable.id == bindparam("job_id"))
+    .values(failed_at=func.now(), last_error=bindparam("error"))
+)
+DELETE_JOBS = delete(JobsTable).where(
+    JobsTable.id == any_(bindparam("ids", type_=ARRAY(PG_UUID)))
+)
+
+
+class JobCRUD:
+    @classmethod
+    async def enqueue(
+        cls,
+        session_or_connection: SessionOrConnection,
+        task: str,
+        payload: dict[str, Any],
+        delay: timedelta = timedelta(0),
+        max_attempts: int = settings.jobs_max_attempts,
+    ) -> UUID:
+        """
+        Queue `task` to run with `payload`, once `delay` has passed.
+
+        The job is inserted in the connection's transaction, so it is only picked
+        up once that commits, and never if it rolls back.
+        """
+        result = await session_or_connection.execute(
+            INSERT_JOB,
+            {
+                "task": task,
+                "payload": payload,
+                "max_attempts": max_attempts,
+                "delay": delay,
+            },
+        )
+        bid: UUID = result.scalar_one()
+        return bid
+
+    @classmethod
+    async def claim(
+        cls, session_or_connection: SessionOrConnection, limit: int, lease: timedelta
+    ) -> list[Job]:
+        """
+        Take up to `limit` due jobs for `lease`, after which they are due again
+        unless completed, retried or failed first.
+        """
+        result = await session_or_connection.execute(
+            CLAIM_JOBS, {"limit": limit, "lease": lease}
+        )
+        return [
+            Job(
+                bid=row.id,
+                task=row.task,
+                payload=row.payload,
+                attempts=row.attempts,
+                max_attempts=row.max_attempts,
+            )
+            for row in result.all()
+        ]
+
+    @classmethod
+    async def complete(
+        cls, session_or_connection: SessionOrConnection, bids: Sequence[UUID]
+    ) -> None:
+        await session_or_connection.execute(DELETE_JOBS, {"ids": list(bids)})
+
+    @classmethod
+    async def retry(
+        cls,
+        session_or_connection: SessionOrConnection,
+        bid: UUID,
+        error: str,
+        delay: timedelta,
+    ) -> None:
+        await session_or_connection.execute(
+            RETRY_JOB, {"job_id": bid, "error": error, "delay": delay}
+        )
+
+    @classmethod
+    async def fail(
+        cls, session_or_connection: SessionOrConnection, bid: UUID, error: str
+    ) -> None:
+        await session_or_connection.execute(FAIL_JOB, {"job_id": bid, "error": error})
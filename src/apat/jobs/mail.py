@@ -0,0 +1,38 @@
+from email.message import EmailMessage
+from typing import Any
+from uuid import UUID
+
+import aiosmtplib
+
+from apat.customers.crud import SessionOrConnection
+from apat.jobs.crud import JobCRUD
+from apat.settings import settings
+
+SEND_EMAIL = "send_email"
+
+
+async def send_email(payload: dict[str, Any]) -> None:
+    message = EmailMessage()
+    message["From"] = settings.smtp_sender
+    message["To"] = payload["to"]
+    message["Subject"] = payload["subject"]
+    message.set_content(payload["body"])
+    await aiosmtplib.send(
+        message,
+        hostname=settings.smtp_host,
+        port=settings.smtp_port,
+        timeout=settings.smtp_timeout,
+    )
+
+
+async def enqueue_email(
+    session_or_connection: SessionOrConnection, to: str, subject: str, body: str
+) -> UUID:
+    """
+    Queue an email to be sent by a worker once the current transaction commits.
+    """
+    return await JobCRUD.enqueue(
+        session_or_connection,
+        SEND_EMAIL,
+        {"to": to, "subject": subject, "body": body},
+    )
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+
+@dataclass(frozen=True, kw_only=True)
+class Job:
+    bid: UUID
+    task: str
+    payload: dict[str, Any]
+    # Including the current one.
+    attempts: int
+    max_attempts: int
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from apat.database.tables import AutoAddColumn, UUIDBase
+
+
+class JobsTable(UUIDBase):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claims read due jobs in `run_at` order; failed jobs are kept only for
+        # inspection and stay out of the index.
+        Index("ix_jobs_run_at", "run_at", postgresql_where=text("failed_at IS NULL")),
+    )
+
+    task: Mapped[str]
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB)
+    attempts: Mapped[int] = mapped_column(server_default=text("0"))
+    max_attempts: Mapped[int]
+    # When the job is next due: on claiming it, pushed past the lease, so a job
+    # whose worker died is claimed again once its lease runs out.
+    run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=text("current_timestamp")
+    )
+    created_at: Mapped[AutoAddColumn]
+    failed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[str | None]
@@ -0,0 +1,11 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from apat.jobs.mail import SEND_EMAIL, send_email
+
+type Task = Callable[[dict[str, Any]], Awaitable[None]]
+
+# What workers run for each job's `task` name.
+TASKS: dict[str, Task] = {
+    SEND_EMAIL: send_email,
+}
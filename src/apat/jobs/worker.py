@@ -0,0 +1,148 @@
+import asyncio
+import contextlib
+import logging
+import random
+import traceback
+from collections.abc import Mapping
+from datetime import timedelta
+from uuid import UUID
+
+from apat.database.batcher import WriteBatcher
+from apat.database.database import ConnectionFactory
+from apat.jobs.crud import JobCRUD
+from apat.jobs.models import Job
+from apat.jobs.tasks import TASKS, Task
+from apat.settings import settings
+
+LOGGER = logging.getLogger(__name__)
+
+
+def backoff(attempts: int, base: float, maximum: float) -> timedelta:
+    """
+    The delay before retrying a job whose `attempts`th attempt failed: doubling
+    from `base` seconds up to `maximum`, less up to half of it at random, so jobs
+    that failed together do not all retry together.
+    """
+    delay = min(base * 2 ** (attempts - 1), maximum)
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+class Worker:
+    """
+    Run queued jobs: claim due ones in batches of up to `batch_size`, run up to
+    `concurrency` at a time, delete those that succeed and retry those that fail,
+    with backoff, until they run out of attempts and are marked failed.
+
+    Claims skip rows other workers have locked, so any number of workers can share
+    the queue without claiming the same job twice. A claimed job is due again once
+    its `lease` runs out, which is what recovers the jobs of a worker that died;
+    jobs still running by then are cancelled. Jobs therefore run at least once, not
+    exactly once.
+
+    An idle worker polls every `poll_interval` seconds; a busy one claims more as
+    soon as jobs finish.
+    """
+
+    def __init__(
+        self,
+        get_db: ConnectionFactory,
+        tasks: Mapping[str, Task] = TASKS,
+        concurrency: int = 10,
+        batch_size: int = 10,
+        poll_interval: float = 1.0,
+        lease: float = settings.jobs_lease,
+        backoff_base: float = settings.jobs_backoff_base,
+        backoff_max: float = settings.jobs_backoff_max,
+    ) -> None:
+        self.get_db = get_db
+        self.tasks = tasks
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._running: set[asyncio.Task[None]] = set()
+        # Set when a job finishes or the worker is stopped.
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        # Successful jobs are deleted in group commits rather than one by one.
+        self._completions = WriteBatcher(self._complete, isolate=())
+
+    def stop(self) -> None:
+        """
+        Stop claiming jobs; `run` returns once the running ones finish.
+        """
+        self._stopping = True
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        try:
+            while not self._stopping:
+                self._wakeup.clear()
+                limit = min(self.concurrency - len(self._running), self.batch_size)
+                if limit == 0:
+                    await self._wakeup.wait()
+                elif await self._claim(limit) < limit:
+                    # The queue is drained for now.
+                    with contextlib.suppress(TimeoutError):
+                        async with asyncio.timeout(self.poll_interval):
+                            await self._wakeup.wait()
+        finally:
+            if self._running:
+                await asyncio.wait(self._running)
+
+    async def _claim(self, limit: int) -> int:
+        try:
+            async with self.get_db() as conn:
+                jobs = await JobCRUD.claim(conn, limit, self.lease)
+                await conn.commit()
+        except Exception:
+            LOGGER.exception("Could not claim jobs")
+            return 0
+        for job in jobs:
+            task = asyncio.create_task(self._run(job))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+        return len(jobs)
+
+    def _finished(self, task: asyncio.Task[None]) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def _run(self, job: Job) -> None:
+        try:
+            try:
+                async with asyncio.timeout(self.lease.total_seconds()):
+                    await self.tasks[job.task](job.payload)
+            except Exception as exc:
+                await self._failed(job, exc)
+            else:
+                await self._completions.write(job.bid)
+        except Exception:
+            # The job is claimed again once its lease runs out.
+            LOGGER.exception("Could not record the result of job %s", job.bid)
+
+    async def _failed(self, job: Job, exc: Exception) -> None:
+        error = "".join(traceback.format_exception(exc))
+        extra = {"job": str(job.bid), "task": job.task, "attempts": job.attempts}
+        async with self.get_db() as conn:
+            if job.attempts >= job.max_attempts:
+                LOGGER.error("Job %s failed for good", job.bid, extra=extra)
+                await JobCRUD.fail(conn, job.bid, error)
+            else:
+                delay = backoff(job.attempts, self.backoff_base, self.backoff_max)
+                LOGGER.warning(
+                    "Job %s failed, retrying in %.1fs",
+                    job.bid,
+                    delay.total_seconds(),
+                    extra=extra,
+                )
+                await JobCRUD.retry(conn, job.bid, error, delay)
+            await conn.commit()
+
+    async def _complete(self, bids: list[UUID]) -> list[None]:
+        async with self.get_db() as conn:
+            await JobCRUD.complete(conn, bids)
+            await conn.commit()
+        return [None] * len(bids)
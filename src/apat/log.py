@@ -0,0 +1,88 @@
+import copy
+import json
+import logging
+import logging.handlers
+from datetime import UTC, datetime
+from typing import Any
+
+# Attributes every `LogRecord` has; anything else on a record came from `extra=`.
+# uvicorn adds `color_message`, an ANSI-coloured copy of the message.
+_RECORD_ATTRIBUTES = frozenset(
+    (
+        *logging.makeLogRecord({}).__dict__,
+        "message",
+        "asctime",
+        "taskName",
+        "color_message",
+    )
+)
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format records as one compact JSON object per line, with `extra=` fields
+    included as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        document: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                document[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            document["exc_info"] = record.exc_text
+        if record.stack_info:
+            document["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(document, default=str, separators=(",", ":"))
+
+
+class QueueListener(logging.handlers.QueueListener):
+    """
+    A `QueueListener` that starts its thread when created, so configuring a
+    `QueueHandler` with `logging.config.dictConfig` is enough to get it running.
+    """
+
+    def __init__(
+        self,
+        queue: Any,
+        *handlers: logging.Handler,
+        respect_handler_level: bool = False,
+    ) -> None:
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.start()
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Hand records to a background thread that formats and writes them, leaving only
+    a copy and a queue put on the calling thread.
+
+    Unlike the stdlib handler, the record keeps its message and traceback apart, so
+    the formatter on the listener side can render them as separate fields. Closing
+    the handler, which `logging.shutdown` does at exit, drains the queue first.
+    """
+
+    listener: logging.handlers.QueueListener | None = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def close(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+        super().close()
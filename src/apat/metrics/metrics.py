@@ -0,0 +1,45 @@
+from apat.metrics.registry import Registry
+from apat.settings import settings
+
+registry = Registry(
+    directory=settings.metrics_dir, flush_interval=settings.metrics_flush_interval
+)
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, from receiving the request to sending the last byte.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+RESPONSE_SIZE = registry.histogram(
+    "http_response_size_bytes",
+    "HTTP response body size.",
+    ["method", "route"],
+    buckets=[100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+)
+COALESCED_REQUESTS = registry.counter(
+    "http_coalesced_requests_total",
+    "HTTP requests answered with the response of an identical one in flight.",
+    ["method", "route"],
+)
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "Database cursor execution time."
+)
+POOL_SIZE = registry.gauge("db_pool_size", "Connections the pool keeps.", ["pool"])
+POOL_CHECKED_OUT = registry.gauge(
+    "db_pool_checked_out", "Connections currently checked out.", ["pool"]
+)
+POOL_OVERFLOW = registry.gauge(
+    "db_pool_overflow", "Connections open beyond the pool size.", ["pool"]
+)
+POOL_CHECKOUTS = registry.counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool.", ["pool"]
+)
+POOL_TIMEOUTS = registry.counter(
+    "db_pool_timeouts_total", "Checkouts that timed out waiting.", ["pool"]
+)
+POOL_WAIT = registry.counter(
+    "db_pool_wait_seconds_total", "Time spent waiting for a checkout.", ["pool"]
+)
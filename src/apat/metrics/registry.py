@@ -0,0 +1,390 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Literal
+
+import anyio.to_thread
+
+type Labels = tuple[str, ...]
+type MetricType = Literal["counter", "gauge", "histogram"]
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Counters and histograms of exited workers, folded together by `Registry.render`.
+EXITED_SNAPSHOT = "metrics-exited.json"
+
+
+class Metric(ABC):
+    type: MetricType
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> dict[Labels, Any]: ...
+
+
+class Counter(Metric):
+    type: MetricType = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set_total(self, value: float, labels: Labels = ()) -> None:
+        """
+        Mirror a running total kept elsewhere, from a collector.
+        """
+        self._values[labels] = value
+
+    def samples(self) -> dict[Labels, float]:
+        return dict(self._values)
+
+
+class Gauge(Counter):
+    type: MetricType = "gauge"
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self._values[labels] = value
+
+    def dec(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        self.inc(-amount, labels)
+
+
+class Histogram(Metric):
+    """
+    Observations bucketed by upper bound. Buckets are stored non-cumulative, so an
+    observation is one bisect and two increments, and made cumulative on render.
+    """
+
+    type: MetricType = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one count per bucket, then +Inf, then the sum.
+        self._values: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        counts = self._values.get(labels)
+        if counts is None:
+            counts = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> dict[Labels, list[float]]:
+        return {labels: list(counts) for labels, counts in self._values.items()}
+
+
+class Registry:
+    """
+    Holds a process's metrics and renders them in the Prometheus text format.
+
+    With a `directory`, every worker process writes a snapshot of its metrics there
+    within `flush_interval` seconds of recording, and `render` merges all the
+    snapshots: counters and histograms are summed over every process that has
+    written one, gauges only over processes still alive. Snapshots of exited
+    processes are folded into one, so the directory holds one file per running
+    worker plus that one.
+    """
+
+    def __init__(
+        self, directory: Path | None = None, flush_interval: float = 1.0
+    ) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], None]] = []
+        # Tells this process's snapshots from those of an exited one with the
+        # same, reused, pid.
+        self.started = time.time_ns()
+        self._flush_scheduled = False
+        self._flushes = 0
+        self._written = 0
+        self._write_lock = threading.Lock()
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def register[M: Metric](self, metric: M) -> M:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collect: Callable[[], None]) -> None:
+        """
+        Register a callback that updates gauges right before they are read.
+        """
+        self.collectors.append(collect)
+
+    def snapshot(self) -> dict[str, Any]:
+        for collect in self.collectors:
+            collect()
+        return {
+            "pid": os.getpid(),
+            "started": self.started,
+            "metrics": {
+                name: {
+                    "type": metric.type,
+                    "help": metric.help,
+                    "labelnames": metric.labelnames,
+                    "buckets": getattr(metric, "buckets", None),
+                    "samples": [
+                        [labels, value] for labels, value in metric.samples().items()
+                    ],
+                }
+                for name, metric in self.metrics.items()
+            },
+        }
+
+    def schedule_flush(self) -> None:
+        """
+        Make sure this process's snapshot is written within `flush_interval`.
+        Cheap enough to call after every recording.
+        """
+        if self.directory is None or self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        asyncio.get_running_loop().call_later(self.flush_interval, self._start_flush)
+
+    def _start_flush(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        """
+        Write this process's snapshot. It is taken on the event loop, which the
+        metrics are recorded on, and written from a worker thread, so that a slow
+        disk does not stall requests.
+        """
+        self._flush_scheduled = False
+        if self.directory is None:
+            return
+        self._flushes += 1
+        await anyio.to_thread.run_sync(
+            self._write_snapshot, self.directory, self._flushes, self.snapshot()
+        )
+
+    def _write_snapshot(
+        self, directory: Path, flush: int, snapshot: dict[str, Any]
+    ) -> None:
+        with self._write_lock:
+            # The thread of a later flush got here first.
+            if flush < self._written:
+                return
+            _write(directory / f"metrics-{os.getpid()}-{self.started}.json", snapshot)
+            self._written = flush
+
+    async def render(self) -> str:
+        if self.directory is None:
+            return render(merge([self.snapshot()]))
+        await self.flush()
+        # Waiting for another process's scrape to release the lock, and reading
+        # every snapshot, happen off the event loop too.
+        return await anyio.to_thread.run_sync(self._render_all, self.directory)
+
+    def _render_all(self, directory: Path) -> str:
+        with _locked(directory / "metrics.lock"):
+            return render(merge(self._collect(directory)))
+
+    def _collect(self, directory: Path) -> list[dict[str, Any]]:
+        """
+        Read every snapshot in `directory`, first folding those of exited workers
+        into `EXITED_SNAPSHOT` and deleting them.
+        """
+        snapshots: dict[Path, dict[str, Any]] = {}
+        for path in directory.glob("metrics-*.json"):
+            try:
+                snapshots[path] = json.loads(path.read_text())
+            except FileNotFoundError:
+                continue
+
+        exited_path = directory / EXITED_SNAPSHOT
+        exited = snapshots.pop(exited_path, None)
+        latest: dict[int, int] = {}
+        for snapshot in snapshots.values():
+            pid = snapshot["pid"]
+            latest[pid] = max(latest.get(pid, 0), snapshot["started"])
+        dead = [
+            path
+            for path, snapshot in snapshots.items()
+            if snapshot["started"] < latest[snapshot["pid"]]
+            or not _alive(snapshot["pid"])
+        ]
+        if dead:
+            # Files already folded in but still here, if a previous fold was
+            # interrupted before deleting them, are only deleted.
+            folded = set(exited["folded"]) if exited is not None else set()
+            exited = _fold(
+                [
+                    *([exited] if exited is not None else []),
+                    *(snapshots[path] for path in dead if path.name not in folded),
+                ],
+                [path.name for path in dead],
+            )
+            _write(exited_path, exited)
+            for path in dead:
+                path.unlink(missing_ok=True)
+                del snapshots[path]
+        return [*snapshots.values(), *([exited] if exited is not None else [])]
+
+
+def _write(path: Path, snapshot: dict[str, Any]) -> None:
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(snapshot))
+    temporary.replace(path)
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock on `path` across processes, so concurrent scrapes don't
+    fold the same snapshot twice.
+    """
+    with path.open("a") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def _fold(snapshots: Iterable[dict[str, Any]], folded: list[str]) -> dict[str, Any]:
+    """
+    One snapshot of the counters and histograms of exited workers' `snapshots`,
+    recording the names of the files `folded` into it.
+    """
+    return {
+        "pid": None,
+        "started": 0,
+        "folded": folded,
+        "metrics": {
+            name: {
+                **metric,
+                "samples": [
+                    [labels, value] for labels, value in metric["samples"].items()
+                ],
+            }
+            for name, metric in merge(snapshots).items()
+            if metric["type"] != "gauge"
+        },
+    }
+
+
+def _alive(pid: int | None) -> bool:
+    if pid is None:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge(snapshots: Iterable[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    merged: dict[str, dict[str, Any]] = {}
+    for snapshot in snapshots:
+        alive = _alive(snapshot["pid"])
+        for name, metric in snapshot["metrics"].items():
+            if metric["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            samples: dict[Labels, Any] = target["samples"]
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                previous = samples.get(key)
+                if previous is None:
+                    samples[key] = value
+                elif isinstance(value, list):
+                    samples[key] = [a + b for a, b in zip(previous, value, strict=True)]
+                else:
+                    samples[key] = previous + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return f"{{{pairs}}}"
+
+
+def _number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+def render(metrics: dict[str, dict[str, Any]]) -> str:
+    lines = []
+    for name, metric in sorted(metrics.items()):
+        lines.append(f"# HELP {name} {_escape(metric['help'])}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for labels, value in sorted(metric["samples"].items()):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(labelnames, labels)} {_number(value)}")
+                continue
+            cumulative = 0.0
+            bounds = [*metric["buckets"], float("inf")]
+            for bound, count in zip(bounds, value[:-1], strict=True):
+                cumulative += count
+                bucket_labels = _labels([*labelnames, "le"], [*labels, _number(bound)])
+                lines.append(f"{name}_bucket{bucket_labels} {_number(cumulative)}")
+            label_text = _labels(labelnames, labels)
+            lines.append(f"{name}_sum{label_text} {_number(value[-1])}")
+            lines.append(f"{name}_count{label_text} {_number(cumulative)}")
+    return "\n".join(lines) + "\n"
@@ -1,17 +1,90 @@
-from typing import Any
+from pathlib import Path
+from typing import Any, Literal
 
-from pydantic import PostgresDsn
+from pydantic import NonNegativeInt, PostgresDsn
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     database_dsn: PostgresDsn
+    # Also the size of every replica's pool, and how many connections each is
+    # warmed up with; 0 leaves the pools unbounded, as in SQLAlchemy, and cold.
+    database_pool_size: NonNegativeInt = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = -1
+    database_pool_pre_ping: bool = False
+    database_statement_cache_size: int = 100
+    database_replica_dsns: list[PostgresDsn] = []
+    database_replica_retry_after: float = 30.0
+    # The hottest reads - detail lookups and list pages - skip SQLAlchemy's
+    # execution and result layers and run straight on asyncpg.
+    database_raw_reads: bool = False
+
+    cache_enabled: bool = True
+    cache_ttl: float = 60.0
+    cache_max_entries: int = 10_000
+    cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Concurrent single creates are inserted together, one transaction per batch,
+    # once `write_batch_max_delay` seconds pass or `write_batch_max_size` queue up.
+    write_batching_enabled: bool = False
+    write_batch_max_delay: float = 0.002
+    write_batch_max_size: int = 500
+
+    server_timing: bool = False
+
+    # Identical concurrent GETs to the routes that opt in share one response.
+    single_flight_enabled: bool = True
+
+    metrics_enabled: bool = True
+    # Shared by all worker processes of one server, so `/metrics` on any of them
+    # reports the whole server. Unset for a single process.
+    metrics_dir: Path | None = None
+    metrics_flush_interval: float = 1.0
+
+    compression_enabled: bool = True
+    # Smaller bodies are not worth the CPU or the gzip header.
+    compression_minimum_size: int = 1024
+    # Level 1 gets within ~10% of level 6's size on our JSON at under half the CPU;
+    # see `benchmarks.compression`.
+    compression_level: int = 1
+    # Bodies and streamed chunks from this size up are compressed off the event loop.
+    compression_offload_size: int = 128 * 1024
+
+    # Background jobs: attempts before a job is marked failed, and retry delays
+    # doubling from `jobs_backoff_base` seconds up to `jobs_backoff_max`.
+    jobs_max_attempts: int = 5
+    jobs_backoff_base: float = 1.0
+    jobs_backoff_max: float = 3600.0
+    # Seconds a worker has to finish a claimed job before it is claimed again.
+    jobs_lease: float = 300.0
+
+    # Every server process checks this often whether `customer_stats` is at least
+    # as old and, if so and no other process is at it, refreshes it. None to leave
+    # refreshing to something else.
+    stats_refresh_interval: float | None = 60.0
+
+    smtp_host: str = "localhost"
+    smtp_port: int = 25
+    smtp_sender: str = "noreply@localhost"
+    smtp_timeout: float = 10.0
+
+    # "rich" for development, "json" for one JSON object per line written from a
+    # background thread.
+    log_format: Literal["rich", "json"] = "rich"
+    log_level: str = "INFO"
+    # SQL statements taking at least this many seconds are logged; on top of
+    # those, a `sql_log_sample_rate` fraction of all statements is.
+    sql_log_threshold: float | None = None
+    sql_log_sample_rate: float = 0.0
+    sql_log_parameters: bool = False
 
 
 settings = Settings()
 
 
-LOGGING: dict[str, Any] = {
+RICH_LOGGING: dict[str, Any] = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
@@ -38,3 +111,44 @@ LOGGING: dict[str, Any] = {
         "apat": {"level": "DEBUG", "handlers": ["default"], "propagate": False},
     },
 }
+
+# SQLAlchemy's own statement logging formats every statement and its parameters on
+# the event loop, so production leaves it at WARNING; see `sql_log_*` instead.
+JSON_LOGGING: dict[str, Any] = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "apat.log.JSONFormatter"},
+    },
+    "handlers": {
+        "stream": {
+            "class": "logging.StreamHandler",
+            "formatter": "json",
+            "stream": "ext://sys.stdout",
+        },
+        "default": {
+            "class": "apat.log.QueueHandler",
+            "handlers": ["stream"],
+            "listener": "apat.log.QueueListener",
+        },
+    },
+    "root": {
+        "level": settings.log_level,
+        "handlers": ["default"],
+    },
+    "loggers": {
+        "uvicorn": {
+            "level": settings.log_level,
+            "handlers": ["default"],
+            "propagate": False,
+        },
+        "sqlalchemy": {"level": "WARNING", "handlers": ["default"], "propagate": False},
+        "apat": {
+            "level": settings.log_level,
+            "handlers": ["default"],
+            "propagate": False,
+        },
+    },
+}
+
+LOGGING = JSON_LOGGING if settings.log_format == "json" else RICH_LOGGING
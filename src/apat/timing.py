@@ -0,0 +1,72 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+# Phases, in the order they are reported.
+POOL = "pool"
+DB = "db"
+MAP = "map"
+SERIALIZE = "serialize"
+PHASES = (POOL, DB, MAP, SERIALIZE)
+
+
+@dataclass(kw_only=True)
+class RequestTimings:
+    """
+    Seconds spent per phase of one request, and the number of queries it ran.
+    """
+
+    phases: dict[str, float] = field(default_factory=dict)
+    queries: int = 0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def merge(self, other: "RequestTimings") -> None:
+        for name, seconds in other.phases.items():
+            self.add(name, seconds)
+        self.queries += other.queries
+
+
+# Only set while a request is being timed, so every hook below is a single
+# `ContextVar.get()` when timing is off.
+_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start() -> tuple[RequestTimings, Token[RequestTimings | None]]:
+    timings = RequestTimings()
+    return timings, _timings.set(timings)
+
+
+def stop(token: Token[RequestTimings | None]) -> None:
+    _timings.reset(token)
+
+
+def current() -> RequestTimings | None:
+    return _timings.get()
+
+
+def record(name: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to phase `name` of the current request.
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
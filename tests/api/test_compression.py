@@ -0,0 +1,119 @@
+import gzip
+import zlib
+
+import anyio
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.types import Message
+
+from apat.api.compression import CompressionMiddleware, negotiate_encoding
+
+pytestmark = pytest.mark.anyio
+
+BODY = b'{"first_name":"Ada","last_name":"Lovelace"},' * 1_000
+CHUNKS = [b'{"line":%d}\n' % i * 100 for i in range(3)]
+
+
+async def body(request: object) -> Response:
+    return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+
+async def small(request: object) -> Response:
+    return Response(b"{}", media_type="application/json")
+
+
+def client(**kwargs: int) -> AsyncClient:
+    app = Starlette(
+        routes=[
+            Route("/body", body),
+            Route("/small", small),
+        ]
+    )
+    return AsyncClient(
+        transport=ASGITransport(app=CompressionMiddleware(app, enabled=True, **kwargs)),
+        base_url="http://test",
+    )
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("gzip", "gzip"),
+        ("deflate, gzip", "gzip"),
+        ("gzip;q=0.5, deflate", "deflate"),
+        ("gzip;q=0, deflate;q=0", None),
+        ("br", None),
+        ("*", "gzip"),
+        ("*;q=0.1, gzip;q=0", "deflate"),
+        ("GZIP;Q=1", "gzip"),
+    ],
+)
+async def test_negotiate_encoding(accept_encoding: str, expected: str | None):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("offload_size", [1, 1 << 30])
+@pytest.mark.parametrize(
+    "encoding, decompress",
+    [("gzip", gzip.decompress), ("deflate", zlib.decompress)],
+)
+async def test_compresses_large_bodies(encoding, decompress, offload_size: int):
+    async with client(offload_size=offload_size) as c:
+        async with c.stream(
+            "GET", "/body", headers={"Accept-Encoding": encoding}
+        ) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["Content-Length"] == str(len(raw))
+    assert response.headers["ETag"] == 'W/"v1"'
+    assert len(raw) < len(BODY) / 10
+    assert decompress(raw) == BODY
+
+
+async def test_leaves_small_and_unaccepted_bodies_alone():
+    async with client() as c:
+        small_response = await c.get("/small", headers={"Accept-Encoding": "gzip"})
+        identity = await c.get("/body", headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in small_response.headers
+    assert small_response.content == b"{}"
+    assert "Content-Encoding" not in identity.headers
+    assert identity.headers["ETag"] == '"v1"'
+    assert identity.content == BODY
+
+
+async def test_compresses_streams_chunk_by_chunk():
+    app = CompressionMiddleware(
+        StreamingResponse(iter(CHUNKS), media_type="application/x-ndjson"),
+        enabled=True,
+        offload_size=1,
+    )
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        await anyio.sleep_forever()
+        raise AssertionError
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    start, *bodies = messages
+    headers = Headers(raw=start["headers"])
+    assert headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in headers
+    # Every chunk is flushed, so it decodes as soon as it arrives.
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    decoded = [decoder.decompress(body["body"]) for body in bodies]
+    assert decoded[: len(CHUNKS)] == CHUNKS
+    assert b"".join(decoded) + decoder.flush() == b"".join(CHUNKS)
+    assert decoder.eof
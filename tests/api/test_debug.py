@@ -0,0 +1,20 @@
+import pytest
+from httpx import AsyncClient
+
+from tests.conftest import AppURLResolver
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_pool_stats(test_client: AsyncClient, url_resolve: AppURLResolver):
+    response = await test_client.get(url_resolve("get_pool_stats"))
+
+    assert response.status_code == 200
+    assert {"size", "checked_out", "overflow", "timeouts"} <= response.json().keys()
+
+
+async def test_get_cache_stats(test_client: AsyncClient, url_resolve: AppURLResolver):
+    response = await test_client.get(url_resolve("get_cache_stats"))
+
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions"} <= response.json().keys()
@@ -0,0 +1,55 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from apat.api import lifespan as lifespan_module
+from apat.api.lifespan import lifespan
+from apat.customers.crud import HOT_STATEMENTS
+from apat.database.pool import PoolMetrics
+from apat.database.replicas import ReplicaSet
+from apat.database.warmup import warm_up
+from apat.settings import settings
+from tests.conftest import AppURLResolver
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_warm_up_fills_pool(test_db_engine: AsyncEngine):
+    await test_db_engine.dispose()
+
+    await warm_up(test_db_engine, 3, HOT_STATEMENTS)
+
+    assert test_db_engine.pool.checkedin() == 3  # type: ignore[attr-defined]
+
+
+async def test_warm_up_skips_unbounded_pool(test_db_engine: AsyncEngine):
+    await test_db_engine.dispose()
+
+    await warm_up(test_db_engine, 0, HOT_STATEMENTS)
+
+    assert test_db_engine.pool.checkedin() == 0  # type: ignore[attr-defined]
+
+
+async def test_ready_only_after_warm_up(
+    test_app: FastAPI,
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    test_db_engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # An unreachable replica must not keep the server from becoming ready.
+    replica = create_async_engine("postgresql+asyncpg://user@127.0.0.1:1/db")
+    replicas = ReplicaSet(PoolMetrics(test_db_engine), [replica], retry_after=60)
+    monkeypatch.setattr(lifespan_module, "engine", test_db_engine)
+    monkeypatch.setattr(lifespan_module, "read_replicas", replicas)
+    monkeypatch.setattr(settings, "database_pool_size", 2)
+    url = url_resolve("get_readiness")
+
+    assert (await test_client.get(url)).status_code == 503
+    async with lifespan(test_app):
+        response = await test_client.get(url)
+        assert response.status_code == 200
+        assert response.json() == {"ready": True}
+        assert replicas.replicas[0].down_until > 0
+    assert (await test_client.get(url)).status_code == 503
@@ -0,0 +1,34 @@
+import pytest
+from httpx import AsyncClient
+
+from tests.conftest import AppURLResolver
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_metrics_label_requests_by_route_template(
+    test_client: AsyncClient, url_resolve: AppURLResolver
+):
+    await test_client.get(url_resolve("get_customers"))
+    await test_client.get("/customers/customers/not-a-uuid")
+
+    response = await test_client.get(url_resolve("get_metrics"))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert any(
+        line.startswith(
+            "http_request_duration_seconds_count"
+            '{method="GET",route="/customers/customers/{bid}",status="422"}'
+        )
+        for line in lines
+    )
+    assert any(
+        line.startswith(
+            'http_response_size_bytes_count{method="GET",route="/customers/customers/"}'
+        )
+        for line in lines
+    )
+    assert "http_requests_in_flight 1.0" in lines
+    assert any(line.startswith('db_pool_size{pool="primary"}') for line in lines)
@@ -0,0 +1,121 @@
+import asyncio
+
+import anyio
+import pytest
+from fastapi import FastAPI, HTTPException, Request, Response
+from httpx import ASGITransport, AsyncClient
+
+from apat.api.single_flight import SingleFlight, flights, single_flight
+
+pytestmark = pytest.mark.anyio
+
+
+class Handler:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = anyio.Event()
+
+    async def __call__(self, request: Request) -> Response:
+        self.calls += 1
+        await self.release.wait()
+        if request.query_params.get("missing"):
+            raise HTTPException(status_code=404)
+        return Response(f'{{"call":{self.calls}}}', media_type="application/json")
+
+
+@pytest.fixture
+def handler() -> Handler:
+    return Handler()
+
+
+@pytest.fixture
+async def client(handler: Handler):
+    app = FastAPI()
+
+    @app.api_route("/items/{name}", methods=["GET", "POST"])
+    @single_flight
+    async def get_item(request: Request, name: str) -> Response:
+        return await handler(request)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+async def send_all(
+    client: AsyncClient, handler: Handler, method: str, urls: list[str]
+) -> list[Response]:
+    responses: list[Response] = []
+
+    async def send(url: str) -> None:
+        responses.append(await client.request(method, url))
+
+    async with anyio.create_task_group() as tg:
+        for url in urls:
+            tg.start_soon(send, url)
+        # Let every request reach the endpoint before the first one finishes.
+        await anyio.wait_all_tasks_blocked()
+        handler.release.set()
+    return responses
+
+
+async def test_identical_requests_share_one_response(
+    client: AsyncClient, handler: Handler
+):
+    responses = await send_all(client, handler, "GET", ["/items/a?x=1&y=2"] * 5)
+
+    assert handler.calls == 1
+    assert {response.status_code for response in responses} == {200}
+    assert {response.content for response in responses} == {b'{"call":1}'}
+    assert len(flights) == 0
+
+
+async def test_requests_differing_in_params_are_not_shared(
+    client: AsyncClient, handler: Handler
+):
+    urls = ["/items/a", "/items/b", "/items/a?x=1", "/items/a?y=1&x=1"]
+    await send_all(client, handler, "GET", [*urls, "/items/a?x=1&y=1"])
+
+    assert handler.calls == len(urls)
+
+
+async def test_unsafe_methods_are_not_shared(client: AsyncClient, handler: Handler):
+    responses = await send_all(client, handler, "POST", ["/items/a"] * 3)
+
+    assert handler.calls == 3
+    assert {response.status_code for response in responses} == {200}
+
+
+async def test_errors_are_shared(client: AsyncClient, handler: Handler):
+    responses = await send_all(client, handler, "GET", ["/items/a?missing=1"] * 3)
+
+    assert handler.calls == 1
+    assert {response.status_code for response in responses} == {404}
+
+
+async def test_call_survives_the_first_caller_being_cancelled():
+    group = SingleFlight()
+    release = asyncio.Event()
+
+    async def call() -> str:
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(group.do("key", call))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(group.do("key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == ("done", True)
+    assert first.cancelled()
+
+
+async def test_endpoint_must_take_the_request():
+    async def endpoint(name: str) -> Response:
+        return Response()
+
+    with pytest.raises(TypeError):
+        single_flight(endpoint)
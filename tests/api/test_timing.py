@@ -0,0 +1,66 @@
+import logging
+from collections.abc import AsyncGenerator
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from apat import timing
+from apat.api.timing import ServerTimingMiddleware, server_timing_header
+from apat.database.timing import track_query_timings
+from tests.conftest import AppURLResolver
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def timed_client(
+    test_app: FastAPI, test_db_engine: AsyncEngine
+) -> AsyncGenerator[AsyncClient]:
+    track_query_timings(test_db_engine.sync_engine)
+    async with AsyncClient(
+        transport=ASGITransport(app=ServerTimingMiddleware(test_app, enabled=True)),
+        base_url="http://test",
+    ) as client:
+        yield client
+
+
+async def test_server_timing_breaks_down_request(
+    timed_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    caplog: pytest.LogCaptureFixture,
+):
+    with caplog.at_level(logging.INFO, logger="apat.api.timing"):
+        response = await timed_client.get(url_resolve("get_customers"))
+
+    metrics = {
+        metric.split(";")[0]: metric
+        for metric in response.headers["Server-Timing"].split(", ")
+    }
+    assert metrics.keys() == {"db", "map", "serialize", "handler", "total"}
+    assert 'desc="1 queries"' in metrics["db"]
+    [record] = caplog.records
+    assert record.getMessage().startswith("GET /customers/customers/ 200")
+    assert record.queries == 1  # type: ignore[attr-defined]
+    assert record.timings.keys() == {"db", "map", "serialize"}  # type: ignore[attr-defined]
+
+
+async def test_server_timing_disabled(
+    test_client: AsyncClient, url_resolve: AppURLResolver
+):
+    response = await test_client.get(url_resolve("get_customers"))
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+async def test_server_timing_header():
+    timings = timing.RequestTimings(phases={"db": 0.002, "pool": 0.0005}, queries=2)
+
+    header = server_timing_header(timings, total=0.004)
+
+    assert header == (
+        'pool;dur=0.500, db;dur=2.000;desc="2 queries", handler;dur=1.500, '
+        "total;dur=4.000"
+    )
@@ -0,0 +1,52 @@
+import pytest
+
+from apat.cache.backends import MemoryBackend
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2, max_bytes=1024)
+    await backend.set("a", b"1", ttl=60)
+    await backend.set("b", b"2", ttl=60)
+    assert await backend.get("a") == b"1"
+
+    await backend.set("c", b"3", ttl=60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == b"1"
+    assert backend.stats.evictions == 1
+    assert backend.stats.entries == 2
+
+
+async def test_memory_backend_is_bounded_in_bytes():
+    backend = MemoryBackend(max_entries=100, max_bytes=10)
+    await backend.set("a", b"x" * 6, ttl=60)
+    await backend.set("b", b"y" * 6, ttl=60)
+    await backend.set("huge", b"z" * 11, ttl=60)
+
+    assert await backend.get("a") is None
+    assert await backend.get("b") == b"y" * 6
+    assert await backend.get("huge") is None
+    assert backend.stats.size == 6
+
+
+async def test_memory_backend_expires_entries():
+    clock = FakeClock()
+    backend = MemoryBackend(max_entries=10, max_bytes=1024, clock=clock)
+    await backend.set("a", b"1", ttl=5)
+
+    clock.now = 4.9
+    assert await backend.get("a") == b"1"
+    clock.now = 5
+    assert await backend.get("a") is None
+    assert backend.stats.expirations == 1
+    assert backend.stats.entries == 0
@@ -0,0 +1,113 @@
+import os
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import uvicorn
+from click.testing import CliRunner
+from pytest_mock import MockerFixture
+
+from apat.cli.main import main
+from apat.cli.serve import Server, prepare_metrics_dir
+from apat.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def keep_logging_config(mocker: MockerFixture) -> None:
+    # `uvicorn.Config` applies `LOGGING`, which would stop `caplog` from seeing
+    # records of the `apat` loggers in later tests.
+    mocker.patch.object(uvicorn.Config, "configure_logging")
+
+
+@pytest.fixture
+def server_run(mocker: MockerFixture) -> MagicMock:
+    return mocker.patch.object(uvicorn.Server, "run")
+
+
+@pytest.fixture
+def multiprocess(mocker: MockerFixture) -> MagicMock:
+    mocker.patch.object(uvicorn.Config, "bind_socket")
+    return mocker.patch("apat.cli.serve.Multiprocess")
+
+
+async def test_serve_single_worker(server_run: MagicMock, multiprocess: MagicMock):
+    result = CliRunner().invoke(
+        main,
+        ["serve", "--workers", "1", "--keep-alive", "15", "--backlog", "512"],
+    )
+
+    assert result.exit_code == 0, result.output
+    multiprocess.assert_not_called()
+    server_run.assert_called_once()
+
+
+async def test_serve_multiple_workers(server_run: MagicMock, multiprocess: MagicMock):
+    result = CliRunner().invoke(
+        main, ["serve", "--workers", "3", "--max-requests", "1000"]
+    )
+
+    assert result.exit_code == 0, result.output
+    config: uvicorn.Config = multiprocess.call_args.args[0]
+    assert config.workers == 3
+    assert config.loop == "uvloop"
+    assert config.http == "httptools"
+    assert config.limit_max_requests == 1000
+    multiprocess.return_value.run.assert_called_once()
+
+
+async def test_serve_single_worker_with_max_requests_is_supervised(
+    server_run: MagicMock, multiprocess: MagicMock
+):
+    result = CliRunner().invoke(
+        main, ["serve", "--workers", "1", "--max-requests", "1000"]
+    )
+
+    assert result.exit_code == 0, result.output
+    server_run.assert_not_called()
+    config: uvicorn.Config = multiprocess.call_args.args[0]
+    assert config.workers == 1
+    assert config.limit_max_requests == 1000
+    multiprocess.return_value.run.assert_called_once()
+
+
+async def test_worker_limit_is_jittered(server_run: MagicMock):
+    limits = set()
+    for _ in range(20):
+        server = Server(uvicorn.Config("app", limit_max_requests=100), 10)
+        server.run()
+        assert server.config.limit_max_requests is not None
+        limits.add(server.config.limit_max_requests)
+
+    assert min(limits) >= 100
+    assert max(limits) <= 110
+    assert len(limits) > 1
+
+
+async def test_prepare_metrics_dir_removes_previous_run(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(settings, "metrics_dir", tmp_path)
+    (tmp_path / "metrics-123.json").write_text("{}")
+    (tmp_path / "metrics-123.tmp").write_text("{")
+    (tmp_path / "other.txt").write_text("")
+
+    assert prepare_metrics_dir(supervised=True) is None
+
+    assert [path.name for path in tmp_path.iterdir()] == ["other.txt"]
+
+
+async def test_prepare_metrics_dir_for_workers(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "metrics_dir", None)
+    # Restored after the test; `prepare_metrics_dir` overwrites it.
+    monkeypatch.setenv("METRICS_DIR", "")
+
+    assert prepare_metrics_dir(supervised=False) is None
+    directory = prepare_metrics_dir(supervised=True)
+
+    assert directory is not None
+    assert directory.is_dir()
+    # Picked up by the worker processes' settings.
+    assert os.environ["METRICS_DIR"] == str(directory)
+    directory.rmdir()
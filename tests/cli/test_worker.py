@@ -0,0 +1,25 @@
+import asyncio
+import os
+import signal
+
+import pytest
+from pytest_mock import MockerFixture
+
+from apat.cli.worker import run_worker
+from apat.database.database import ConnectionFactory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_worker_exits_on_sigterm(
+    conn_factory: ConnectionFactory, mocker: MockerFixture
+):
+    mocker.patch("apat.cli.worker.db_conn", conn_factory)
+    engine = mocker.patch("apat.cli.worker.engine", new=mocker.AsyncMock())
+    task = asyncio.create_task(run_worker(1, 1, 0.01))
+    await asyncio.sleep(0.05)
+
+    os.kill(os.getpid(), signal.SIGTERM)
+
+    await asyncio.wait_for(task, timeout=1)
+    engine.dispose.assert_awaited_once()
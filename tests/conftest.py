@@ -1,5 +1,6 @@
 import logging
 from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlparse, urlunparse
@@ -23,6 +24,7 @@ from sqlalchemy.ext.asyncio import (
 from apat.api.main import app
 from apat.database.database import ConnectionFactory, engine, metadata
 from apat.database.database import conn_factory as real_conn_factory
+from apat.database.database import read_conn_factory as real_read_conn_factory
 from apat.settings import settings
 
 LOGGER = logging.getLogger(__name__)
@@ -39,6 +41,7 @@ async def test_app(
     conn_factory: ConnectionFactory,
 ) -> FastAPI:
     app.dependency_overrides[real_conn_factory] = lambda: conn_factory
+    app.dependency_overrides[real_read_conn_factory] = lambda: conn_factory
     return app
 
 
@@ -100,6 +103,11 @@ async def db_conn(test_db_engine: AsyncEngine) -> AsyncConnection:
             await connection.rollback()
             await connection.close()
 
+    # Code under test calls `commit()`, which ends the outer transaction as well as
+    # the savepoint, so rolling back alone does not isolate tests from each other.
+    async with test_db_engine.begin() as connection:
+        await truncate_tables(connection)
+
 
 @pytest.fixture(scope="function")
 async def conn_factory(
@@ -109,8 +117,10 @@ async def conn_factory(
     Creates a session maker that is bound to the test database.
     """
 
-    def _session_factory():
-        return db_conn
+    @asynccontextmanager
+    async def _session_factory():
+        # Leaving `async with db_conn` would close the shared test connection.
+        yield db_conn
 
     _session_factory.is_fake = True
     return _session_factory
@@ -136,6 +146,11 @@ def migrate_test_db(
             context.run_migrations()
 
 
+async def truncate_tables(connection: AsyncConnection) -> None:
+    tables = ", ".join(f'"{table.name}"' for table in metadata.sorted_tables)
+    await connection.execute(sqlalchemy.text(f"TRUNCATE {tables} CASCADE"))
+
+
 async def create_test_database(
     connection: AsyncConnection, test_db_url: PostgresDsn
 ) -> None:
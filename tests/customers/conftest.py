@@ -1,3 +1,4 @@
+from collections.abc import AsyncGenerator
 from typing import Any
 
 import pytest
@@ -5,11 +6,17 @@ from polyfactory.factories.pydantic_factory import ModelFactory
 from polyfactory.pytest_plugin import register_fixture
 from sqlalchemy.ext.asyncio import AsyncConnection
 
-from apat.customers import models, schema
-from apat.customers.crud import AddressCRUD
+from apat.customers import cache, models, schema
+from apat.customers.crud import AddressCRUD, CustomerCRUD
 from tests.utils.factory import CustomModelFactory, DBFactory
 
 
+@pytest.fixture(autouse=True)
+async def clear_cache() -> AsyncGenerator[None]:
+    yield
+    await cache.cache.clear()
+
+
 @register_fixture
 class AddressModelFactory(CustomModelFactory[models.Address]): ...
 
@@ -22,6 +29,10 @@ class AddressSchemaFactory(ModelFactory[schema.AddressResponse]): ...
 class AddressCreateSchemaFactory(ModelFactory[schema.AddressCreate]): ...
 
 
+@register_fixture
+class CustomerModelFactory(CustomModelFactory[models.Customer]): ...
+
+
 @pytest.fixture
 async def address_db_factory(
     db_conn: AsyncConnection, address_model_factory: ModelFactory[models.Address]
@@ -39,3 +50,22 @@ async def address_db_factory(
         return result
 
     return inner
+
+
+@pytest.fixture
+async def customer_db_factory(
+    db_conn: AsyncConnection, customer_model_factory: ModelFactory[models.Customer]
+) -> DBFactory[models.Customer]:
+    async def inner(**kwargs: Any) -> models.Customer:
+        kwargs.setdefault("address_bid", None)
+        customer = customer_model_factory.build(**kwargs)
+        result = await CustomerCRUD.create(
+            db_conn,
+            first_name=customer.first_name,
+            last_name=customer.last_name,
+            address_bid=customer.address_bid,
+        )
+        await db_conn.commit()
+        return result
+
+    return inner
@@ -1,15 +1,34 @@
+from datetime import timedelta
+from uuid import uuid4
+
 import pytest
-from sqlalchemy.ext.asyncio import AsyncConnection
+from pytest_mock import MockerFixture
+from sqlalchemy import CursorResult, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
 
-from apat.customers.crud import AddressCRUD
-from apat.customers.models import Address
+from apat.customers import crud
+from apat.customers.crud import (
+    AddressCRUD,
+    CustomerCRUD,
+    CustomerStatsCRUD,
+    StatsNotRefreshedError,
+)
+from apat.customers.models import (
+    Address,
+    AddressValues,
+    Customer,
+    CustomerCount,
+    CustomerValues,
+)
+from apat.database import raw
+from tests.conftest import truncate_tables
 from tests.utils.factory import DBFactory
 
 pytestmark = pytest.mark.anyio
 
 
 async def test_create_address(db_conn: AsyncConnection):
-    assert await AddressCRUD.get_all(db_conn) == []
+    assert (await AddressCRUD.get_all(db_conn)).items == []
 
     address = await AddressCRUD.create(
         db_conn, street="123 Main St", city="Springfield", state="IL", zip_code="62701"
@@ -25,4 +44,294 @@ async def test_get_all_addresses(
 ):
     await address_db_factory()
     addresses = await AddressCRUD.get_all(db_conn)
-    assert len(addresses) == 1
+    assert len(addresses.items) == 1
+    assert addresses.next_cursor is None
+
+
+async def test_get_all_customers_paginates_in_keyset_order(
+    db_conn: AsyncConnection, customer_db_factory: DBFactory[Customer]
+):
+    created = [await customer_db_factory() for _ in range(5)]
+
+    first = await CustomerCRUD.get_all(db_conn, limit=2)
+    second = await CustomerCRUD.get_all(db_conn, limit=2, after=first.next_cursor)
+    third = await CustomerCRUD.get_all(db_conn, limit=2, after=second.next_cursor)
+
+    assert third.next_cursor is None
+    seen = [c.bid for page in (first, second, third) for c in page.items]
+    assert len(seen) == len(set(seen)) == 5
+    assert set(seen) == {c.bid for c in created}
+
+
+async def test_stream_all_addresses_yields_batches(
+    db_conn: AsyncConnection, address_db_factory: DBFactory[Address]
+):
+    created = {(await address_db_factory()).bid for _ in range(5)}
+
+    batches = [batch async for batch in AddressCRUD.stream_all(db_conn, batch_size=2)]
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert {address.bid for batch in batches for address in batch} == created
+
+
+@pytest.mark.parametrize("copy_threshold", [1_000, 2])
+async def test_create_many_customers(
+    db_conn: AsyncConnection,
+    address_db_factory: DBFactory[Address],
+    monkeypatch: pytest.MonkeyPatch,
+    copy_threshold: int,
+):
+    monkeypatch.setattr(crud, "COPY_THRESHOLD", copy_threshold)
+    address = await address_db_factory()
+
+    created = await CustomerCRUD.create_many(
+        db_conn,
+        [
+            CustomerValues(first_name="Ada", last_name="Lovelace"),
+            CustomerValues(first_name="Alan", last_name="Turing"),
+            CustomerValues(
+                first_name="Grace", last_name="Hopper", address_bid=address.bid
+            ),
+        ],
+    )
+
+    assert [c.first_name for c in created] == ["Ada", "Alan", "Grace"]
+    assert created[2].address_bid == address.bid
+    stored = await AddressCRUD.get_by_id_with_customers(db_conn, address.bid)
+    assert [c.bid for c in stored.customers] == [created[2].bid]
+    page = await CustomerCRUD.get_all(db_conn)
+    assert {c.bid for c in page.items} == {c.bid for c in created}
+
+
+async def test_create_many_matches_returned_rows_to_values(
+    db_conn: AsyncConnection,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    all_rows = CursorResult.all
+    # Postgres doesn't promise RETURNING rows in VALUES order.
+    with monkeypatch.context() as patched:
+        patched.setattr(CursorResult, "all", lambda self: all_rows(self)[::-1])
+        addresses = await AddressCRUD.create_many(
+            db_conn,
+            [
+                AddressValues(
+                    street=f"{i} Main St", city="Springfield", state="IL", zip_code="1"
+                )
+                for i in range(3)
+            ],
+        )
+        customers = await CustomerCRUD.create_many(
+            db_conn,
+            [
+                CustomerValues(first_name=name, last_name="Lovelace")
+                for name in ("Ada", "Alan", "Grace")
+            ],
+        )
+
+    assert [a.street for a in addresses] == ["0 Main St", "1 Main St", "2 Main St"]
+    assert [c.first_name for c in customers] == ["Ada", "Alan", "Grace"]
+    for address in addresses:
+        assert await AddressCRUD.get_by_id(db_conn, address.bid) == address
+
+
+async def test_create_many_copy_is_committed(
+    test_db_engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(crud, "COPY_THRESHOLD", 1)
+    values = [
+        AddressValues(
+            street=f"{i} Main St", city="Springfield", state="IL", zip_code="1"
+        )
+        for i in range(2)
+    ]
+
+    try:
+        async with test_db_engine.connect() as conn:
+            created = await AddressCRUD.create_many(conn, values)
+            await conn.commit()
+
+        async with test_db_engine.connect() as conn:
+            page = await AddressCRUD.get_all(conn)
+        assert {a.bid for a in page.items} == {a.bid for a in created}
+    finally:
+        async with test_db_engine.begin() as conn:
+            await truncate_tables(conn)
+
+
+async def test_get_by_id(
+    db_conn: AsyncConnection,
+    address_db_factory: DBFactory[Address],
+    customer_db_factory: DBFactory[Customer],
+):
+    address = await address_db_factory()
+    customer = await customer_db_factory(address_bid=address.bid)
+
+    assert await AddressCRUD.get_by_id(db_conn, address.bid) == address
+    assert await CustomerCRUD.get_by_id(db_conn, customer.bid) == customer
+    assert await CustomerCRUD.get_by_id(db_conn, address.bid) is None
+
+
+async def test_get_many_with_customers(
+    db_conn: AsyncConnection,
+    address_db_factory: DBFactory[Address],
+    customer_db_factory: DBFactory[Customer],
+):
+    empty, busy = await address_db_factory(), await address_db_factory()
+    customers = [await customer_db_factory(address_bid=busy.bid) for _ in range(2)]
+
+    addresses = await AddressCRUD.get_many_with_customers(
+        db_conn, [empty.bid, busy.bid, uuid4()]
+    )
+
+    assert addresses.keys() == {empty.bid, busy.bid}
+    assert addresses[empty.bid].value.customers == []
+    assert {c.bid for c in addresses[busy.bid].value.customers} == {
+        c.bid for c in customers
+    }
+    for bid, address in addresses.items():
+        assert address.version == await AddressCRUD.get_version(db_conn, bid)
+
+
+async def test_get_many_with_address(
+    db_conn: AsyncConnection,
+    address_db_factory: DBFactory[Address],
+    customer_db_factory: DBFactory[Customer],
+):
+    address = await address_db_factory()
+    homeless = await customer_db_factory()
+    housed = await customer_db_factory(address_bid=address.bid)
+
+    customers = await CustomerCRUD.get_many_with_address(
+        db_conn, [homeless.bid, housed.bid]
+    )
+
+    assert customers[homeless.bid].value.address is None
+    assert customers[housed.bid].value.address == address
+    for bid, customer in customers.items():
+        assert customer.version == await CustomerCRUD.get_version(db_conn, bid)
+
+
+async def test_search_ranks_closest_names_first(
+    db_conn: AsyncConnection,
+    customer_db_factory: DBFactory[Customer],
+):
+    exact = await customer_db_factory(first_name="Ada", last_name="Lovelace")
+    close = await customer_db_factory(first_name="Bob", last_name="Lovelacey")
+    await customer_db_factory(first_name="Grace", last_name="Hopper")
+
+    found = await CustomerCRUD.search(db_conn, "lovelace", limit=10)
+
+    assert found == [exact, close]
+    assert await CustomerCRUD.search(db_conn, "lovelace", limit=1) == [exact]
+
+
+async def test_autocomplete_matches_first_and_last_name_prefixes(
+    db_conn: AsyncConnection,
+    customer_db_factory: DBFactory[Customer],
+):
+    ada = await customer_db_factory(first_name="Ada", last_name="Lovelace")
+    lovisa = await customer_db_factory(first_name="Lovisa", last_name="Berg")
+    await customer_db_factory(first_name="Glove", last_name="Maker")
+    underscored = await customer_db_factory(first_name="Al", last_name="Lo_ve")
+
+    found = await CustomerCRUD.autocomplete(db_conn, "LOV", limit=10)
+
+    assert found == [ada, lovisa]
+    # LIKE wildcards in the prefix are matched literally.
+    assert await CustomerCRUD.autocomplete(db_conn, "lo_", limit=10) == [underscored]
+
+
+async def test_raw_reads_match_core_reads(
+    db_conn: AsyncConnection,
+    address_db_factory: DBFactory[Address],
+    customer_db_factory: DBFactory[Customer],
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: MockerFixture,
+):
+    empty, busy = await address_db_factory(), await address_db_factory()
+    homeless = await customer_db_factory()
+    housed = [await customer_db_factory(address_bid=busy.bid) for _ in range(2)]
+    customer_bids = [homeless.bid, *(c.bid for c in housed), uuid4()]
+    address_bids = [empty.bid, busy.bid, uuid4()]
+
+    async def read_all() -> list[object]:
+        customer_pages = [await CustomerCRUD.get_all(db_conn, limit=2)]
+        while (cursor := customer_pages[-1].next_cursor) is not None:
+            customer_pages.append(
+                await CustomerCRUD.get_all(db_conn, limit=2, after=cursor)
+            )
+        return [
+            customer_pages,
+            await AddressCRUD.get_all(db_conn, limit=1),
+            [
+                await CustomerCRUD.get_by_id_with_customer(db_conn, b)
+                for b in customer_bids
+            ],
+            [
+                await AddressCRUD.get_by_id_with_customers(db_conn, b)
+                for b in address_bids
+            ],
+            await CustomerCRUD.get_many_with_address(db_conn, customer_bids),
+            await AddressCRUD.get_many_with_customers(db_conn, address_bids),
+        ]
+
+    core = await read_all()
+    fetch = mocker.spy(raw, "fetch")
+    monkeypatch.setattr(crud.settings, "database_raw_reads", True)
+    assert await read_all() == core
+    assert fetch.call_count == 12
+
+
+async def test_customer_stats_count_customers_per_level(
+    db_conn: AsyncConnection,
+    address_db_factory: DBFactory[Address],
+    customer_db_factory: DBFactory[Customer],
+):
+    addresses = [
+        await address_db_factory(state="IL", city="Chicago", zip_code="60601"),
+        await address_db_factory(state="IL", city="Chicago", zip_code="60602"),
+        await address_db_factory(state="IL", city="Peoria", zip_code="61602"),
+        await address_db_factory(state="WI", city="Madison", zip_code="53703"),
+    ]
+    for address, customers in zip(addresses, [2, 1, 1, 3], strict=True):
+        for _ in range(customers):
+            await customer_db_factory(address_bid=address.bid)
+    # Customers without an address are not counted anywhere.
+    await customer_db_factory()
+
+    assert await CustomerStatsCRUD.refresh(db_conn, max_age=timedelta(0))
+    by_state = await CustomerStatsCRUD.get(db_conn)
+    by_city = await CustomerStatsCRUD.get(db_conn, "city")
+    il_zip_codes = await CustomerStatsCRUD.get(db_conn, "zip_code", state="IL")
+
+    assert by_state.total == by_city.total == il_zip_codes.total == 7
+    assert by_state.groups == [
+        CustomerCount(state="IL", customers=4),
+        CustomerCount(state="WI", customers=3),
+    ]
+    assert by_city.groups == [
+        CustomerCount(state="IL", city="Chicago", customers=3),
+        CustomerCount(state="IL", city="Peoria", customers=1),
+        CustomerCount(state="WI", city="Madison", customers=3),
+    ]
+    assert [(c.zip_code, c.customers) for c in il_zip_codes.groups] == [
+        ("60601", 2),
+        ("60602", 1),
+        ("61602", 1),
+    ]
+    assert 0 <= by_state.staleness_seconds < 60
+    # Fresh enough already.
+    assert not await CustomerStatsCRUD.refresh(db_conn, max_age=timedelta(hours=1))
+
+
+async def test_customer_stats_before_the_first_refresh(db_conn: AsyncConnection):
+    # Empty, as the migration creates the view.
+    await db_conn.execute(text("REFRESH MATERIALIZED VIEW customer_stats WITH NO DATA"))
+
+    with pytest.raises(StatsNotRefreshedError):
+        async with db_conn.begin_nested():
+            await CustomerStatsCRUD.get(db_conn)
+    # However fresh it is asked to be, as there is nothing to read yet.
+    assert await CustomerStatsCRUD.refresh(db_conn, max_age=timedelta(hours=1))
+    assert (await CustomerStatsCRUD.get(db_conn)).total == 0
@@ -0,0 +1,364 @@
+import json
+from datetime import timedelta
+from uuid import uuid4
+
+import anyio
+import pytest
+from httpx import AsyncClient
+from pytest_mock import MockerFixture
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from apat.customers import cache
+from apat.customers.crud import CustomerCRUD, CustomerStatsCRUD
+from apat.customers.models import Address, Customer
+from apat.settings import settings
+from tests.conftest import AppURLResolver
+from tests.utils.factory import DBFactory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_customers_follows_next_links(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    customer_db_factory: DBFactory[Customer],
+):
+    created = {str((await customer_db_factory()).bid) for _ in range(3)}
+
+    url: str | None = url_resolve("get_customers") + "?limit=2"
+    seen = []
+    while url is not None:
+        response = await test_client.get(url)
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["items"]) <= 2
+        seen.extend(item["bid"] for item in body["items"])
+        url = body["next"]
+
+    assert sorted(seen) == sorted(created)
+
+
+async def test_get_customers_rejects_invalid_cursor(
+    test_client: AsyncClient, url_resolve: AppURLResolver
+):
+    response = await test_client.get(
+        url_resolve("get_customers"), params={"cursor": "nope"}
+    )
+    assert response.status_code == 400
+
+
+async def test_get_customers_caps_limit(
+    test_client: AsyncClient, url_resolve: AppURLResolver
+):
+    response = await test_client.get(
+        url_resolve("get_customers"), params={"limit": 100_000}
+    )
+    assert response.status_code == 422
+
+
+async def test_export_customers_streams_ndjson(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    customer_db_factory: DBFactory[Customer],
+):
+    created = {str((await customer_db_factory()).bid) for _ in range(3)}
+
+    async with test_client.stream("GET", url_resolve("export_customers")) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) async for line in response.aiter_lines() if line]
+
+    assert {line["bid"] for line in lines} == created
+
+
+async def test_create_addresses_in_bulk(
+    test_client: AsyncClient, url_resolve: AppURLResolver
+):
+    payload = [
+        {
+            "street": f"{n} Main St",
+            "city": "Springfield",
+            "state": "IL",
+            "zip_code": "1",
+        }
+        for n in range(3)
+    ]
+
+    response = await test_client.post(url_resolve("create_addresses"), json=payload)
+
+    assert response.status_code == 200
+    assert [a["street"] for a in response.json()] == [a["street"] for a in payload]
+
+
+async def test_concurrent_creates_share_one_insert(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    mocker: MockerFixture,
+):
+    mocker.patch.object(settings, "write_batching_enabled", True)
+    create_many = mocker.spy(CustomerCRUD, "create_many")
+    url = url_resolve("create_customer")
+    responses = []
+
+    async def create(i: int) -> None:
+        responses.append(
+            await test_client.post(url, json={"first_name": f"F{i}", "last_name": "L"})
+        )
+
+    async with anyio.create_task_group() as tg:
+        for i in range(5):
+            tg.start_soon(create, i)
+
+    assert create_many.call_count == 1
+    assert len(create_many.call_args.args[1]) == 5
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["bid"] for response in responses}) == 5
+
+
+async def test_create_customers_in_bulk_validates_every_item(
+    test_client: AsyncClient, url_resolve: AppURLResolver
+):
+    response = await test_client.post(
+        url_resolve("create_customers"),
+        json=[{"first_name": "Ada", "last_name": "Lovelace"}, {"first_name": "Alan"}],
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 1, "last_name"]
+
+
+async def test_get_customer_with_address(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    address_db_factory: DBFactory[Address],
+    customer_db_factory: DBFactory[Customer],
+):
+    address = await address_db_factory()
+    customer = await customer_db_factory(address_bid=address.bid)
+
+    response = await test_client.get(url_resolve("get_customer", bid=customer.bid))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["bid"] == str(customer.bid)
+    assert body["address_bid"] == str(address.bid)
+    assert body["address"]["bid"] == str(address.bid)
+    assert body["address"]["street"] == address.street
+
+
+async def test_concurrent_identical_gets_share_one_lookup(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    customer_db_factory: DBFactory[Customer],
+    mocker: MockerFixture,
+):
+    customer = await customer_db_factory()
+    get_many = mocker.spy(CustomerCRUD, "get_many_with_address")
+    get_version = mocker.spy(CustomerCRUD, "get_version")
+    url = url_resolve("get_customer", bid=customer.bid)
+    responses = []
+
+    async def get() -> None:
+        responses.append(await test_client.get(url))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(get)
+
+    assert get_many.call_count == 1
+    # Unconditional requests take the version from the rows the body is loaded from.
+    assert get_version.call_count == 0
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.content for response in responses}) == 1
+
+
+async def test_get_address_without_customers(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    address_db_factory: DBFactory[Address],
+):
+    address = await address_db_factory()
+
+    response = await test_client.get(url_resolve("get_address", bid=address.bid))
+
+    assert response.status_code == 200
+    assert response.json()["customers"] == []
+
+
+async def test_get_address_not_found(
+    test_client: AsyncClient, url_resolve: AppURLResolver
+):
+    response = await test_client.get(url_resolve("get_address", bid=uuid4()))
+
+    assert response.status_code == 404
+
+
+async def test_get_address_is_cached_until_a_customer_joins(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    address_db_factory: DBFactory[Address],
+):
+    address = await address_db_factory()
+    url = url_resolve("get_address", bid=address.bid)
+    stats = cache.cache.stats
+    hits, misses = stats.hits, stats.misses
+
+    assert (await test_client.get(url)).json()["customers"] == []
+    cached = await test_client.get(url)
+    assert cached.json()["customers"] == []
+    assert (stats.hits - hits, stats.misses - misses) == (1, 1)
+
+    response = await test_client.post(
+        url_resolve("create_customer"),
+        json={
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "address_bid": str(address.bid),
+        },
+    )
+    customer_bid = response.json()["bid"]
+
+    response = await test_client.get(url)
+    assert [c["bid"] for c in response.json()["customers"]] == [customer_bid]
+    assert response.headers["ETag"] != cached.headers["ETag"]
+
+
+async def test_get_customers_by_ids(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    customer_db_factory: DBFactory[Customer],
+):
+    first, second = await customer_db_factory(), await customer_db_factory()
+
+    response = await test_client.get(
+        url_resolve("get_customers_by_ids"),
+        params={"ids": [str(second.bid), str(uuid4()), str(first.bid)]},
+    )
+
+    assert response.status_code == 200
+    assert [c["bid"] for c in response.json()] == [str(second.bid), str(first.bid)]
+
+
+async def test_search_customers(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    customer_db_factory: DBFactory[Customer],
+):
+    ada = await customer_db_factory(first_name="Ada", last_name="Lovelace")
+
+    response = await test_client.get(
+        url_resolve("search_customers"), params={"q": "lovelase"}
+    )
+    too_short = await test_client.get(
+        url_resolve("search_customers"), params={"q": "lo"}
+    )
+
+    assert response.status_code == 200
+    assert [c["bid"] for c in response.json()] == [str(ada.bid)]
+    assert too_short.status_code == 422
+
+
+async def test_get_customer_not_modified(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    customer_db_factory: DBFactory[Customer],
+):
+    customer = await customer_db_factory()
+    url = url_resolve("get_customer", bid=customer.bid)
+
+    response = await test_client.get(url)
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+    by_etag = await test_client.get(url, headers={"If-None-Match": f"W/{etag}"})
+    by_date = await test_client.get(url, headers={"If-Modified-Since": last_modified})
+    other = await test_client.get(url, headers={"If-None-Match": '"other"'})
+
+    assert (by_etag.status_code, by_etag.content) == (304, b"")
+    assert by_etag.headers["ETag"] == etag
+    assert by_date.status_code == 304
+    assert other.status_code == 200
+    assert other.headers["ETag"] == etag
+
+
+async def test_get_address_etag_changes_when_a_customer_joins(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    address_db_factory: DBFactory[Address],
+    customer_db_factory: DBFactory[Customer],
+):
+    address = await address_db_factory()
+    url = url_resolve("get_address", bid=address.bid)
+    etag = (await test_client.get(url)).headers["ETag"]
+
+    customer = await customer_db_factory(address_bid=address.bid)
+    response = await test_client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [c["bid"] for c in response.json()["customers"]] == [str(customer.bid)]
+    again = await test_client.get(
+        url, headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert again.status_code == 304
+
+
+async def test_get_customers_page_not_modified(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    customer_db_factory: DBFactory[Customer],
+):
+    await customer_db_factory()
+    url = url_resolve("get_customers")
+    etag = (await test_client.get(url)).headers["ETag"]
+
+    unchanged = await test_client.get(url, headers={"If-None-Match": etag})
+    await customer_db_factory()
+    changed = await test_client.get(url, headers={"If-None-Match": etag})
+
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert len(changed.json()["items"]) == 2
+    # The version read for the conditional request matches the page's own.
+    again = await test_client.get(
+        url, headers={"If-None-Match": changed.headers["ETag"]}
+    )
+    assert again.status_code == 304
+
+
+async def test_get_customer_stats(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    address_db_factory: DBFactory[Address],
+    customer_db_factory: DBFactory[Customer],
+    db_conn: AsyncConnection,
+):
+    address = await address_db_factory(state="IL", city="Chicago", zip_code="60601")
+    await customer_db_factory(address_bid=address.bid)
+    await CustomerStatsCRUD.refresh(db_conn, max_age=timedelta(0))
+    url = url_resolve("get_customer_stats")
+
+    response = await test_client.get(url, params={"by": "city", "state": "IL"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["by"] == "city"
+    assert body["total"] == 1
+    assert body["groups"] == [
+        {"state": "IL", "city": "Chicago", "zip_code": None, "customers": 1}
+    ]
+    assert body["staleness_seconds"] >= 0
+    assert "refreshed_at" in body
+    assert (await test_client.get(url, params={"by": "street"})).status_code == 422
+
+
+async def test_get_customer_stats_before_the_first_refresh(
+    test_client: AsyncClient,
+    url_resolve: AppURLResolver,
+    db_conn: AsyncConnection,
+):
+    await db_conn.execute(text("REFRESH MATERIALIZED VIEW customer_stats WITH NO DATA"))
+
+    response = await test_client.get(url_resolve("get_customer_stats"))
+
+    assert response.status_code == 503
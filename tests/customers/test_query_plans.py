@@ -0,0 +1,284 @@
+"""
+Plan regression checks for every statement the customer CRUD classes emit.
+
+The module seeds a realistic volume of rows once, then runs each statement under
+`EXPLAIN (ANALYZE, BUFFERS)`. A test fails when the plan sequentially scans more
+than `SEQ_SCAN_THRESHOLD` rows, or touches noticeably more shared buffers than
+recorded in `query_plans.json`. After an intended change, re-record with:
+
+    UPDATE_QUERY_PLANS=1 uv run pytest tests/customers/test_query_plans.py
+"""
+
+import json
+import os
+import random
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import pytest
+import sqlalchemy
+from sqlalchemy import ClauseElement, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from apat.customers import crud
+from apat.customers.crud import AddressCRUD, CustomerCRUD
+from apat.customers.models import AddressValues, CustomerValues
+from apat.customers.tables import AddressTable, CustomersTable
+from apat.database.explain import explain
+from apat.database.pagination import Cursor, paginate
+from tests.conftest import truncate_tables
+
+pytestmark = pytest.mark.anyio
+
+ADDRESSES = 5_000
+CUSTOMERS = 50_000
+SEQ_SCAN_THRESHOLD = 1_000
+# Cases that aggregate whole tables by design; only their buffers are checked.
+FULL_SCAN_CASES = {"refresh_customer_stats"}
+# Allowed growth over the recorded buffer count, relative and absolute, to absorb
+# page layout and GIN pending-list differences between runs.
+BUFFER_TOLERANCE = 0.5
+BUFFER_SLACK = 16
+BASELINE_PATH = Path(__file__).parent / "query_plans.json"
+
+
+@dataclass(frozen=True, kw_only=True)
+class Dataset:
+    address_bids: list[UUID]
+    customer_bids: list[UUID]
+    cursor: Cursor
+    # What `REFRESH MATERIALIZED VIEW customer_stats` runs; EXPLAIN doesn't take
+    # the REFRESH itself.
+    customer_stats_query: str
+
+
+type Case = Callable[[Dataset], tuple[ClauseElement, dict[str, Any] | None]]
+
+
+def address_values(n: int) -> list[AddressValues]:
+    return [
+        AddressValues(
+            street=f"{i} Main St", city="Springfield", state="IL", zip_code="1"
+        )
+        for i in range(n)
+    ]
+
+
+CASES: dict[str, Case] = {
+    "insert_address": lambda ds: (crud.INSERT_ADDRESS, address_values(1)[0]),
+    "insert_addresses": lambda ds: (
+        insert(AddressTable).values(address_values(100)).returning(AddressTable),
+        None,
+    ),
+    "select_address": lambda ds: (crud.SELECT_ADDRESS, {"bid": ds.address_bids[0]}),
+    "select_address_version": lambda ds: (
+        crud.SELECT_ADDRESS_VERSION,
+        {"bid": ds.address_bids[0]},
+    ),
+    "select_address_with_customers": lambda ds: (
+        crud.SELECT_ADDRESS_WITH_CUSTOMERS,
+        {"bid": ds.address_bids[0]},
+    ),
+    "select_addresses_with_customers_by_ids": lambda ds: (
+        crud.SELECT_ADDRESSES_WITH_CUSTOMERS_BY_IDS,
+        {"bids": ds.address_bids[:20]},
+    ),
+    "select_addresses_page": lambda ds: (
+        paginate(select(AddressTable), AddressTable, 50, None),
+        None,
+    ),
+    "select_addresses_next_page": lambda ds: (
+        paginate(select(AddressTable), AddressTable, 50, ds.cursor),
+        None,
+    ),
+    "insert_customer": lambda ds: (
+        crud.INSERT_CUSTOMER,
+        {"first_name": "Ada", "last_name": "L", "address_id": ds.address_bids[0]},
+    ),
+    "insert_customers": lambda ds: (
+        insert(CustomersTable)
+        .values(
+            [
+                {"first_name": "Ada", "last_name": "L", "address_id": bid}
+                for bid in ds.address_bids[:100]
+            ]
+        )
+        .returning(CustomersTable),
+        None,
+    ),
+    "select_customer": lambda ds: (
+        crud.SELECT_CUSTOMER,
+        {"bid": ds.customer_bids[0]},
+    ),
+    "select_customer_version": lambda ds: (
+        crud.SELECT_CUSTOMER_VERSION,
+        {"bid": ds.customer_bids[0]},
+    ),
+    "select_customer_with_address": lambda ds: (
+        crud.SELECT_CUSTOMER_WITH_ADDRESS,
+        {"bid": ds.customer_bids[0]},
+    ),
+    "select_customers_with_address_by_ids": lambda ds: (
+        crud.SELECT_CUSTOMERS_WITH_ADDRESS_BY_IDS,
+        {"bids": ds.customer_bids[:20]},
+    ),
+    "search_customers": lambda ds: (
+        crud.SEARCH_CUSTOMERS,
+        {"q": "Last4242", "limit": 10},
+    ),
+    "autocomplete_customers": lambda ds: (
+        crud.AUTOCOMPLETE_CUSTOMERS,
+        {"prefix": "last424%", "limit": 10},
+    ),
+    "select_customers_page": lambda ds: (
+        paginate(select(CustomersTable), CustomersTable, 50, None),
+        None,
+    ),
+    "select_customers_next_page": lambda ds: (
+        paginate(select(CustomersTable), CustomersTable, 50, ds.cursor),
+        None,
+    ),
+    "select_customers_next_page_version": lambda ds: (
+        paginate(
+            select(CustomersTable.id, CustomersTable.updated_at),
+            CustomersTable,
+            50,
+            ds.cursor,
+        ),
+        None,
+    ),
+    "select_customer_stats": lambda ds: (
+        crud.SELECT_CUSTOMER_STATS,
+        {"level": "state"},
+    ),
+    "select_customer_stats_in_state": lambda ds: (
+        crud.SELECT_CUSTOMER_STATS_IN_STATE,
+        {"level": "zip_code", "state": "IL"},
+    ),
+    "select_customer_stats_age": lambda ds: (crud.SELECT_CUSTOMER_STATS_AGE, None),
+    "select_customer_stats_populated": lambda ds: (
+        crud.IS_CUSTOMER_STATS_POPULATED,
+        None,
+    ),
+    "refresh_customer_stats": lambda ds: (
+        sqlalchemy.text(ds.customer_stats_query),
+        None,
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+async def dataset(test_db_engine: AsyncEngine) -> AsyncGenerator[Dataset]:
+    rng = random.Random(0)
+    async with test_db_engine.connect() as conn:
+        addresses = await AddressCRUD.create_many(conn, address_values(ADDRESSES))
+        address_bids = [address.bid for address in addresses]
+        customers = await CustomerCRUD.create_many(
+            conn,
+            [
+                CustomerValues(
+                    first_name=f"First{i}",
+                    last_name=f"Last{i}",
+                    address_bid=rng.choice(address_bids),
+                )
+                for i in range(CUSTOMERS)
+            ],
+        )
+        await conn.commit()
+        # Also flushes the trigram index's pending list, as autovacuum would.
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(crud.POPULATE_CUSTOMER_STATS)
+        await conn.execute(sqlalchemy.text("VACUUM ANALYZE"))
+        customer_stats_query = (
+            await conn.execute(
+                sqlalchemy.text(
+                    "SELECT definition FROM pg_matviews "
+                    "WHERE matviewname = 'customer_stats'"
+                )
+            )
+        ).scalar_one()
+
+    # Page through the middle of the table; COPY gives every row the same
+    # `created_at`, so the cursor tie-breaks on the id.
+    middle = sorted(customer.bid for customer in customers)[CUSTOMERS // 2]
+    async with test_db_engine.connect() as conn:
+        created_at = (
+            await conn.execute(
+                select(CustomersTable.created_at).where(CustomersTable.id == middle)
+            )
+        ).scalar_one()
+    try:
+        yield Dataset(
+            address_bids=address_bids,
+            customer_bids=[customer.bid for customer in customers],
+            cursor=Cursor(created_at=created_at, bid=middle),
+            customer_stats_query=customer_stats_query,
+        )
+    finally:
+        async with test_db_engine.begin() as conn:
+            await truncate_tables(conn)
+            await conn.execute(crud.POPULATE_CUSTOMER_STATS)
+
+
+@pytest.fixture
+async def plan_conn(test_db_engine: AsyncEngine) -> AsyncGenerator[AsyncConnection]:
+    async with test_db_engine.connect() as conn:
+        await conn.begin()
+        try:
+            yield conn
+        finally:
+            await conn.rollback()
+
+
+@pytest.fixture(scope="module")
+def baseline() -> dict[str, int]:
+    if not BASELINE_PATH.exists():
+        return {}
+    buffers: dict[str, int] = json.loads(BASELINE_PATH.read_text())
+    return buffers
+
+
+@pytest.fixture(scope="module")
+async def record_baseline(
+    baseline: dict[str, int],
+) -> AsyncGenerator[dict[str, int] | None]:
+    if not os.environ.get("UPDATE_QUERY_PLANS"):
+        yield None
+        return
+    recorded: dict[str, int] = {}
+    yield recorded
+    BASELINE_PATH.write_text(
+        json.dumps(baseline | recorded, indent=2, sort_keys=True) + "\n"
+    )
+
+
+@pytest.mark.parametrize("name", CASES)
+async def test_query_plan(
+    name: str,
+    dataset: Dataset,
+    plan_conn: AsyncConnection,
+    baseline: dict[str, int],
+    record_baseline: dict[str, int] | None,
+):
+    statement, params = CASES[name](dataset)
+
+    # The first run on a connection also reads index metapages into its relation
+    # cache, which earlier tests may have invalidated; measure the second.
+    await explain(plan_conn, statement, params)
+    plan = await explain(plan_conn, statement, params)
+
+    large_scans = [s for s in plan.seq_scans if s.rows > SEQ_SCAN_THRESHOLD]
+    if name not in FULL_SCAN_CASES:
+        assert not large_scans, f"{name} sequentially scans {large_scans}"
+    if record_baseline is not None:
+        record_baseline[name] = plan.shared_buffers
+    elif name in baseline:
+        allowed = baseline[name] * (1 + BUFFER_TOLERANCE) + BUFFER_SLACK
+        assert plan.shared_buffers <= allowed, (
+            f"{name} touched {plan.shared_buffers} shared buffers, "
+            f"recorded {baseline[name]}"
+        )
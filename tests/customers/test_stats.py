@@ -0,0 +1,56 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from apat.customers.crud import CustomerStatsCRUD, StatsNotRefreshedError
+from apat.customers.models import Address, Customer
+from apat.customers.stats import refresh_stats
+from tests.utils.factory import DBFactory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_refresh_stats_keeps_refreshing_in_the_background(
+    test_db_engine: AsyncEngine,
+    address_db_factory: DBFactory[Address],
+    customer_db_factory: DBFactory[Customer],
+):
+    address = await address_db_factory()
+    refresher = asyncio.create_task(refresh_stats(test_db_engine.connect, 0.01))
+    try:
+        for expected in (0, 1):
+            if expected:
+                await customer_db_factory(address_bid=address.bid)
+            async with asyncio.timeout(5):
+                while True:
+                    try:
+                        async with test_db_engine.connect() as conn:
+                            stats = await CustomerStatsCRUD.get(conn)
+                    except StatsNotRefreshedError:
+                        pass
+                    else:
+                        if stats.total == expected:
+                            break
+                    await asyncio.sleep(0.01)
+    finally:
+        refresher.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await refresher
+
+
+async def test_refresh_skips_while_another_is_refreshing(test_db_engine: AsyncEngine):
+    # Only refreshes of a populated view are concurrent.
+    async with test_db_engine.connect() as conn:
+        await CustomerStatsCRUD.refresh(conn, max_age=timedelta(0))
+        await conn.commit()
+    async with test_db_engine.connect() as first, test_db_engine.connect() as second:
+        assert await CustomerStatsCRUD.refresh(first, max_age=timedelta(0))
+        # Reads are not blocked meanwhile.
+        await CustomerStatsCRUD.get(second)
+        assert not await CustomerStatsCRUD.refresh(second, max_age=timedelta(0))
+        await first.commit()
+        await second.rollback()
+        assert await CustomerStatsCRUD.refresh(second, max_age=timedelta(0))
+        await second.commit()
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from apat.database.batcher import WriteBatcher
+
+pytestmark = pytest.mark.anyio
+
+
+class Writer:
+    def __init__(self, bad: int | None = None) -> None:
+        self.batches: list[list[int]] = []
+        self.bad = bad
+
+    async def __call__(self, values: list[int]) -> list[str]:
+        self.batches.append(values)
+        if self.bad in values:
+            raise ValueError(self.bad)
+        return [str(value) for value in values]
+
+
+async def test_concurrent_writes_are_batched():
+    writer = Writer()
+    batcher = WriteBatcher(writer, max_delay=0.01)
+
+    results = await asyncio.gather(*(batcher.write(i) for i in range(4)))
+
+    assert results == ["0", "1", "2", "3"]
+    assert writer.batches == [[0, 1, 2, 3]]
+
+
+async def test_full_batches_are_written_without_waiting():
+    writer = Writer()
+    batcher = WriteBatcher(writer, max_batch_size=2, max_delay=60)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.write(i) for i in range(4))), timeout=1
+    )
+
+    assert results == ["0", "1", "2", "3"]
+    assert writer.batches == [[0, 1], [2, 3]]
+
+
+async def test_only_the_offending_write_fails():
+    writer = Writer(bad=2)
+    batcher = WriteBatcher(writer, isolate=(ValueError,))
+
+    results = await asyncio.gather(
+        *(batcher.write(i) for i in range(4)), return_exceptions=True
+    )
+
+    assert results[:2] == ["0", "1"]
+    assert isinstance(results[2], ValueError)
+    assert results[3] == "3"
+    assert writer.batches == [[0, 1, 2, 3], [0, 1], [2, 3], [2], [3]]
+
+
+async def test_other_failures_reach_every_caller():
+    writer = Writer(bad=2)
+    batcher = WriteBatcher(writer, isolate=())
+
+    results = await asyncio.gather(
+        *(batcher.write(i) for i in range(4)), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [ValueError] * 4
+    assert writer.batches == [[0, 1, 2, 3]]
+
+
+async def test_disabled_writes_each_value_on_its_own():
+    writer = Writer()
+    batcher = WriteBatcher(writer, enabled=False)
+
+    results = await asyncio.gather(*(batcher.write(i) for i in range(3)))
+
+    assert results == ["0", "1", "2"]
+    assert writer.batches == [[0], [1], [2]]
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from apat import timing
+from apat.database.loader import BatchLoader
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_loads_are_coalesced():
+    batches: list[list[int]] = []
+
+    async def batch_load(keys: list[int]) -> dict[int, str]:
+        batches.append(keys)
+        return {key: str(key) for key in keys if key != 3}
+
+    loader = BatchLoader(batch_load)
+
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), loader.load(1), loader.load(3)
+    )
+
+    assert results == ["1", "2", "1", None]
+    assert batches == [[1, 2, 3]]
+    assert await loader.load_many([4, 5]) == ["4", "5"]
+    assert batches[1:] == [[4, 5]]
+
+
+async def test_batches_are_capped():
+    batches: list[list[int]] = []
+
+    async def batch_load(keys: list[int]) -> dict[int, int]:
+        batches.append(keys)
+        return {key: key for key in keys}
+
+    loader = BatchLoader(batch_load, max_batch_size=2)
+
+    assert await loader.load_many(range(5)) == [0, 1, 2, 3, 4]
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+async def test_batch_failure_reaches_every_caller():
+    async def batch_load(keys: list[int]) -> dict[int, int]:
+        raise RuntimeError("boom")
+
+    loader = BatchLoader(batch_load)
+
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+
+async def test_batch_time_is_added_to_every_waiting_request():
+    batches: list[list[int]] = []
+
+    async def batch_load(keys: list[int]) -> dict[int, int]:
+        batches.append(keys)
+        timing.record(timing.DB, 1.0)
+        return {key: key for key in keys}
+
+    loader = BatchLoader(batch_load)
+
+    async def request(keys: list[int]) -> timing.RequestTimings:
+        timings, token = timing.start()
+        try:
+            await loader.load_many(keys)
+        finally:
+            timing.stop(token)
+        return timings
+
+    first, second = await asyncio.gather(request([1, 2]), request([2, 3]))
+
+    assert batches == [[1, 2, 3]]
+    assert first.phases == second.phases == {timing.DB: 1.0}
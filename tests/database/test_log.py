@@ -0,0 +1,56 @@
+import logging
+
+import pytest
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from apat.database.log import log_queries
+from apat.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def logged_engine(
+    test_db_engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch
+) -> AsyncEngine:
+    monkeypatch.setattr(settings, "sql_log_threshold", None)
+    monkeypatch.setattr(settings, "sql_log_sample_rate", 0.0)
+    log_queries(test_db_engine.sync_engine)
+    return test_db_engine
+
+
+async def test_logs_only_slow_statements(
+    logged_engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+):
+    monkeypatch.setattr(settings, "sql_log_threshold", 0.05)
+
+    with caplog.at_level(logging.INFO, logger="apat.database.log"):
+        async with logged_engine.connect() as conn:
+            await conn.execute(sqlalchemy.text("SELECT 1"))
+            await conn.execute(sqlalchemy.text("SELECT pg_sleep(0.1)"))
+
+    [record] = caplog.records
+    assert record.levelno == logging.WARNING
+    assert record.statement == "SELECT pg_sleep(0.1)"
+    assert record.duration >= 100
+    assert not hasattr(record, "parameters")
+
+
+async def test_logs_sampled_statements(
+    logged_engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+):
+    monkeypatch.setattr(settings, "sql_log_sample_rate", 1.0)
+    monkeypatch.setattr(settings, "sql_log_parameters", True)
+
+    with caplog.at_level(logging.INFO, logger="apat.database.log"):
+        async with logged_engine.connect() as conn:
+            await conn.execute(sqlalchemy.text("SELECT CAST(:n AS integer)"), {"n": 1})
+
+    [record] = caplog.records
+    assert record.levelno == logging.INFO
+    assert record.parameters == (1,)
@@ -0,0 +1,20 @@
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+
+from apat.database.pagination import Cursor, InvalidCursorError
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cursor_round_trip():
+    cursor = Cursor(created_at=datetime(2025, 2, 25, 19, 11, tzinfo=UTC), bid=uuid4())
+
+    assert Cursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "WzEsMl0", "e30"])
+async def test_cursor_decode_rejects_garbage(token: str):
+    with pytest.raises(InvalidCursorError):
+        Cursor.decode(token)
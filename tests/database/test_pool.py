@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from pydantic import PostgresDsn
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from apat.database.database import create_engine
+from apat.database.pool import PoolMetrics
+from apat.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pool_metrics_track_checkouts_and_timeouts(test_db_url: PostgresDsn):
+    engine = create_engine(
+        str(test_db_url),
+        settings.model_copy(
+            update={
+                "database_pool_size": 1,
+                "database_max_overflow": 0,
+                "database_pool_timeout": 0.05,
+            }
+        ),
+    )
+    metrics = PoolMetrics(engine)
+    try:
+        conn = await metrics.connect()
+        stats = metrics.stats()
+        assert (stats.size, stats.checked_out, stats.checkouts) == (1, 1, 1)
+
+        with pytest.raises(PoolTimeoutError):
+            await metrics.connect()
+        assert metrics.stats().timeouts == 1
+        assert metrics.stats().wait_seconds_max >= 0.05
+
+        waiter = asyncio.create_task(metrics.connect())
+        await asyncio.sleep(0.01)
+        await conn.close()
+        await (await waiter).close()
+
+        stats = metrics.stats()
+        assert (stats.checked_out, stats.checkouts, stats.connects) == (0, 2, 1)
+        assert stats.wait_count == 3
+    finally:
+        await engine.dispose()
@@ -0,0 +1,142 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+import sqlalchemy
+from pydantic import PostgresDsn
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from apat.database.batcher import WriteBatcher
+from apat.database.database import create_engine
+from apat.database.loader import BatchLoader
+from apat.database.pool import PoolMetrics
+from apat.database.replicas import ReplicaSet, _wrote_to_primary, track_writes
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+async def new_request_context() -> AsyncGenerator[None]:
+    # Tests share one runner task, whereas every request gets a fresh context.
+    token = _wrote_to_primary.set(False)
+    yield
+    _wrote_to_primary.reset(token)
+
+
+async def routed_to(replicas: ReplicaSet) -> AsyncEngine:
+    conn = await replicas.connect()
+    await conn.close()
+    return conn.engine
+
+
+async def commit_on(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(sqlalchemy.text("SELECT 1"))
+        await conn.commit()
+
+
+@pytest.fixture
+async def engines(test_db_url: PostgresDsn) -> AsyncGenerator[dict[str, AsyncEngine]]:
+    engines = {
+        "primary": create_engine(str(test_db_url)),
+        "replica": create_engine(str(test_db_url)),
+        # Nothing listens on port 1, so connecting fails straight away.
+        "down": create_engine(
+            str(test_db_url).replace(f":{test_db_url.hosts()[0]['port']}/", ":1/")
+        ),
+    }
+    track_writes(engines["primary"])
+    yield engines
+    for engine in engines.values():
+        await engine.dispose()
+
+
+async def test_reads_fail_over_to_healthy_replica(engines: dict[str, AsyncEngine]):
+    clock = FakeClock()
+    replicas = ReplicaSet(
+        PoolMetrics(engines["primary"]),
+        [engines["down"], engines["replica"]],
+        retry_after=10,
+        clock=clock,
+    )
+
+    for _ in range(3):
+        assert await routed_to(replicas) is engines["replica"]
+
+    assert replicas.replicas[0].down_until == 10
+    assert replicas.replicas[0].metrics.stats().wait_count == 1
+
+
+async def test_reads_fall_back_to_primary(engines: dict[str, AsyncEngine]):
+    replicas = ReplicaSet(
+        PoolMetrics(engines["primary"]), [engines["down"]], retry_after=10
+    )
+
+    assert await routed_to(replicas) is engines["primary"]
+
+
+async def test_reads_after_commit_go_to_primary(engines: dict[str, AsyncEngine]):
+    replicas = ReplicaSet(
+        PoolMetrics(engines["primary"]), [engines["replica"]], retry_after=10
+    )
+
+    assert await routed_to(replicas) is engines["replica"]
+
+    await commit_on(engines["primary"])
+
+    assert await routed_to(replicas) is engines["primary"]
+
+
+async def test_reads_after_batched_write_go_to_primary(
+    engines: dict[str, AsyncEngine],
+):
+    replicas = ReplicaSet(
+        PoolMetrics(engines["primary"]), [engines["replica"]], retry_after=10
+    )
+
+    async def write_batch(values: list[int]) -> list[int]:
+        await commit_on(engines["primary"])
+        return values
+
+    batcher = WriteBatcher(write_batch)
+
+    # Committed by a task of the batcher's.
+    assert await batcher.write(1) == 1
+    assert await routed_to(replicas) is engines["primary"]
+
+
+async def test_batched_loads_are_routed_per_request(engines: dict[str, AsyncEngine]):
+    replicas = ReplicaSet(
+        PoolMetrics(engines["primary"]), [engines["replica"]], retry_after=10
+    )
+
+    async def batch_load(keys: list[int]) -> dict[int, AsyncEngine]:
+        engine = await routed_to(replicas)
+        return dict.fromkeys(keys, engine)
+
+    loader = BatchLoader(batch_load)
+    committed = asyncio.Event()
+
+    async def load_after_commit(key: int) -> AsyncEngine | None:
+        await commit_on(engines["primary"])
+        committed.set()
+        return await loader.load(key)
+
+    async def load_meanwhile(key: int) -> AsyncEngine | None:
+        await committed.wait()
+        return await loader.load(key)
+
+    # Each runs in a task of its own, as concurrent requests do, and loads in the
+    # same tick.
+    assert await asyncio.gather(load_after_commit(1), load_meanwhile(2)) == [
+        engines["primary"],
+        engines["replica"],
+    ]
@@ -0,0 +1,51 @@
+import time
+from datetime import UTC, datetime
+from uuid import RFC_4122, UUID
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from apat.customers.crud import AddressCRUD
+from apat.database import uuids
+from apat.database.uuids import uuid7
+
+pytestmark = pytest.mark.anyio
+
+
+def timestamp(bid: UUID) -> datetime:
+    return datetime.fromtimestamp(int.from_bytes(bid.bytes[:6]) / 1e3, UTC)
+
+
+async def test_uuid7_is_a_time_ordered_rfc_9562_uuid():
+    before = datetime.now(UTC).replace(microsecond=0)
+    bids = [uuid7() for _ in range(10_000)]
+
+    assert {(bid.version, bid.variant) for bid in bids} == {(7, RFC_4122)}
+    assert bids == sorted(bids)
+    assert len(set(bids)) == len(bids)
+    assert before <= timestamp(bids[0]) <= datetime.now(UTC)
+
+
+async def test_uuid7_keeps_increasing_when_the_clock_goes_back(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    now = time.time_ns()
+    first = uuid7()
+    monkeypatch.setattr(uuids.time, "time_ns", lambda: now - 10**9)
+
+    assert first < uuid7() < uuid7()
+
+
+async def test_primary_keys_default_to_uuid7(db_conn: AsyncConnection):
+    address = await AddressCRUD.create(
+        db_conn, street="1 Main St", city="Springfield", state="IL", zip_code="1"
+    )
+    later = await AddressCRUD.create(
+        db_conn, street="2 Main St", city="Springfield", state="IL", zip_code="1"
+    )
+
+    assert address.bid.version == later.bid.version == 7
+    assert address.bid < later.bid
+    now = await db_conn.scalar(select(func.now()))
+    assert abs((timestamp(address.bid) - now).total_seconds()) < 60
@@ -0,0 +1,60 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+
+import pytest
+
+from apat.settings import settings
+
+
+class SMTPServer:
+    """
+    A local SMTP stand-in that accepts every message, except for refusing the
+    first `refuse` senders with a temporary error.
+    """
+
+    def __init__(self) -> None:
+        self.messages: list[EmailMessage] = []
+        self.attempts = 0
+        self.refuse = 0
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        writer.write(b"220 localhost ESMTP\r\n")
+        while line := await reader.readline():
+            verb = line[:4].upper()
+            if verb == b"MAIL":
+                self.attempts += 1
+                if self.attempts <= self.refuse:
+                    writer.write(b"451 Try again later\r\n")
+                else:
+                    writer.write(b"250 OK\r\n")
+            elif verb == b"DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                data = await reader.readuntil(b"\r\n.\r\n")
+                body = data[: -len(b".\r\n")].replace(b"\r\n..", b"\r\n.")
+                message = message_from_bytes(body, policy=policy.default)
+                assert isinstance(message, EmailMessage)
+                self.messages.append(message)
+                writer.write(b"250 OK\r\n")
+            elif verb == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+async def smtp_server(monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[SMTPServer]:
+    smtp = SMTPServer()
+    server = await asyncio.start_server(smtp.handle, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()
+    monkeypatch.setattr(settings, "smtp_host", host)
+    monkeypatch.setattr(settings, "smtp_port", port)
+    async with server:
+        yield smtp
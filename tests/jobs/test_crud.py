@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from apat.customers.crud import AddressCRUD
+from apat.jobs.crud import JobCRUD
+from apat.jobs.tables import JobsTable
+
+pytestmark = pytest.mark.anyio
+
+LEASE = timedelta(minutes=5)
+
+
+async def count_jobs(conn: AsyncConnection) -> int:
+    return (
+        await conn.execute(select(func.count()).select_from(JobsTable))
+    ).scalar_one()
+
+
+async def test_jobs_are_enqueued_in_the_write_transaction(db_conn: AsyncConnection):
+    async with db_conn.begin_nested() as savepoint:
+        await AddressCRUD.create(db_conn, "1 Main St", "Springfield", "IL", "1")
+        await JobCRUD.enqueue(db_conn, "noop", {})
+        await savepoint.rollback()
+
+    assert await count_jobs(db_conn) == 0
+
+    await JobCRUD.enqueue(db_conn, "noop", {})
+
+    assert await count_jobs(db_conn) == 1
+
+
+async def test_claim_skips_locked_and_future_jobs(
+    db_conn: AsyncConnection, test_db_engine: AsyncEngine
+):
+    bids = [await JobCRUD.enqueue(db_conn, "noop", {"i": i}) for i in range(4)]
+    await JobCRUD.enqueue(db_conn, "later", {}, delay=timedelta(hours=1))
+    await db_conn.commit()
+
+    async with test_db_engine.connect() as first, test_db_engine.connect() as second:
+        claimed = await JobCRUD.claim(first, 3, LEASE)
+        # `first` still holds its row locks.
+        also_claimed = await JobCRUD.claim(second, 3, LEASE)
+        await first.commit()
+        await second.commit()
+        # Leased jobs are not due again until the lease runs out.
+        assert await JobCRUD.claim(first, 3, LEASE) == []
+
+    assert [job.bid for job in claimed] == bids[:3]
+    assert [job.bid for job in also_claimed] == bids[3:]
+    assert {job.attempts for job in claimed + also_claimed} == {1}
@@ -0,0 +1,134 @@
+import asyncio
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from apat.database.database import ConnectionFactory
+from apat.jobs.crud import JobCRUD
+from apat.jobs.mail import enqueue_email
+from apat.jobs.tables import JobsTable
+from apat.jobs.worker import Worker, backoff
+from tests.jobs.conftest import SMTPServer
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def engine_conn_factory(test_db_engine: AsyncEngine) -> ConnectionFactory:
+    # Workers run jobs concurrently, so unlike `conn_factory` this hands out a new
+    # connection each time; `db_conn` still truncates the tables afterwards.
+    return test_db_engine.connect
+
+
+async def run_until_done(worker: Worker, conn: AsyncConnection) -> None:
+    """
+    Run `worker` until no job is waiting to be run or retried.
+    """
+    task = asyncio.create_task(worker.run())
+    async with asyncio.timeout(5):
+        while True:
+            await asyncio.sleep(0.01)
+            pending = await conn.execute(
+                select(JobsTable.id).where(JobsTable.failed_at.is_(None))
+            )
+            await conn.commit()
+            if not pending.all() and not worker._running:
+                break
+    worker.stop()
+    await task
+
+
+async def test_worker_sends_queued_email(
+    db_conn: AsyncConnection,
+    engine_conn_factory: ConnectionFactory,
+    smtp_server: SMTPServer,
+):
+    await enqueue_email(db_conn, "ada@example.com", "Welcome", "Hello, Ada.")
+    await db_conn.commit()
+
+    await run_until_done(Worker(engine_conn_factory, poll_interval=0.01), db_conn)
+
+    [message] = smtp_server.messages
+    assert message["To"] == "ada@example.com"
+    assert message["Subject"] == "Welcome"
+    assert message.get_content().strip() == "Hello, Ada."
+
+
+async def test_failed_jobs_are_retried(
+    db_conn: AsyncConnection,
+    engine_conn_factory: ConnectionFactory,
+    smtp_server: SMTPServer,
+):
+    smtp_server.refuse = 2
+    await enqueue_email(db_conn, "ada@example.com", "Welcome", "Hello, Ada.")
+    await db_conn.commit()
+
+    worker = Worker(engine_conn_factory, poll_interval=0.01, backoff_base=0.0)
+    await run_until_done(worker, db_conn)
+
+    assert smtp_server.attempts == 3
+    assert len(smtp_server.messages) == 1
+
+
+async def test_jobs_fail_after_their_last_attempt(
+    db_conn: AsyncConnection, engine_conn_factory: ConnectionFactory
+):
+    calls = 0
+
+    async def explode(payload: dict[str, Any]) -> None:
+        nonlocal calls
+        calls += 1
+        raise RuntimeError(payload["why"])
+
+    bid = await JobCRUD.enqueue(db_conn, "explode", {"why": "boom"}, max_attempts=3)
+    await db_conn.commit()
+
+    worker = Worker(
+        engine_conn_factory, {"explode": explode}, poll_interval=0.01, backoff_base=0.0
+    )
+    await run_until_done(worker, db_conn)
+
+    job = (await db_conn.execute(select(JobsTable).where(JobsTable.id == bid))).one()
+    assert calls == 3
+    assert job.attempts == 3
+    assert job.failed_at is not None
+    assert "RuntimeError: boom" in job.last_error
+
+
+async def test_worker_respects_concurrency(
+    db_conn: AsyncConnection, engine_conn_factory: ConnectionFactory
+):
+    running = peak = 0
+
+    async def sleep(payload: dict[str, Any]) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for _ in range(20):
+        await JobCRUD.enqueue(db_conn, "sleep", {})
+    await db_conn.commit()
+
+    worker = Worker(
+        engine_conn_factory,
+        {"sleep": sleep},
+        concurrency=4,
+        batch_size=3,
+        poll_interval=0.01,
+    )
+    await run_until_done(worker, db_conn)
+
+    assert peak == 4
+
+
+async def test_backoff_doubles_up_to_the_maximum():
+    delays = [backoff(attempts, 1.0, 10.0) for attempts in range(1, 7)]
+
+    for attempts, delay in enumerate(delays, start=1):
+        expected = min(2 ** (attempts - 1), 10.0)
+        assert timedelta(seconds=expected / 2) <= delay <= timedelta(seconds=expected)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from apat.metrics.registry import EXITED_SNAPSHOT, Registry, merge, render
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_render_text_format():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ["path"])
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=[0.1, 1.0])
+    requests.inc(labels=('/a"b',))
+    requests.inc(2, labels=('/a"b',))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    assert await registry.render() == (
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 1.0\n'
+        'latency_seconds_bucket{le="1.0"} 2.0\n'
+        'latency_seconds_bucket{le="+Inf"} 3.0\n'
+        "latency_seconds_sum 5.55\n"
+        "latency_seconds_count 3.0\n"
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{path="/a\\"b"} 3.0\n'
+    )
+
+
+async def test_worker_snapshots_are_merged(tmp_path: Path):
+    workers = [Registry(directory=tmp_path) for _ in range(2)]
+    for registry in workers:
+        registry.counter("requests_total", "Requests.").inc()
+        registry.gauge("in_flight", "In flight.").set(2)
+        registry.histogram("latency_seconds", "Latency.", buckets=[1.0]).observe(0.5)
+    snapshots = [registry.snapshot() for registry in workers]
+    # The second worker has exited: its counts still add up, its gauges do not.
+    snapshots[1]["pid"] = max_pid() + 1
+
+    merged = merge(snapshots)
+
+    assert merged["requests_total"]["samples"] == {(): 2.0}
+    assert merged["in_flight"]["samples"] == {(): 2.0}
+    assert merged["latency_seconds"]["samples"] == {(): [2.0, 0.0, 1.0]}
+    assert 'latency_seconds_bucket{le="1.0"} 2.0' in render(merged)
+
+
+async def test_render_reads_flushed_snapshots(tmp_path: Path):
+    scraped, other = Registry(directory=tmp_path), Registry(directory=tmp_path)
+    scraped.counter("requests_total", "Requests.").inc()
+    other.counter("requests_total", "Requests.").inc(4)
+    # Both registries live in this process, so give the other one its own pid.
+    write_snapshot(tmp_path, other.snapshot(), pid=1)
+
+    assert "requests_total 5.0" in await scraped.render()
+
+
+async def test_scheduled_flush_writes_the_snapshot(tmp_path: Path):
+    registry = Registry(directory=tmp_path, flush_interval=0.01)
+    registry.counter("requests_total", "Requests.").inc()
+    path = tmp_path / f"metrics-{os.getpid()}-{registry.started}.json"
+
+    registry.schedule_flush()
+    registry.schedule_flush()
+
+    async with asyncio.timeout(5):
+        while not path.exists():
+            await asyncio.sleep(0.01)
+    assert json.loads(path.read_text())["metrics"]["requests_total"]["samples"] == [
+        [[], 1.0]
+    ]
+
+
+async def test_render_folds_exited_workers(tmp_path: Path):
+    scraped = Registry(directory=tmp_path)
+    scraped.counter("requests_total", "Requests.").inc()
+    for pid in (max_pid() + 1, max_pid() + 2):
+        exited = Registry(directory=tmp_path)
+        exited.counter("requests_total", "Requests.").inc(2)
+        exited.gauge("in_flight", "In flight.").set(3)
+        write_snapshot(tmp_path, exited.snapshot(), pid=pid)
+
+    first, second = await scraped.render(), await scraped.render()
+
+    assert "requests_total 5.0" in first
+    assert "in_flight" not in first
+    assert second == first
+    assert {path.name for path in tmp_path.glob("metrics-*.json")} == {
+        f"metrics-{os.getpid()}-{scraped.started}.json",
+        EXITED_SNAPSHOT,
+    }
+
+
+async def test_render_tells_a_reused_pid_from_the_exited_worker(tmp_path: Path):
+    exited = Registry(directory=tmp_path)
+    exited.counter("requests_total", "Requests.").inc(2)
+    exited.gauge("in_flight", "In flight.").set(3)
+    await exited.flush()
+    # Started later in a process with the same pid.
+    running = Registry(directory=tmp_path)
+    running.counter("requests_total", "Requests.").inc()
+    running.gauge("in_flight", "In flight.").set(1)
+
+    text = await running.render()
+
+    assert "requests_total 3.0" in text
+    assert "in_flight 1.0" in text
+
+
+async def test_render_skips_snapshots_folded_before_an_interrupted_delete(
+    tmp_path: Path,
+):
+    scraped = Registry(directory=tmp_path)
+    exited = Registry(directory=tmp_path)
+    exited.counter("requests_total", "Requests.").inc(2)
+    path = write_snapshot(tmp_path, exited.snapshot(), pid=max_pid() + 1)
+    await scraped.render()
+    # As if the scrape had stopped between folding the snapshot and deleting it.
+    path.write_text(json.dumps({**exited.snapshot(), "pid": max_pid() + 1}))
+
+    assert "requests_total 2.0" in await scraped.render()
+    assert not path.exists()
+
+
+def write_snapshot(directory: Path, snapshot: dict[str, Any], pid: int) -> Path:
+    path = directory / f"metrics-{pid}-{snapshot['started']}.json"
+    path.write_text(json.dumps({**snapshot, "pid": pid}))
+    return path
+
+
+def max_pid() -> int:
+    return int(Path("/proc/sys/kernel/pid_max").read_text())
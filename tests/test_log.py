@@ -0,0 +1,65 @@
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from apat.log import JSONFormatter, QueueHandler, QueueListener
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def logger() -> logging.Logger:
+    logger = logging.getLogger("tests.log")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+async def test_json_formatter_includes_extra_fields():
+    record = logging.makeLogRecord(
+        {
+            "name": "apat.api",
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+            "msg": "GET %s",
+            "args": ("/customers",),
+            "queries": 3,
+        }
+    )
+
+    document = json.loads(JSONFormatter().format(record))
+
+    assert document["message"] == "GET /customers"
+    assert document["level"] == "INFO"
+    assert document["logger"] == "apat.api"
+    assert document["queries"] == 3
+    assert "args" not in document
+
+
+async def test_queue_handler_writes_from_listener_thread(logger: logging.Logger):
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(JSONFormatter())
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler = QueueHandler(records)
+    handler.listener = QueueListener(records, target)
+    logger.addHandler(handler)
+    try:
+        logger.info("hello %s", "world", extra={"duration": 1.5})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+    finally:
+        logger.removeHandler(handler)
+        # Drains the queue before returning.
+        handler.close()
+
+    hello, failed = (json.loads(line) for line in stream.getvalue().splitlines())
+    assert hello["message"] == "hello world"
+    assert hello["duration"] == 1.5
+    assert failed["message"] == "failed"
+    assert "ValueError: boom" in failed["exc_info"]